@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文章记录内存基准测试 - 每篇文章一个dict vs rss_article.Article
+
+对大量合成条目分别提取为旧版dict和 Article，统计:
+    每篇文章常驻内存    提取完成后仍被文章列表引用的字节数
+    每篇文章内存块数    同上，按分配的内存块计
+    峰值                提取过程中的内存峰值
+    单次运行耗时        提取 + 计算文章ID + 时间窗口筛选 + 构建Discord消息
+
+用法:
+    python benchmarks/bench_article.py --feeds 50 --entries 200
+"""
+
+import argparse
+import gc
+import hashlib
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_parse_pool import build_feed  # noqa: E402
+from rss_monitor import RSSMonitor, clean_html, extract_articles, parse_published_time  # noqa: E402
+
+
+def extract_dicts(feed, url: str, max_entries: int):
+    """改为 Article 之前的提取方式：每篇文章一个dict，保存datetime"""
+    articles = []
+    for entry in feed.entries[:max_entries]:
+        title = entry.get('title', '无标题')
+        summary = entry.get('summary', entry.get('description', ''))
+        if title:
+            title = clean_html(title)
+        if summary:
+            summary = clean_html(summary)
+        articles.append({
+            'title': title or '无标题',
+            'link': entry.get('link', ''),
+            'published': entry.get('published', ''),
+            'published_time': parse_published_time(entry),
+            'summary': summary[:200] if summary else '',
+            'source': url,
+        })
+    return articles
+
+
+def dict_article_id(article) -> str:
+    identifier = article.get('link') or f"{article.get('title', '')}{article.get('published', '')}"
+    return hashlib.md5(identifier.encode('utf-8')).hexdigest()
+
+
+def measure_memory(name, extract, feeds, max_entries):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    articles = []
+    for url, feed in feeds:
+        # 模拟多进程解析后传回主进程：每个源的URL都是新的字符串对象
+        articles.extend(extract(feed, ''.join(url), max_entries))
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, 'filename')
+    size = sum(stat.size_diff for stat in stats)
+    blocks = sum(stat.count_diff for stat in stats)
+    return {
+        'mode': name,
+        'articles': len(articles),
+        'bytes_per_article': size / len(articles),
+        'blocks_per_article': blocks / len(articles),
+        'peak_mb': peak / 1024 / 1024,
+    }
+
+
+def measure_run(extract, article_id, feeds, max_entries, monitor, repeat):
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        for url, feed in feeds:
+            articles = extract(feed, url, max_entries)
+            for article in monitor.filter_recent_articles(articles, 24 * 3600):
+                article_id(article)
+                monitor.build_discord_message(article, 'bench')
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="文章记录内存基准测试：dict vs Article")
+    parser.add_argument('--feeds', type=int, default=50, help="合成RSS源数量")
+    parser.add_argument('--entries', type=int, default=200, help="每个RSS源的条目数")
+    parser.add_argument('--summary-size', type=int, default=1000, help="每条摘要的HTML字节数")
+    parser.add_argument('--repeat', type=int, default=5, help="耗时取多次运行的最小值")
+    args = parser.parse_args()
+
+    import feedparser
+
+    print(f"生成并解析合成语料: {args.feeds} 个RSS源 × {args.entries} 条...")
+    feeds = [(f"https://example.com/{i}/rss", feedparser.parse(build_feed(i, args.entries, args.summary_size)))
+             for i in range(args.feeds)]
+
+    monitor = RSSMonitor.__new__(RSSMonitor)
+    monitor.verbosity = 0
+
+    results = [
+        measure_memory('dict', extract_dicts, feeds, args.entries),
+        measure_memory('Article', extract_articles, feeds, args.entries),
+    ]
+    results[0]['run_seconds'] = measure_run(extract_dicts, dict_article_id, feeds, args.entries, monitor, args.repeat)
+    results[1]['run_seconds'] = measure_run(extract_articles, monitor.get_article_id, feeds, args.entries, monitor,
+                                            args.repeat)
+
+    print(f"\n{'方式':<10}{'文章数':>8}{'字节/篇':>10}{'内存块/篇':>11}{'峰值(MB)':>10}{'运行(s)':>10}")
+    for r in results:
+        print(f"{r['mode']:<10}{r['articles']:>8}{r['bytes_per_article']:>10.0f}{r['blocks_per_article']:>11.1f}"
+              f"{r['peak_mb']:>10.1f}{r['run_seconds']:>10.3f}")
+    print(f"\n每篇文章内存节省: {1 - results[1]['bytes_per_article'] / results[0]['bytes_per_article']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
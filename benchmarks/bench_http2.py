@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP/2基准测试 - 同一主机上的大量RSS源分别通过HTTP/1.1和HTTP/2获取，比较总耗时
+
+本地启动两个提供相同合成RSS源的替身服务器：HTTP/1.1（local_servers）和明文HTTP/2（h2c，基于h2库）。
+每个新连接先等待 --handshake-ms（模拟TCP+TLS握手的往返），每个请求再等待 --latency-ms。
+HTTP/1.1每个请求一个连接；HTTP/2（host_limits 中 "http2": "prior_knowledge"）所有请求复用一个连接。
+
+依赖 httpx[http2]（pip install "httpx[http2]"）。
+
+用法:
+    python benchmarks/bench_http2.py --sources 200 --fetch-workers 16 --handshake-ms 60 --latency-ms 20
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import socket
+import sys
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from typing import Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import local_servers  # noqa: E402
+import rss_monitor  # noqa: E402
+
+
+class H2cServer:
+    """最小的明文HTTP/2（prior knowledge）服务器：GET /feed/<i> 返回第i个合成RSS源"""
+
+    def __init__(self, options: Dict, handshake_ms: float, stats: local_servers.Stats):
+        self.options = options
+        self.handshake_ms = handshake_ms
+        self.stats = stats
+        self.sock = socket.create_server(('127.0.0.1', 0))
+        self.server_address = self.sock.getsockname()
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def serve_forever(self):
+        while True:
+            conn, _ = self.sock.accept()
+            threading.Thread(target=self.handle_connection, args=(conn,), daemon=True).start()
+
+    def handle_connection(self, sock):
+        import h2.config
+        import h2.connection
+        import h2.events
+
+        self.stats.incr('connections')
+        time.sleep(self.handshake_ms / 1000)
+        conn = h2.connection.H2Connection(config=h2.config.H2Configuration(client_side=False))
+        cond = threading.Condition()
+        with cond:
+            conn.initiate_connection()
+            sock.sendall(conn.data_to_send())
+        try:
+            while True:
+                data = sock.recv(65536)
+                if not data:
+                    break
+                with cond:
+                    for event in conn.receive_data(data):
+                        if isinstance(event, h2.events.RequestReceived):
+                            path = dict(event.headers).get(b':path', b'').decode()
+                            threading.Thread(target=self.respond, args=(sock, conn, cond, event.stream_id, path),
+                                             daemon=True).start()
+                        elif isinstance(event, h2.events.WindowUpdated):
+                            cond.notify_all()
+                        elif isinstance(event, h2.events.ConnectionTerminated):
+                            return
+                    sock.sendall(conn.data_to_send())
+        except OSError:
+            pass
+        finally:
+            sock.close()
+
+    def respond(self, sock, conn, cond, stream_id: int, path: str):
+        import h2.exceptions
+
+        delay = self.options['latency_ms']
+        if delay > 0:
+            time.sleep(delay / 1000)
+        match = re.match(r'^/feed/(\d+)', path)
+        try:
+            with cond:
+                if not match:
+                    conn.send_headers(stream_id, [(':status', '404'), ('content-length', '0')], end_stream=True)
+                    sock.sendall(conn.data_to_send())
+                    return
+                body = local_servers.render_feed(int(match.group(1)), self.options)
+                self.stats.incr('feed_200')
+                conn.send_headers(stream_id, [(':status', '200'), ('content-type', 'application/xml; charset=utf-8'),
+                                              ('content-length', str(len(body)))])
+                offset = 0
+                while offset < len(body):
+                    # 遵守客户端的流量控制窗口，窗口用完时等待 WINDOW_UPDATE
+                    window = min(conn.local_flow_control_window(stream_id), conn.max_outbound_frame_size)
+                    if window <= 0:
+                        cond.wait()
+                        continue
+                    chunk = body[offset:offset + window]
+                    offset += len(chunk)
+                    conn.send_data(stream_id, chunk, end_stream=offset >= len(body))
+                    sock.sendall(conn.data_to_send())
+        except (h2.exceptions.StreamClosedError, h2.exceptions.ProtocolError, OSError):
+            pass  # 客户端读够条目后提前关闭了流
+
+
+def start_h1_server(options: Dict, handshake_ms: float, stats: local_servers.Stats):
+    base = local_servers.make_feed_handler(options, stats)
+
+    class Handler(base):
+        def setup(self):
+            super().setup()
+            stats.incr('connections')
+            time.sleep(handshake_ms / 1000)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(protocol: str, port: int, args) -> Dict:
+    base = f"http://127.0.0.1:{port}"
+    limit = {'concurrency': args.concurrency}
+    if protocol == 'HTTP/2':
+        limit['http2'] = 'prior_knowledge'
+    with tempfile.TemporaryDirectory() as workdir:
+        config_file = os.path.join(workdir, 'config.json')
+        with open(config_file, 'w', encoding='utf-8') as f:
+            json.dump({'verbosity': 0, 'host_limits': {'127.0.0.1': limit}, 'json_feed': False,
+                       'state_file': os.path.join(workdir, 'state.json')}, f)
+        monitor = rss_monitor.RSSMonitor(config_file)
+        sources = [{'name': f"feed {i}", 'url': f"{base}/feed/{i}"} for i in range(args.sources)]
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = monitor.fetch_all(sources, fetch_workers=args.fetch_workers, parse_workers=0)
+        elapsed = time.perf_counter() - started
+        monitor.http2.close()
+    records = monitor.report.sources.values()
+    versions = {r['http_version'] for r in records}
+    # parse_workers=0 时解析在下载全部完成后于主进程中串行进行，从总耗时中扣除即为下载阶段耗时
+    parse_seconds = sum(r['stages'].get('parse', 0) + r['stages'].get('clean', 0) for r in records)
+    return {
+        'protocol': protocol,
+        'seconds': elapsed,
+        'fetch_seconds': elapsed - parse_seconds,
+        'ok': sum(1 for articles, error in results.values() if articles and not error),
+        'versions': ','.join(sorted(v or '?' for v in versions)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP/2基准测试：同一主机的RSS源通过HTTP/1.1和HTTP/2获取的总耗时")
+    parser.add_argument('--sources', type=int, default=200, help="同一主机上的RSS源数量")
+    parser.add_argument('--fetch-workers', type=int, default=16, help="下载线程数")
+    parser.add_argument('--concurrency', type=int, default=16, help="host_limits 中该主机的并发请求数")
+    parser.add_argument('--handshake-ms', type=float, default=60, help="每个新连接的建立耗时（毫秒）")
+    local_servers.add_feed_arguments(parser)
+    args = parser.parse_args()
+
+    if not rss_monitor.http2_available():
+        sys.exit('需要安装 httpx[http2]: pip install "httpx[http2]"')
+
+    options = dict(local_servers.DEFAULT_FEED_OPTIONS, **local_servers.feed_options_from_args(args))
+    h1_stats, h2_stats = local_servers.Stats(), local_servers.Stats()
+    h1_server = start_h1_server(options, args.handshake_ms, h1_stats)
+    h2_server = H2cServer(options, args.handshake_ms, h2_stats)
+    h2_server.start()
+
+    results = [
+        run('HTTP/1.1', h1_server.server_address[1], args),
+        run('HTTP/2', h2_server.server_address[1], args),
+    ]
+    results[0]['connections'] = h1_stats.snapshot().get('connections', 0)
+    results[1]['connections'] = h2_stats.snapshot().get('connections', 0)
+
+    print(f"{args.sources} 个RSS源（同一主机），下载线程 {args.fetch_workers}，"
+          f"握手 {args.handshake_ms:.0f}ms，响应延迟 {args.latency_ms:.0f}ms")
+    print(f"{'协议':<10}{'成功':>6}{'连接数':>8}{'下载(s)':>10}{'含解析(s)':>11}  实际协议")
+    for r in results:
+        print(f"{r['protocol']:<10}{r['ok']:>6}{r['connections']:>8}{r['fetch_seconds']:>10.2f}{r['seconds']:>11.2f}"
+              f"  {r['versions']}")
+    print(f"\n下载阶段加速比: {results[0]['fetch_seconds'] / results[1]['fetch_seconds']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON Feed基准测试 - 同样的内容分别以RSS XML和JSON Feed解析
+
+用法:
+    python benchmarks/bench_json_feed.py --feeds 50 --entries 50
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rss_monitor import parse_feed_content  # noqa: E402
+
+
+def build_items(index: int, entries: int, summary_size: int):
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    paragraph = "<p>Lorem <b>ipsum</b> dolor sit amet, <a href='https://example.com'>consectetur</a> &amp; adipiscing elit.</p>"
+    summary = (paragraph * (summary_size // len(paragraph) + 1))[:summary_size]
+    return [{
+        'title': f"Feed {index} item {i} & <news>",
+        'url': f"https://example.com/{index}/{i}",
+        'date': now - timedelta(minutes=i),
+        'summary': summary,
+    } for i in range(entries)]
+
+
+def to_rss(index: int, items) -> bytes:
+    entries = ''.join(
+        f"<item><title>{item['title'].replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')}</title>"
+        f"<link>{item['url']}</link><guid>{item['url']}</guid>"
+        f"<pubDate>{format_datetime(item['date'], usegmt=True)}</pubDate>"
+        f"<description><![CDATA[{item['summary']}]]></description></item>"
+        for item in items
+    )
+    return (f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>Feed {index}</title>'
+            f'<link>https://example.com/{index}</link>{entries}</channel></rss>').encode('utf-8')
+
+
+def to_json_feed(index: int, items) -> bytes:
+    return json.dumps({
+        'version': 'https://jsonfeed.org/version/1.1',
+        'title': f"Feed {index}",
+        'home_page_url': f"https://example.com/{index}",
+        'items': [{
+            'id': item['url'],
+            'url': item['url'],
+            'title': item['title'],
+            'content_html': item['summary'],
+            'date_published': item['date'].isoformat(),
+        } for item in items],
+    }, ensure_ascii=False).encode('utf-8')
+
+
+def measure(contents, max_entries, repeat):
+    best = None
+    articles = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        articles = [parse_feed_content(content, url, max_entries, log=lambda *a: None) for url, content in contents]
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, articles
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON Feed基准测试：RSS XML vs JSON Feed")
+    parser.add_argument('--feeds', type=int, default=50, help="合成RSS源数量")
+    parser.add_argument('--entries', type=int, default=50, help="每个RSS源的条目数")
+    parser.add_argument('--summary-size', type=int, default=2000, help="每条摘要的HTML字节数")
+    parser.add_argument('--repeat', type=int, default=3, help="耗时取多次运行的最小值")
+    args = parser.parse_args()
+
+    feeds = [(f"https://example.com/{i}/rss", build_items(i, args.entries, args.summary_size)) for i in range(args.feeds)]
+    xml = [(url, to_rss(i, items)) for i, (url, items) in enumerate(feeds)]
+    jsonfeed = [(url, to_json_feed(i, items)) for i, (url, items) in enumerate(feeds)]
+
+    xml_seconds, xml_articles = measure(xml, args.entries, args.repeat)
+    json_seconds, json_articles = measure(jsonfeed, args.entries, args.repeat)
+
+    # 两种格式应得到相同的文章（ID、标题、发布时间）
+    same = all(
+        (a.article_id, a.title, a.published_ts) == (b.article_id, b.title, b.published_ts)
+        for xa, ja in zip(xml_articles, json_articles) for a, b in zip(xa, ja)
+    )
+    total = args.feeds * args.entries
+    print(f"{args.feeds} 个RSS源 × {args.entries} 条，摘要 {args.summary_size} 字节")
+    print(f"{'格式':<12}{'大小(KB)':>10}{'耗时(s)':>10}{'每条(µs)':>12}")
+    for name, contents, seconds in (('rss-xml', xml, xml_seconds), ('json-feed', jsonfeed, json_seconds)):
+        size = sum(len(content) for _, content in contents) / 1024
+        print(f"{name:<12}{size:>10.0f}{seconds:>10.3f}{seconds / total * 1e6:>12.1f}")
+    print(f"\n加速比: {xml_seconds / json_seconds:.1f}x，文章一致: {'是' if same else '否'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+热点路径微基准测试 - 基于 benchmarks/corpus/ 中的真实形态RSS样本
+
+覆盖: 完整解析、feedparser解析、fix_xml_entities、HTML清理、发布时间解析、
+get_article_id，以及Discord/飞书消息构建。结果按"每条目耗时"输出为JSON，
+可以与保存的基线比较，发现单条目开销的回退。
+
+用法:
+    python benchmarks/bench_micro.py --output bench_baseline.json          # 保存基线
+    python benchmarks/bench_micro.py --compare bench_baseline.json         # 与基线比较
+    python benchmarks/bench_micro.py --compare bench_baseline.json --threshold 0.15
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import feedparser  # noqa: E402
+
+import rss_monitor  # noqa: E402
+from rss_monitor import clean_html, fix_xml_entities, parse_feed_content, parse_published_time  # noqa: E402
+
+CORPUS_DIR = os.path.join(BENCH_DIR, 'corpus')
+
+
+def make_monitor() -> rss_monitor.RSSMonitor:
+    """在临时目录中创建只用于调用消息构建方法的RSSMonitor"""
+    workdir = tempfile.mkdtemp(prefix='rss_bench_')
+    config_file = os.path.join(workdir, 'config.json')
+    with open(config_file, 'w', encoding='utf-8') as f:
+        json.dump({'rss_sources': [], 'state_file': os.path.join(workdir, 'rss_state.json'),
+                   'outbox_file': os.path.join(workdir, 'rss_outbox.json'),
+                   'digest_file': os.path.join(workdir, 'rss_digest.json')}, f)
+    return rss_monitor.RSSMonitor(config_file)
+
+
+def time_per_entry(func: Callable[[], None], entries: int, repeat: int, min_time: float) -> float:
+    """返回每条目耗时（纳秒），取多轮中最快的一轮"""
+    # 先确定每轮循环次数，使单轮耗时不少于 min_time
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or loops >= 1 << 20:
+            break
+        loops *= 2
+
+    best = elapsed / loops
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        best = min(best, (time.perf_counter() - started) / loops)
+    return best / max(entries, 1) * 1e9
+
+
+def build_cases(monitor: rss_monitor.RSSMonitor, name: str, content: bytes) -> Dict[str, tuple]:
+    """为一个语料文件构建所有基准用例: {用例名: (函数, 条目数)}"""
+    quiet = lambda message: None  # noqa: E731
+    feed = feedparser.parse(content)
+    text = content.decode('utf-8', errors='replace')
+    entries = feed.entries
+    articles = parse_feed_content(content, name, max_entries=len(entries) or 1, log=quiet)
+    raw_fields = [e.get('title', '') for e in entries] + [e.get('summary', e.get('description', '')) for e in entries]
+    count = len(entries)
+
+    def run_parse():
+        parse_feed_content(content, name, max_entries=count, log=quiet)
+
+    def run_feedparser():
+        feedparser.parse(content)
+
+    def run_fix_entities():
+        fix_xml_entities(text)
+
+    def run_clean_html():
+        for field in raw_fields:
+            clean_html(field)
+
+    def run_published_time():
+        for entry in entries:
+            parse_published_time(entry)
+
+    def run_article_id():
+        for article in articles:
+            monitor.get_article_id(article)
+
+    def run_discord_message():
+        for article in articles:
+            monitor.build_discord_message(article, 'bench')
+
+    def run_feishu_message():
+        for article in articles:
+            monitor.build_feishu_message(article, 'bench')
+
+    return {
+        'parse_feed_content': (run_parse, count),
+        'feedparser.parse': (run_feedparser, count),
+        'fix_xml_entities': (run_fix_entities, count),
+        'clean_html': (run_clean_html, count),
+        'parse_published_time': (run_published_time, count),
+        'get_article_id': (run_article_id, len(articles)),
+        'build_discord_message': (run_discord_message, len(articles)),
+        'build_feishu_message': (run_feishu_message, len(articles)),
+    }
+
+
+def run_benchmarks(selected: List[str], repeat: int, min_time: float) -> Dict:
+    monitor = make_monitor()
+    results = {}
+    for path in sorted(glob.glob(os.path.join(CORPUS_DIR, '*.xml'))):
+        corpus = os.path.splitext(os.path.basename(path))[0]
+        with open(path, 'rb') as f:
+            content = f.read()
+        # 解析过程中的提示信息不影响计时
+        with contextlib.redirect_stdout(io.StringIO()):
+            cases = build_cases(monitor, corpus, content)
+        for case, (func, entries) in cases.items():
+            key = f"{corpus}/{case}"
+            if selected and not any(s in key for s in selected):
+                continue
+            with contextlib.redirect_stdout(io.StringIO()):
+                per_entry_ns = time_per_entry(func, entries, repeat, min_time)
+            results[key] = {'per_entry_ns': round(per_entry_ns, 1), 'entries': entries, 'bytes': len(content)}
+            print(f"   {key:<45}{per_entry_ns / 1000:>12.2f} µs/条目")
+    return results
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> int:
+    """与基线比较，返回回退的用例数"""
+    regressions = 0
+    print(f"\n{'用例':<45}{'基线(µs)':>12}{'当前(µs)':>12}{'变化':>10}")
+    for key, current in results.items():
+        base = baseline.get(key)
+        if not base:
+            print(f"{key:<45}{'-':>12}{current['per_entry_ns'] / 1000:>12.2f}{'新增':>10}")
+            continue
+        ratio = current['per_entry_ns'] / base['per_entry_ns'] - 1
+        flag = ''
+        if ratio > threshold:
+            flag = ' ❌ 回退'
+            regressions += 1
+        elif ratio < -threshold:
+            flag = ' ✅ 提升'
+        print(f"{key:<45}{base['per_entry_ns'] / 1000:>12.2f}{current['per_entry_ns'] / 1000:>12.2f}"
+              f"{ratio * 100:>+9.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RSS解析与消息构建热点路径微基准测试")
+    parser.add_argument('--output', help="把结果写入JSON文件（可作为基线）")
+    parser.add_argument('--compare', metavar='BASELINE', help="与保存的基线JSON比较")
+    parser.add_argument('--threshold', type=float, default=0.10, help="判定回退的相对阈值（默认0.10，即10%%）")
+    parser.add_argument('--repeat', type=int, default=5, help="每个用例的测量轮数，取最快一轮")
+    parser.add_argument('--min-time', type=float, default=0.05, help="每轮最少运行时间（秒）")
+    parser.add_argument('--filter', action='append', default=[], help="只运行名称包含该字符串的用例，可重复")
+    args = parser.parse_args()
+
+    print(f"语料目录: {CORPUS_DIR}")
+    results = run_benchmarks(args.filter, args.repeat, args.min_time)
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'feedparser': feedparser.__version__,
+        },
+        'results': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已写入: {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {regressions} 个用例超过回退阈值 {args.threshold * 100:.0f}%")
+            return 1
+        print(f"\n✅ 没有超过 {args.threshold * 100:.0f}% 的回退")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+解析阶段基准测试 - 比较单进程解析与进程池解析大量RSS内容的吞吐量
+
+用法:
+    python benchmarks/bench_parse_pool.py --feeds 200 --entries 50 --workers 4
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from email.utils import formatdate
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rss_monitor import parse_feed_job  # noqa: E402
+
+
+def build_feed(index: int, entries: int, summary_size: int) -> bytes:
+    """生成一个合成RSS源，摘要是较大的HTML片段"""
+    now = time.time()
+    paragraph = "<p>Lorem <b>ipsum</b> dolor sit amet, <a href='https://example.com'>consectetur</a> &amp; adipiscing elit.</p>"
+    summary = (paragraph * (summary_size // len(paragraph) + 1))[:summary_size]
+    items = []
+    for i in range(entries):
+        items.append(
+            f"<item><title>Feed {index} item {i} &amp; &lt;news&gt;</title>"
+            f"<link>https://example.com/{index}/{i}</link>"
+            f"<guid>https://example.com/{index}/{i}</guid>"
+            f"<pubDate>{formatdate(now - i * 60, usegmt=True)}</pubDate>"
+            f"<description><![CDATA[{summary}]]></description></item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+        f"<title>Feed {index}</title><link>https://example.com/{index}</link>"
+        + ''.join(items) + "</channel></rss>"
+    ).encode('utf-8')
+
+
+def run_single(jobs):
+    return [parse_feed_job(job) for job in jobs]
+
+
+def run_pool(jobs, workers, chunksize):
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(parse_feed_job, jobs, chunksize=chunksize))
+
+
+def measure(name, func, jobs, total_entries):
+    started = time.perf_counter()
+    results = func(jobs)
+    elapsed = time.perf_counter() - started
+    parsed = sum(len(result[0] or []) for result in results)
+    return {
+        'mode': name,
+        'seconds': round(elapsed, 3),
+        'feeds_per_second': round(len(jobs) / elapsed, 1),
+        'entries_per_second': round(total_entries / elapsed, 1),
+        'articles': parsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="解析阶段基准测试：单进程 vs 进程池")
+    parser.add_argument('--feeds', type=int, default=200, help="合成RSS源数量")
+    parser.add_argument('--entries', type=int, default=50, help="每个RSS源的条目数")
+    parser.add_argument('--summary-size', type=int, default=4000, help="每条摘要的HTML字节数")
+    parser.add_argument('--max-entries', type=int, default=50, help="每个RSS源提取的文章数上限")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help="解析进程数")
+    parser.add_argument('--chunksize', type=int, default=4, help="每次分发给解析进程的RSS源数")
+    parser.add_argument('--json', help="把结果写入JSON文件")
+    args = parser.parse_args()
+
+    print(f"生成合成语料: {args.feeds} 个RSS源 × {args.entries} 条...")
+    jobs = [(build_feed(i, args.entries, args.summary_size), f"https://example.com/{i}/rss", args.max_entries)
+            for i in range(args.feeds)]
+    total_bytes = sum(len(job[0]) for job in jobs)
+    total_entries = args.feeds * min(args.entries, args.max_entries)
+    print(f"语料大小: {total_bytes / 1024 / 1024:.1f} MB")
+
+    results = [
+        measure('single', run_single, jobs, total_entries),
+        measure(f'pool-{args.workers}', lambda j: run_pool(j, args.workers, args.chunksize), jobs, total_entries),
+    ]
+
+    print(f"\n{'模式':<12}{'耗时(秒)':>10}{'源/秒':>10}{'条目/秒':>12}")
+    for r in results:
+        print(f"{r['mode']:<12}{r['seconds']:>10}{r['feeds_per_second']:>10}{r['entries_per_second']:>12}")
+    speedup = results[0]['seconds'] / results[1]['seconds']
+    print(f"\n进程池加速比: {speedup:.2f}x")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'corpus_bytes': total_bytes, 'results': results, 'speedup': round(speedup, 2)},
+                      f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
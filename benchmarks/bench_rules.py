@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+规则引擎基准测试 - Aho-Corasick自动机 vs 逐条正则
+
+生成 --rules 条关键词规则和 --articles 篇合成文章，比较:
+    regex-each    每条规则一个正则，逐条 search
+    rule-engine   rss_rules.RuleEngine（所有关键词一个自动机）
+
+用法:
+    python benchmarks/bench_rules.py --rules 500 --articles 5000
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rss_rules import RuleEngine  # noqa: E402
+
+WORDS = ['芯片', '模型', '发布', 'release', 'update', 'security', '漏洞', 'GPU', 'open', 'source',
+         '融资', '开源', 'benchmark', 'python', 'rust', '推理', 'agent', 'cloud', '数据库', 'kernel']
+
+
+def make_rules(count: int, rng: random.Random):
+    rules = []
+    for i in range(count):
+        keyword = f"{rng.choice(WORDS)}{i}"
+        action = 'exclude' if i % 3 == 0 else 'include'
+        rules.append({'name': f"r{i}", 'keywords': [keyword], 'action': action})
+    return rules
+
+
+def make_articles(count: int, rule_count: int, rng: random.Random):
+    articles = []
+    for _ in range(count):
+        words = [rng.choice(WORDS) for _ in range(12)]
+        if rng.random() < 0.2:
+            words.append(f"{rng.choice(WORDS)}{rng.randrange(rule_count)}")
+        summary = ' '.join(rng.choice(WORDS) for _ in range(40))
+        articles.append({'title': ' '.join(words), 'summary': summary, 'link': 'https://example.com/'})
+    return articles
+
+
+def main():
+    parser = argparse.ArgumentParser(description="规则引擎基准测试")
+    parser.add_argument('--rules', type=int, default=500, help="关键词规则数")
+    parser.add_argument('--articles', type=int, default=5000, help="文章数")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rules = make_rules(args.rules, rng)
+    articles = make_articles(args.articles, args.rules, rng)
+    source = {'url': 'https://example.com/feed'}
+
+    started = time.perf_counter()
+    patterns = [re.compile(re.escape(rule['keywords'][0]), re.IGNORECASE) for rule in rules]
+    compile_regex = time.perf_counter() - started
+    started = time.perf_counter()
+    regex_hits = 0
+    for article in articles:
+        text = f"{article['title']}\n{article['summary']}"
+        regex_hits += sum(1 for pattern in patterns if pattern.search(text))
+    regex_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    engine = RuleEngine(rules)
+    compile_engine = time.perf_counter() - started
+    started = time.perf_counter()
+    for article in articles:
+        engine.evaluate(article, source)
+    engine_seconds = time.perf_counter() - started
+    engine_hits = sum(engine.hits.values())
+
+    print(f"规则 {args.rules} 条，文章 {args.articles} 篇")
+    print(f"{'方式':<14}{'编译(ms)':>10}{'匹配(s)':>10}{'每篇(µs)':>12}{'命中':>8}")
+    for name, compile_seconds, seconds, hits in (('regex-each', compile_regex, regex_seconds, regex_hits),
+                                                 ('rule-engine', compile_engine, engine_seconds, engine_hits)):
+        print(f"{name:<14}{compile_seconds * 1000:>10.1f}{seconds:>10.3f}{seconds / args.articles * 1e6:>12.1f}{hits:>8}")
+    print(f"\n加速比: {regex_seconds / engine_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
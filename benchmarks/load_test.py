@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+端到端压力测试 - 用本地模拟的RSS源和Webhook服务器运行 RSSMonitor.check_and_push
+
+报告每秒运行次数、各阶段（下载、解析、筛选、推送）耗时的p50/p99，以及进程内存峰值。
+
+用法:
+    python benchmarks/load_test.py --sources 2000 --runs 3 --fetch-workers 16
+    python benchmarks/load_test.py --sources 500 --latency-ms 50 --error-rate 0.05 --malformed-rate 0.1
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import local_servers  # noqa: E402
+import rss_monitor  # noqa: E402
+
+
+def serve(queue, feed_options):
+    """子进程中运行模拟服务器，避免和被测进程争抢GIL"""
+    feed_server, webhook_server, _ = local_servers.start_servers(**feed_options)
+    queue.put((feed_server.server_address[1], webhook_server.server_address[1]))
+    while True:
+        time.sleep(3600)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+class StageTimer:
+    """给 RSSMonitor 的各阶段方法计时"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    def wrap(self, stage: str, func):
+        samples = self.samples[stage]
+
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                samples.append(time.perf_counter() - started)
+        return timed
+
+    def instrument(self, monitor: rss_monitor.RSSMonitor):
+        monitor.download_feed = self.wrap('download', monitor.download_feed)
+        monitor.filter_recent_articles = self.wrap('filter', monitor.filter_recent_articles)
+        monitor.post_message = self.wrap('deliver', monitor.post_message)
+        monitor.save_state = self.wrap('save_state', monitor.save_state)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RSSMonitor端到端压力测试")
+    parser.add_argument('--sources', type=int, default=1000, help="RSS源数量")
+    parser.add_argument('--runs', type=int, default=3, help="运行 check_and_push 的次数")
+    parser.add_argument('--destination', choices=['discord', 'feishu'], default='feishu', help="推送目的地")
+    parser.add_argument('--fetch-workers', type=int, default=1, help="下载线程数（fetch_workers）")
+    parser.add_argument('--parse-workers', type=int, default=0, help="解析进程数（parse_workers）")
+    parser.add_argument('--no-sleep', action='store_true', help="去掉推送之间固定的 time.sleep，只测处理开销")
+    parser.add_argument('--verbose', action='store_true', help="显示 RSSMonitor 的控制台输出")
+    parser.add_argument('--json', help="把结果写入JSON文件")
+    local_servers.add_feed_arguments(parser)
+    args = parser.parse_args()
+
+    queue = multiprocessing.Queue()
+    server_process = multiprocessing.Process(target=serve, args=(queue, local_servers.feed_options_from_args(args)),
+                                             daemon=True)
+    server_process.start()
+    feed_port, webhook_port = queue.get(timeout=10)
+
+    workdir = tempfile.mkdtemp(prefix='rss_load_test_')
+    os.chdir(workdir)
+    config = {
+        f'{args.destination}_webhook': f'http://127.0.0.1:{webhook_port}/{args.destination}/0',
+        'fetch_workers': args.fetch_workers,
+        'parse_workers': args.parse_workers,
+        'rss_sources': [{'name': f'源{i}', 'url': f'http://127.0.0.1:{feed_port}/feed/{i}'}
+                        for i in range(args.sources)],
+    }
+    with open('config.json', 'w', encoding='utf-8') as f:
+        json.dump(config, f, ensure_ascii=False)
+
+    if args.no_sleep:
+        rss_monitor.time.sleep = lambda seconds: None
+
+    print(f"工作目录: {workdir}")
+    print(f"RSS源: {args.sources} 个，运行 {args.runs} 次，目的地: {args.destination}")
+
+    timer = StageTimer()
+    # parse_feed_content 是模块级函数，替换模块属性即可计时（仅主进程内解析时有效）
+    rss_monitor.parse_feed_content = timer.wrap('parse', rss_monitor.parse_feed_content)
+
+    run_times = []
+    for run in range(args.runs):
+        started = time.perf_counter()
+        output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+        with output:
+            monitor = rss_monitor.RSSMonitor()
+            timer.instrument(monitor)
+            monitor.check_and_push()
+        elapsed = time.perf_counter() - started
+        run_times.append(elapsed)
+        timer.samples['run'].append(elapsed)
+        print(f"   第 {run + 1} 次运行: {elapsed:.2f} 秒")
+
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    total = sum(run_times)
+    result = {
+        'sources': args.sources,
+        'runs': args.runs,
+        'runs_per_second': round(args.runs / total, 4) if total else 0,
+        'sources_per_second': round(args.sources * args.runs / total, 1) if total else 0,
+        'peak_rss_mb': round(peak_rss_mb, 1),
+        'stages': {
+            stage: {
+                'count': len(values),
+                'p50_ms': round(percentile(values, 50) * 1000, 3),
+                'p99_ms': round(percentile(values, 99) * 1000, 3),
+                'total_s': round(sum(values), 3),
+            }
+            for stage, values in timer.samples.items()
+        },
+    }
+
+    print(f"\n每秒运行次数: {result['runs_per_second']}（每秒处理 {result['sources_per_second']} 个RSS源）")
+    print(f"内存峰值: {result['peak_rss_mb']} MB")
+    print(f"\n{'阶段':<12}{'次数':>8}{'p50(ms)':>12}{'p99(ms)':>12}{'合计(s)':>10}")
+    for stage, values in result['stages'].items():
+        print(f"{stage:<12}{values['count']:>8}{values['p50_ms']:>12}{values['p99_ms']:>12}{values['total_s']:>10}")
+
+    with contextlib.suppress(Exception):
+        import urllib.request
+        with urllib.request.urlopen(f'http://127.0.0.1:{webhook_port}/stats', timeout=5) as response:
+            result['server_stats'] = json.loads(response.read())
+        print(f"\n服务器统计: {result['server_stats']}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+    server_process.terminate()
+
+
+if __name__ == "__main__":
+    main()
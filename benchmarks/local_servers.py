@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地模拟服务器 - 合成RSS/Atom源 + 模拟Discord/飞书Webhook（带限流）
+
+RSS源服务器:
+    GET /feed/<i>        第i个合成RSS源（RSS 2.0或Atom），可配置大小、延迟、错误率和损坏实体
+Webhook服务器:
+    POST /discord/<id>   模拟Discord Webhook，每个Webhook每2秒最多5次，超出返回429
+    POST /feishu/<id>    模拟飞书自定义机器人，每分钟100次、每秒5次，超出返回 code=9499
+    GET  /stats          请求计数
+
+单独运行:
+    python benchmarks/local_servers.py --feed-port 8001 --webhook-port 8002
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rss_ratelimit import TokenBucket  # noqa: E402
+
+DEFAULT_FEED_OPTIONS = {
+    'entries': 20,          # 每个源的条目数
+    'fresh': 1,             # 其中10分钟内发布的条目数
+    'summary_size': 500,    # 摘要HTML字节数
+    'latency_ms': 0,        # 响应延迟
+    'latency_jitter_ms': 0, # 延迟抖动
+    'error_rate': 0.0,      # 返回500/403/404的概率
+    'malformed_rate': 0.0,  # 插入未定义实体的概率
+    'atom_ratio': 0.0,      # Atom格式源的比例
+    'seed': 1,
+}
+
+
+def render_feed(index: int, options: Dict, now: Optional[float] = None) -> bytes:
+    """生成第index个合成源（同一时刻对同一index的输出是确定的）"""
+    now = time.time() if now is None else now
+    rng = random.Random(options['seed'] * 1000003 + index)
+    atom = rng.random() < options['atom_ratio']
+    malformed = rng.random() < options['malformed_rate']
+
+    paragraph = "<p>Synthetic <b>summary</b> text with a <a href='https://example.com'>link</a>.</p>"
+    summary = (paragraph * (options['summary_size'] // len(paragraph) + 1))[:options['summary_size']]
+    entity = '&nbsp;&hellip;&foo;' if malformed else '&amp;'
+
+    items = []
+    for i in range(options['entries']):
+        # 新条目在10分钟内，其余都是1小时以前的
+        age = i * 30 if i < options['fresh'] else 3600 + i * 60
+        published = now - age
+        title = f"Feed {index} item {i} {entity} news"
+        link = f"https://example.com/{index}/{i}"
+        if atom:
+            stamp = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(published))
+            items.append(
+                f"<entry><title>{title}</title><link href=\"{link}\"/><id>{link}</id>"
+                f"<updated>{stamp}</updated><published>{stamp}</published>"
+                f"<summary type=\"html\"><![CDATA[{summary}]]></summary></entry>"
+            )
+        else:
+            items.append(
+                f"<item><title>{title}</title><link>{link}</link><guid>{link}</guid>"
+                f"<pubDate>{formatdate(published, usegmt=True)}</pubDate>"
+                f"<description><![CDATA[{summary}]]></description></item>"
+            )
+
+    if atom:
+        body = ('<?xml version="1.0" encoding="utf-8"?><feed xmlns="http://www.w3.org/2005/Atom">'
+                f"<title>Feed {index}</title><id>urn:feed:{index}</id>" + ''.join(items) + "</feed>")
+    else:
+        body = ('<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+                f"<title>Feed {index}</title><link>https://example.com/{index}</link>"
+                + ''.join(items) + "</channel></rss>")
+    return body.encode('utf-8')
+
+
+class Stats:
+    """线程安全的请求计数"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts: Dict[str, int] = {}
+
+    def incr(self, key: str):
+        with self.lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.counts)
+
+
+def make_feed_handler(options: Dict, stats: Stats):
+    error_rng = random.Random(options['seed'])
+    error_lock = threading.Lock()
+
+    class FeedHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            match = re.match(r'^/feed/(\d+)', self.path)
+            if not match:
+                self.send_error(404)
+                return
+
+            delay = options['latency_ms'] + random.uniform(0, options['latency_jitter_ms'])
+            if delay > 0:
+                time.sleep(delay / 1000)
+
+            with error_lock:
+                failed = error_rng.random() < options['error_rate']
+                status = error_rng.choice([500, 403, 404]) if failed else 200
+            if status != 200:
+                stats.incr(f'feed_{status}')
+                self.send_response(status)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            body = render_feed(int(match.group(1)), options)
+            stats.incr('feed_200')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/xml; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return FeedHandler
+
+
+def make_webhook_handler(stats: Stats):
+    buckets: Dict[str, TokenBucket] = {}
+    buckets_lock = threading.Lock()
+
+    def get_bucket(key: str, rate: float, capacity: float) -> TokenBucket:
+        with buckets_lock:
+            if key not in buckets:
+                buckets[key] = TokenBucket(rate, capacity)
+            return buckets[key]
+
+    class WebhookHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def send_json(self, status: int, payload: Dict, headers: Optional[Dict] = None):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/stats':
+                self.send_json(200, stats.snapshot())
+            else:
+                self.send_error(404)
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            body = self.rfile.read(length)
+
+            if self.path.startswith('/discord/'):
+                # Discord Webhook: 每个Webhook每2秒5次
+                wait = get_bucket(self.path, 5 / 2, 5).try_acquire()
+                if wait > 0:
+                    stats.incr('discord_429')
+                    self.send_json(429, {'message': 'You are being rate limited.', 'retry_after': round(wait, 3),
+                                         'global': False}, {'Retry-After': str(max(1, round(wait)))})
+                    return
+                stats.incr('discord_ok')
+                self.send_response(204)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+            elif self.path.startswith('/feishu/'):
+                if length > 20 * 1024:
+                    stats.incr('feishu_too_large')
+                    self.send_json(200, {'code': 9499, 'msg': 'request body too large'})
+                    return
+                # 飞书自定义机器人: 每分钟100次、每秒5次
+                per_second = get_bucket(self.path + '#s', 5, 5)
+                per_minute = get_bucket(self.path + '#m', 100 / 60, 100)
+                if per_second.try_acquire() > 0 or per_minute.try_acquire() > 0:
+                    stats.incr('feishu_rate_limited')
+                    self.send_json(200, {'code': 9499, 'msg': 'too many request'})
+                    return
+                json.loads(body or b'{}')
+                stats.incr('feishu_ok')
+                self.send_json(200, {'code': 0, 'msg': 'success', 'data': {}})
+            else:
+                self.send_error(404)
+
+    return WebhookHandler
+
+
+def start_servers(feed_port: int = 0, webhook_port: int = 0, **feed_options):
+    """在后台线程中启动两个服务器，返回 (RSS源服务器, Webhook服务器, 统计)"""
+    options = dict(DEFAULT_FEED_OPTIONS, **feed_options)
+    stats = Stats()
+    feed_server = ThreadingHTTPServer(('127.0.0.1', feed_port), make_feed_handler(options, stats))
+    webhook_server = ThreadingHTTPServer(('127.0.0.1', webhook_port), make_webhook_handler(stats))
+    for server in (feed_server, webhook_server):
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    return feed_server, webhook_server, stats
+
+
+def add_feed_arguments(parser: argparse.ArgumentParser):
+    """合成RSS源的命令行参数（load_test.py 共用）"""
+    parser.add_argument('--entries', type=int, default=DEFAULT_FEED_OPTIONS['entries'], help="每个源的条目数")
+    parser.add_argument('--fresh', type=int, default=DEFAULT_FEED_OPTIONS['fresh'], help="每个源中10分钟内的新条目数")
+    parser.add_argument('--summary-size', type=int, default=DEFAULT_FEED_OPTIONS['summary_size'], help="摘要HTML字节数")
+    parser.add_argument('--latency-ms', type=float, default=0, help="RSS源响应延迟（毫秒）")
+    parser.add_argument('--latency-jitter-ms', type=float, default=0, help="延迟抖动（毫秒）")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="RSS源返回错误的概率")
+    parser.add_argument('--malformed-rate', type=float, default=0.0, help="RSS源包含未定义实体的概率")
+    parser.add_argument('--atom-ratio', type=float, default=0.0, help="Atom格式源的比例")
+    parser.add_argument('--seed', type=int, default=1, help="随机种子")
+
+
+def feed_options_from_args(args) -> Dict:
+    return {
+        'entries': args.entries,
+        'fresh': args.fresh,
+        'summary_size': args.summary_size,
+        'latency_ms': args.latency_ms,
+        'latency_jitter_ms': args.latency_jitter_ms,
+        'error_rate': args.error_rate,
+        'malformed_rate': args.malformed_rate,
+        'atom_ratio': args.atom_ratio,
+        'seed': args.seed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地模拟RSS源与Webhook服务器")
+    parser.add_argument('--feed-port', type=int, default=8001)
+    parser.add_argument('--webhook-port', type=int, default=8002)
+    add_feed_arguments(parser)
+    args = parser.parse_args()
+
+    feed_server, webhook_server, _ = start_servers(args.feed_port, args.webhook_port, **feed_options_from_args(args))
+    print(f"RSS源:   http://127.0.0.1:{feed_server.server_address[1]}/feed/<i>")
+    print(f"Webhook: http://127.0.0.1:{webhook_server.server_address[1]}/discord/<id> | /feishu/<id>")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -2,26 +2,30 @@
 # -*- coding: utf-8 -*-
 """
 从GitHub Secrets创建配置文件
+
+rss_monitor.py --from-env 也直接使用这里的 config_from_env() 读取环境变量，校验逻辑保持一致。
 """
 
 import json
 import os
+from typing import Dict, Mapping, Optional
 
-def main():
-    """从环境变量创建config.json"""
-    discord_webhook = os.getenv('DISCORD_WEBHOOK', '')
-    feishu_webhook = os.getenv('FEISHU_WEBHOOK', '')
-    rss_sources_json = os.getenv('RSS_SOURCES', '')
-    
-    print("=" * 50)
-    print("🔧 从GitHub Secrets创建配置文件")
-    print("=" * 50)
+
+def config_from_env(environ: Optional[Mapping[str, str]] = None) -> Optional[Dict]:
+    """从环境变量 DISCORD_WEBHOOK / FEISHU_WEBHOOK / RSS_SOURCES 构建配置
+
+    校验失败时输出原因并返回None。
+    """
+    environ = os.environ if environ is None else environ
+    discord_webhook = environ.get('DISCORD_WEBHOOK', '')
+    feishu_webhook = environ.get('FEISHU_WEBHOOK', '')
+    rss_sources_json = environ.get('RSS_SOURCES', '')
     
     # 检查至少有一个Webhook
     if not discord_webhook and not feishu_webhook:
         print("❌ 未设置 DISCORD_WEBHOOK 或 FEISHU_WEBHOOK 环境变量")
         print("   请在GitHub仓库 Settings → Secrets 中添加至少一个Webhook")
-        return 1
+        return None
     
     if discord_webhook:
         print(f"✅ DISCORD_WEBHOOK: 已设置 ({discord_webhook[:30]}...)")
@@ -38,7 +42,7 @@ def main():
         print("   请在GitHub仓库 Settings → Secrets 中添加 RSS_SOURCES")
         print("   格式示例：")
         print('   [{"name": "网站名称", "url": "https://example.com/rss"}]')
-        return 1
+        return None
     
     print(f"✅ RSS_SOURCES: 已设置 (长度: {len(rss_sources_json)} 字符)")
     
@@ -48,7 +52,7 @@ def main():
         if not isinstance(rss_sources, list):
             print("❌ RSS_SOURCES 必须是JSON数组格式")
             print("   正确格式: [{\"name\": \"网站名称\", \"url\": \"RSS链接\"}]")
-            return 1
+            return None
         
         print(f"✅ RSS源数量: {len(rss_sources)}")
         for i, source in enumerate(rss_sources, 1):
@@ -74,7 +78,7 @@ def main():
         print('       "url": "https://another-example.com/feed"')
         print('     }')
         print('   ]')
-        return 1
+        return None
     
     # 构建配置
     config = {}
@@ -83,6 +87,18 @@ def main():
     if feishu_webhook:
         config["feishu_webhook"] = feishu_webhook
     config["rss_sources"] = rss_sources
+    return config
+
+
+def main():
+    """从环境变量创建config.json"""
+    print("=" * 50)
+    print("🔧 从GitHub Secrets创建配置文件")
+    print("=" * 50)
+    
+    config = config_from_env()
+    if config is None:
+        return 1
     
     # 写入配置文件
     with open('config.json', 'w', encoding='utf-8') as f:
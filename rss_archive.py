@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+推送归档 - 把每篇已推送的文章追加到SQLite数据库，带FTS5全文索引
+
+状态文件只能整个读入后查找；归档库可以直接回答"X推送过没有""某个源上周推送了什么"。
+运行中推送成功的文章先缓存在内存里，运行结束时在一个事务中批量写入，不拖慢推送。
+
+命令行:
+    python rss_archive.py search 关键词 --source rsshub --since 7d
+    python rss_archive.py seen https://example.com/post/1
+    python rss_archive.py export --since 2024-01-01 --format csv -o pushed.csv
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_ARCHIVE_FILE = "rss_archive.db"
+
+COLUMNS = ('article_key', 'source_url', 'source_name', 'destination', 'title', 'summary', 'link',
+           'published', 'published_ts', 'delivered_at')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    article_key TEXT NOT NULL,
+    source_url TEXT NOT NULL,
+    source_name TEXT NOT NULL,
+    destination TEXT NOT NULL,
+    title TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    link TEXT NOT NULL,
+    published TEXT NOT NULL,
+    published_ts INTEGER,
+    delivered_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS articles_link ON articles (link);
+CREATE INDEX IF NOT EXISTS articles_source ON articles (source_url, delivered_at);
+CREATE INDEX IF NOT EXISTS articles_delivered ON articles (delivered_at);
+"""
+
+# 外部内容表：全文索引只保存倒排索引，文本仍在 articles 表中；只追加，插入时由触发器同步
+# trigram 分词对中文按子串匹配（SQLite 3.34+），更早的版本退回 unicode61
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, summary, content='articles', content_rowid='id', tokenize='{tokenizer}'
+);
+CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts (rowid, title, summary) VALUES (new.id, new.title, new.summary);
+END;
+"""
+
+# trigram 分词下，少于3个字符的词无法用 MATCH 查询，改用 LIKE
+TRIGRAM_MIN_LENGTH = 3
+
+
+def parse_since(value: Optional[str]) -> Optional[float]:
+    """解析时间参数：7d / 12h / 30m 表示距今多久，或 ISO 日期/时间（本地时间），返回时间戳"""
+    if not value:
+        return None
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)\s*([dhm])', value.strip().lower())
+    if match:
+        unit = {'d': 86400, 'h': 3600, 'm': 60}[match.group(2)]
+        return time.time() - float(match.group(1)) * unit
+    try:
+        return datetime.fromisoformat(value.strip()).timestamp()
+    except ValueError:
+        raise ValueError(f"无法解析的时间: {value}（示例: 7d、12h、2024-01-31、2024-01-31T08:00）")
+
+
+class Archive:
+    """已推送文章的SQLite归档
+
+    add() 只放进内存中的待写入列表，flush() 在一个事务中批量写入；
+    数据库在第一次写入或查询时才打开，没有推送文章的运行不会创建文件。
+    """
+
+    def __init__(self, path: str = DEFAULT_ARCHIVE_FILE):
+        self.path = path
+        self.pending: List[tuple] = []
+        self.conn: Optional[sqlite3.Connection] = None
+        self.fts = False
+        self.tokenizer: Optional[str] = None
+
+    def open(self) -> sqlite3.Connection:
+        if self.conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self.conn = conn
+            self.init_fts()
+        return self.conn
+
+    def init_fts(self):
+        """创建全文索引；SQLite没有编译FTS5时只能按 LIKE 查询"""
+        row = self.conn.execute("SELECT sql FROM sqlite_master WHERE name = 'articles_fts'").fetchone()
+        if row is not None:
+            self.fts = True
+            self.tokenizer = 'trigram' if 'trigram' in row['sql'] else 'unicode61'
+            return
+        for tokenizer in ('trigram', 'unicode61'):
+            try:
+                self.conn.executescript(FTS_SCHEMA.format(tokenizer=tokenizer))
+            except sqlite3.OperationalError:
+                continue
+            self.fts = True
+            self.tokenizer = tokenizer
+            # 已有数据（如之前没有FTS5时写入的）补建索引
+            self.conn.execute("INSERT INTO articles_fts (articles_fts) VALUES ('rebuild')")
+            self.conn.commit()
+            return
+        print("⚠️ SQLite不支持FTS5，归档搜索将使用 LIKE 逐行匹配")
+
+    def add(self, records: Iterable[Dict], destination: str, source_name: str = "",
+            delivered_at: Optional[float] = None):
+        """加入一批已推送成功的文章记录（rss_monitor 的 records 格式），等待 flush 写入"""
+        delivered_at = time.time() if delivered_at is None else delivered_at
+        for record in records:
+            self.pending.append((
+                record['key'],
+                record.get('source', ''),
+                source_name,
+                destination,
+                record.get('title', ''),
+                record.get('summary', ''),
+                record.get('link', ''),
+                record.get('published', ''),
+                record.get('published_ts'),
+                delivered_at,
+            ))
+
+    def flush(self) -> int:
+        """把待写入的记录在一个事务中批量写入，返回写入条数"""
+        if not self.pending:
+            return 0
+        rows, self.pending = self.pending, []
+        try:
+            conn = self.open()
+            with conn:
+                conn.executemany(
+                    f"INSERT INTO articles ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})", rows)
+        except sqlite3.Error:
+            # 事务已回滚，放回待写入列表，下次 flush 时重试
+            self.pending = rows + self.pending
+            raise
+        return len(rows)
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def search(self, query: str = "", source: Optional[str] = None, destination: Optional[str] = None,
+               since: Optional[float] = None, until: Optional[float] = None, limit: Optional[int] = 50) -> List[Dict]:
+        """按全文（标题、摘要）、来源、目的地和推送时间查询，按推送时间倒序
+
+        query: FTS5查询语法（如 "python AND 发布"）；没有FTS5或词太短时按子串匹配
+        source: 匹配来源URL或名称中的子串
+        """
+        conn = self.open()
+        where, params = [], []
+        joined = False
+        # 引号中的短语作为一个词
+        words = [word.strip('"') for word in re.findall(r'"[^"]*"|\S+', query)]
+        words = [word for word in words if word]
+        if words:
+            if self.fts and (self.tokenizer != 'trigram' or all(len(w) >= TRIGRAM_MIN_LENGTH for w in words)):
+                joined = True
+                where.append("articles_fts MATCH ?")
+                params.append(query)
+            else:
+                for word in words:
+                    where.append("(a.title LIKE ? OR a.summary LIKE ?)")
+                    params += [f"%{word}%", f"%{word}%"]
+        if source:
+            where.append("(instr(a.source_url, ?) > 0 OR instr(a.source_name, ?) > 0)")
+            params += [source, source]
+        if destination:
+            where.append("a.destination = ?")
+            params.append(destination)
+        if since is not None:
+            where.append("a.delivered_at >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("a.delivered_at < ?")
+            params.append(until)
+
+        sql = "SELECT a.* FROM articles a"
+        if joined:
+            sql += " JOIN articles_fts ON articles_fts.rowid = a.id"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY a.delivered_at DESC, a.id DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [self.to_dict(row) for row in conn.execute(sql, params)]
+
+    def seen(self, link: str) -> List[Dict]:
+        """按链接精确查找推送记录（用索引，不扫描全表）"""
+        rows = self.open().execute(
+            "SELECT * FROM articles WHERE link = ? ORDER BY delivered_at DESC", (link,))
+        return [self.to_dict(row) for row in rows]
+
+    @staticmethod
+    def to_dict(row: sqlite3.Row) -> Dict:
+        record = {key: row[key] for key in COLUMNS}
+        record['delivered_at'] = datetime.fromtimestamp(row['delivered_at']).isoformat(timespec='seconds')
+        return record
+
+
+def export(records: List[Dict], fmt: str, out):
+    """导出为 csv / jsonl / json"""
+    if fmt == 'csv':
+        writer = csv.DictWriter(out, fieldnames=COLUMNS)
+        writer.writeheader()
+        writer.writerows(records)
+    elif fmt == 'jsonl':
+        for record in records:
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+    else:
+        json.dump(records, out, ensure_ascii=False, indent=2)
+        out.write('\n')
+
+
+def print_records(records: List[Dict]):
+    for record in records:
+        print(f"{record['delivered_at']}  [{record['source_name'] or record['source_url']} → {record['destination']}]  "
+              f"{record['title']}")
+        if record['link']:
+            print(f"    {record['link']}")
+    print(f"\n共 {len(records)} 条")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="查询和导出已推送文章的归档")
+    parser.add_argument('--db', default=DEFAULT_ARCHIVE_FILE, help=f"归档数据库（默认 {DEFAULT_ARCHIVE_FILE}）")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    def add_filters(command, default_limit):
+        command.add_argument('query', nargs='?', default='', help="全文搜索（标题、摘要），支持FTS5语法")
+        command.add_argument('--source', help="来源URL或名称包含的文字")
+        command.add_argument('--destination', choices=('discord', 'feishu'), help="推送目的地")
+        command.add_argument('--since', help="推送时间下限，如 7d、12h、2024-01-31")
+        command.add_argument('--until', help="推送时间上限（不含）")
+        command.add_argument('--limit', type=int, default=default_limit, help=f"最多返回条数（默认 {default_limit}，0为不限）")
+
+    search = commands.add_parser('search', help="搜索推送记录")
+    add_filters(search, 50)
+    search.add_argument('--json', action='store_true', help="输出JSON")
+    seen = commands.add_parser('seen', help="按链接查询是否推送过（推送过时退出码为0，否则为1）")
+    seen.add_argument('link')
+    export_command = commands.add_parser('export', help="导出推送记录")
+    add_filters(export_command, 0)
+    export_command.add_argument('--format', choices=('csv', 'jsonl', 'json'), default='csv', help="导出格式（默认 csv）")
+    export_command.add_argument('-o', '--output', help="输出文件（默认输出到终端）")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"❌ 归档数据库不存在: {args.db}（在配置中设置 archive_file 后，推送的文章会写入归档）")
+        return 2
+    archive = Archive(args.db)
+    try:
+        if args.command == 'seen':
+            records = archive.seen(args.link)
+            if records:
+                print_records(records)
+                return 0
+            print("未推送过")
+            return 1
+
+        try:
+            since, until = parse_since(args.since), parse_since(args.until)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 2
+        records = archive.search(args.query, source=args.source, destination=args.destination,
+                                 since=since, until=until, limit=args.limit or None)
+        if args.command == 'export':
+            if args.output:
+                with open(args.output, 'w', encoding='utf-8', newline='') as f:
+                    export(records, args.format, f)
+                print(f"✅ 已导出 {len(records)} 条到 {args.output}")
+            else:
+                export(records, args.format, sys.stdout)
+        elif args.json:
+            export(records, 'json', sys.stdout)
+        else:
+            print_records(records)
+        return 0
+    except sqlite3.OperationalError as e:
+        # 如FTS5查询语法错误
+        print(f"❌ 查询失败: {e}")
+        return 2
+    finally:
+        archive.close()
+
+
+if __name__ == "__main__":
+    exit(main())
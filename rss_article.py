@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+紧凑的文章记录 - 代替每篇文章一个dict
+
+- 使用 __slots__，没有每个对象的 __dict__
+- 发布时间保存为整数时间戳（UTC），需要时再转换为datetime
+- 来源URL使用 sys.intern，同一RSS源的文章（包括从解析进程传回的）共用一个字符串
+- 文章ID和Discord转义文本在第一次使用时才计算并缓存
+
+保留 dict 风格的 get / [] / in 访问，原来按dict读取文章的代码不需要修改。
+"""
+
+import calendar
+import hashlib
+import html
+import re
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+EPOCH = datetime(1970, 1, 1)
+
+# 可以按dict方式读取的字段
+KEYS = ('title', 'link', 'published', 'published_time', 'summary', 'source')
+
+
+def to_timestamp(value: Optional[datetime]) -> Optional[int]:
+    """把（UTC的）naive datetime 转换为整数时间戳"""
+    return calendar.timegm(value.timetuple()) if value else None
+
+
+def clean_html(text: str) -> str:
+    """移除HTML标签并反转义HTML实体"""
+    text = re.sub(r'<[^>]+>', '', text)
+    return html.unescape(text).strip()
+
+
+def escape_discord(text: str) -> str:
+    """转义Discord Markdown特殊字符，避免格式问题"""
+    return text.replace('*', '\\*').replace('_', '\\_').replace('`', '\\`').replace('~', '\\~')
+
+
+def discord_text(title: str, summary: str) -> Tuple[str, str]:
+    """Discord消息中的标题和摘要：移除HTML标签、反转义并转义Markdown"""
+    if title:
+        title = html.unescape(re.sub(r'<[^>]+>', '', title)).strip()
+    else:
+        title = "无标题"
+    title = escape_discord(title)
+    if summary:
+        summary = escape_discord(html.unescape(re.sub(r'<[^>]+>', '', summary)).strip())
+    return title, summary or ''
+
+
+class Article:
+    """一篇文章"""
+
+    __slots__ = ('title', 'link', 'published', 'published_ts', 'summary', 'source', '_article_id', '_discord')
+
+    def __init__(self, title: str, link: str, published: str, published_ts: Optional[int], summary: str, source: str):
+        self.title = title
+        self.link = link
+        self.published = published
+        self.published_ts = published_ts
+        self.summary = summary
+        self.source = sys.intern(source)
+        self._article_id: Optional[str] = None
+        self._discord: Optional[Tuple[str, str]] = None
+
+    @property
+    def published_time(self) -> Optional[datetime]:
+        """发布时间（UTC的naive datetime），没有时为None"""
+        return None if self.published_ts is None else EPOCH + timedelta(seconds=self.published_ts)
+
+    @property
+    def article_id(self) -> str:
+        """文章唯一ID：优先使用link，如果没有则使用title+published"""
+        if self._article_id is None:
+            identifier = self.link or f"{self.title}{self.published}"
+            self._article_id = hashlib.md5(identifier.encode('utf-8')).hexdigest()
+        return self._article_id
+
+    def discord_text(self) -> Tuple[str, str]:
+        if self._discord is None:
+            self._discord = discord_text(self.title, self.summary)
+        return self._discord
+
+    # dict 兼容接口
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in KEYS else default
+
+    def __getitem__(self, key: str):
+        if key not in KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in KEYS
+
+    def keys(self):
+        return KEYS
+
+    def to_dict(self) -> Dict:
+        return {key: getattr(self, key) for key in KEYS}
+
+    # pickle时不带缓存字段，还原时重新intern来源URL
+    def __getstate__(self):
+        return self.title, self.link, self.published, self.published_ts, self.summary, self.source
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    def __repr__(self) -> str:
+        return f"Article({self.title[:30]!r}, {self.link!r})"
+
+
+def published_timestamp(article) -> Optional[float]:
+    """文章发布时间戳，兼容 Article 和 dict"""
+    if isinstance(article, Article):
+        return article.published_ts
+    return to_timestamp(article.get('published_time'))
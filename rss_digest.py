@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+摘要推送 - 按时间窗口累积新文章，窗口关闭时合并为一条消息推送
+"""
+
+import time
+from typing import Dict, List, Optional
+
+from rss_journal import load_json, write_json_atomic
+
+
+class DigestStore:
+    """跨运行持久化的摘要缓冲区
+
+    每个 (目的地, RSS源) 一个缓冲区，第一篇文章进入时开启窗口，
+    满足以下任一条件时窗口关闭：
+    - 距窗口开启已超过 interval_minutes 分钟
+    - 累积文章数达到 max_items
+    """
+
+    def __init__(self, path: str = "rss_digest.json"):
+        self.path = path
+        self.buffers: Dict[str, Dict] = self.load()
+        self.dirty = False
+
+    def load(self) -> Dict:
+        """加载摘要缓冲文件"""
+        return load_json(self.path)
+
+    def save(self):
+        """保存摘要缓冲文件（先写临时文件再替换）"""
+        if not self.dirty:
+            return
+        write_json_atomic(self.path, self.buffers)
+        self.dirty = False
+
+    @staticmethod
+    def buffer_key(destination: str, source_url: str) -> str:
+        return f"{destination}|{source_url}"
+
+    def contains(self, source_key: str) -> bool:
+        """检查文章是否已在摘要缓冲区中"""
+        for buffer in self.buffers.values():
+            for item in buffer['items']:
+                if item['key'] == source_key:
+                    return True
+        return False
+
+    def add(self, destination: str, source_url: str, source_name: str, settings: Dict, item: Dict) -> bool:
+        """加入一篇文章，窗口因此达到 max_items 时返回True
+
+        item: {"key": source_key, "title": ..., "link": ..., "published": ...}
+        达到 max_items 的窗口立即关闭（换一个键等待 pop_closed 取出），之后的文章进入新窗口，
+        一次运行中的新文章再多，每条摘要也不会超过 max_items 篇。
+        """
+        key = self.buffer_key(destination, source_url)
+        buffer = self.buffers.get(key)
+        if buffer is None:
+            buffer = self.buffers[key] = {
+                'destination': destination,
+                'source_url': source_url,
+                'source_name': source_name,
+                'opened_at': time.time(),
+                'items': [],
+            }
+        # 配置可能变化，以最新配置为准
+        buffer['interval_minutes'] = settings.get('interval_minutes', 60)
+        buffer['max_items'] = settings.get('max_items', 20)
+        buffer['source_name'] = source_name
+        buffer['items'].append(item)
+        self.dirty = True
+        if len(buffer['items']) < buffer['max_items']:
+            return False
+        closed_key, n = f"{key}|closed", 1
+        while closed_key in self.buffers:
+            n += 1
+            closed_key = f"{key}|closed-{n}"
+        self.buffers[closed_key] = self.buffers.pop(key)
+        return True
+
+    def is_closed(self, buffer: Dict, now: Optional[float] = None) -> bool:
+        """窗口是否已关闭"""
+        now = time.time() if now is None else now
+        if len(buffer['items']) >= buffer.get('max_items', 20):
+            return True
+        return now - buffer['opened_at'] >= buffer.get('interval_minutes', 60) * 60
+
+    def pop_closed(self, now: Optional[float] = None) -> List[Dict]:
+        """取出所有已关闭的窗口"""
+        closed = []
+        for key in list(self.buffers):
+            buffer = self.buffers[key]
+            if buffer['items'] and self.is_closed(buffer, now):
+                closed.append(self.buffers.pop(key))
+                self.dirty = True
+        return closed
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RSS内容的流式读取 - 压缩协商、限制大小，拿到足够的条目后提前结束
+
+边下载边解压，不把整个响应读进内存:
+- Accept-Encoding 只声明能解压的编码：gzip、deflate，以及安装了 brotli / zstandard 时的 br、zstd
+- 自己按块解压原始字节流，分别记录传输字节数（压缩后）和解压后的字节数
+- 服务器标错编码时（声明gzip但内容未压缩，或未声明但内容是gzip/zstd）按内容的魔数识别，不会解析出乱码
+- 解压后的内容超过 max_bytes 时停止读取（每次最多解压出 CHUNK_SIZE 字节，高压缩比的内容不会一次占满内存）
+- XML格式的RSS/Atom在读到第 max_entries 个 </item> / </entry> 后停止读取，
+  在该条目后补上根元素的结束标签，得到一份只含前N条的完整文档
+"""
+
+import itertools
+import re
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional
+
+CHUNK_SIZE = 64 * 1024
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+
+# 条目结束标签（允许命名空间前缀，如 </atom:entry>）
+ENTRY_END = re.compile(rb'</(?:[A-Za-z0-9_]+:)?(?:item|entry)\s*>')
+# 根元素 -> 截断后补上的结束标签
+ROOT_CLOSERS = (
+    (re.compile(rb'<(?:[A-Za-z0-9_]+:)?feed[\s>]'), b'</feed>'),
+    (re.compile(rb'<rdf:RDF[\s>]'), b'</rdf:RDF>'),
+    (re.compile(rb'<rss[\s>]'), b'</channel></rss>'),
+)
+
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+_encodings: Optional[List[str]] = None
+
+
+class FeedTooLarge(Exception):
+    """内容超过大小上限，且没有可以保留的完整条目"""
+
+
+def available_encodings() -> List[str]:
+    """本机能解压的内容编码（brotli / zstandard 是可选依赖）"""
+    global _encodings
+    if _encodings is None:
+        _encodings = ['gzip', 'deflate']
+        try:
+            import brotli  # noqa: F401
+            _encodings.append('br')
+        except ImportError:
+            try:
+                import brotlicffi  # noqa: F401
+                _encodings.append('br')
+            except ImportError:
+                pass
+        try:
+            import zstandard  # noqa: F401
+            _encodings.append('zstd')
+        except ImportError:
+            pass
+    return _encodings
+
+
+def accept_encoding() -> str:
+    return ', '.join(available_encodings())
+
+
+class Decompressor:
+    """单个内容编码的增量解压器
+
+    gzip / deflate 每次最多输出 CHUNK_SIZE 字节，高压缩比的内容（或压缩炸弹）也不会一次解压出大块数据，
+    读到大小上限或足够条目时可以及时停止。
+    """
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding in ('gzip', 'x-gzip'):
+            self.obj = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == 'deflate':
+            # 规范是zlib格式，但不少服务器发送的是不带头的raw deflate，首块失败时再换
+            self.obj = zlib.decompressobj()
+        elif encoding == 'br':
+            try:
+                import brotli
+            except ImportError:
+                import brotlicffi as brotli
+            self.obj = brotli.Decompressor()
+        elif encoding == 'zstd':
+            import zstandard
+            self.obj = zstandard.ZstdDecompressor().decompressobj()
+        else:
+            raise ValueError(f"不支持的内容编码: {encoding}")
+        self.zlib = encoding in ('gzip', 'x-gzip', 'deflate')
+        self.started = False
+
+    def decompress(self, data: bytes) -> Iterator[bytes]:
+        if not self.zlib:
+            self.started = True
+            yield self.obj.process(data) if hasattr(self.obj, 'process') else self.obj.decompress(data)
+            return
+        while data:
+            try:
+                piece = self.obj.decompress(data, CHUNK_SIZE)
+            except zlib.error:
+                if self.encoding != 'deflate' or self.started:
+                    raise
+                self.obj = zlib.decompressobj(-zlib.MAX_WBITS)
+                piece = self.obj.decompress(data, CHUNK_SIZE)
+            self.started = True
+            yield piece
+            data = self.obj.unconsumed_tail
+
+    def flush(self) -> bytes:
+        return self.obj.flush() if self.zlib else b''
+
+
+def sniff_encoding(head: bytes) -> Optional[str]:
+    """按魔数识别实际的压缩格式，未压缩时返回None"""
+    if head.startswith(GZIP_MAGIC):
+        return 'gzip'
+    if head.startswith(ZSTD_MAGIC) and 'zstd' in available_encodings():
+        return 'zstd'
+    return None
+
+
+def choose_decoders(first: bytes, declared: List[str]):
+    """根据声明的编码和首块内容选择解压器（按解压顺序排列，未压缩时为空），返回 (解压器列表, 首块解压结果的迭代器)"""
+    if declared:
+        try:
+            # 多重编码按声明的逆序解压；先解出第一块确认编码和内容相符
+            decoders = [Decompressor(e) for e in reversed(declared)]
+            pieces = run_decoders(decoders, first)
+            head = next(pieces, b'')
+            return decoders, itertools.chain((head,), pieces)
+        except Exception:
+            pass  # 服务器标错了编码，按内容识别
+    actual = sniff_encoding(first)
+    decoders = [Decompressor(actual)] if actual else []
+    return decoders, run_decoders(decoders, first)
+
+
+def run_decoders(decoders: List[Decompressor], data: bytes) -> Iterator[bytes]:
+    """依次经过各层解压器，逐块输出"""
+    if not decoders:
+        yield data
+        return
+    for piece in decoders[0].decompress(data):
+        if piece:
+            yield from run_decoders(decoders[1:], piece)
+
+
+def flush_decoders(decoders: List[Decompressor]) -> Iterator[bytes]:
+    for i, decoder in enumerate(decoders):
+        tail = decoder.flush()
+        if tail:
+            yield from run_decoders(decoders[i + 1:], tail)
+
+
+def decode_chunks(raw_chunks: Iterable[bytes], content_encoding: Optional[str] = None,
+                  stats: Optional[Dict] = None) -> Iterator[bytes]:
+    """把原始（可能压缩的）字节流按块解压
+
+    stats 记录 wire_bytes（读取的原始字节数）和 encoding（实际使用的编码，未压缩为 identity）。
+    声明的编码与内容不符时按内容的魔数识别；识别后中途才解压失败说明内容损坏，抛出ValueError。
+    """
+    stats = {} if stats is None else stats
+    stats['wire_bytes'] = 0
+    declared = [e.strip().lower() for e in (content_encoding or '').split(',')]
+    declared = [e for e in declared if e and e != 'identity']
+    decoders = None
+    for chunk in raw_chunks:
+        if not chunk:
+            continue
+        stats['wire_bytes'] += len(chunk)
+        if decoders is None:
+            decoders, pieces = choose_decoders(chunk, declared)
+            stats['encoding'] = ','.join(d.encoding for d in reversed(decoders)) or 'identity'
+        else:
+            pieces = run_decoders(decoders, chunk)
+        try:
+            yield from pieces
+        except Exception as e:
+            raise ValueError(f"内容解压失败（{stats['encoding']}）: {e}")
+    if decoders:
+        yield from flush_decoders(decoders)
+
+
+def root_closer(head: bytes) -> Optional[bytes]:
+    """根据文档开头判断根元素，返回截断后需要补上的结束标签；不是XML格式的RSS/Atom时返回None"""
+    for pattern, closer in ROOT_CLOSERS:
+        if pattern.search(head):
+            return closer
+    return None
+
+
+def truncate_after_entries(content: bytes, max_entries: int, closer: bytes) -> Optional[bytes]:
+    """保留前 max_entries 个条目（不足时保留所有完整条目），补上结束标签；没有完整条目时返回None"""
+    end = None
+    for count, match in enumerate(ENTRY_END.finditer(content), 1):
+        end = match.end()
+        if count >= max_entries:
+            break
+    if end is None:
+        return None
+    return content[:end] + closer
+
+
+def read_body(chunks, max_bytes: int = DEFAULT_MAX_BYTES, max_entries: Optional[int] = None,
+              stats: Optional[Dict] = None) -> bytes:
+    """从解压后的内容块中读取RSS内容
+
+    max_bytes: 解压后内容的上限；超过时保留已读到的完整条目，没有完整条目时抛出FeedTooLarge
+    max_entries: 读到这么多个条目后提前结束（只对XML格式的RSS/Atom生效）
+    stats: 传入字典时记录 bytes_read（实际读取的解压后字节数）和 truncated（'entries' / 'size' / None）
+    """
+    buffer = bytearray()
+    closer = None
+    checked_root = False
+    entries = 0
+    scan_from = 0
+    truncated = None
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+        buffer += chunk
+        if not checked_root and (len(buffer) >= 1024 or ENTRY_END.search(buffer)):
+            closer = root_closer(bytes(buffer[:4096]))
+            checked_root = True
+        if closer is not None and max_entries:
+            # 只扫描新读到的部分；向前多看一点，跨块的结束标签按结束位置只计一次
+            start = max(0, scan_from - 64)
+            entries += sum(1 for match in ENTRY_END.finditer(buffer, start) if match.end() > scan_from)
+            scan_from = len(buffer)
+            if entries >= max_entries:
+                truncated = 'entries'
+                break
+        if len(buffer) > max_bytes:
+            truncated = 'size'
+            break
+
+    if stats is not None:
+        stats['bytes_read'] = len(buffer)
+        stats['truncated'] = truncated
+    if truncated is None:
+        return bytes(buffer)
+
+    if closer is None and not checked_root:
+        closer = root_closer(bytes(buffer[:4096]))
+    content = truncate_after_entries(bytes(buffer), max_entries or len(buffer), closer) if closer else None
+    if content is None:
+        raise FeedTooLarge(f"RSS内容超过大小上限 {max_bytes / 1024:.0f} KB")
+    return content
+
+
+def read_response(response, max_bytes: int = DEFAULT_MAX_BYTES, max_entries: Optional[int] = None,
+                  stats: Optional[Dict] = None) -> bytes:
+    """读取 requests 的流式响应（stream=True），提前结束时关闭连接
+
+    stats 额外记录 wire_bytes、encoding（见 decode_chunks）和
+    bytes_skipped：按 Content-Length 计算的未读取的传输字节数（未知时为None）
+    """
+    stats = {} if stats is None else stats
+    raw_chunks = response.raw.stream(CHUNK_SIZE, decode_content=False)
+    try:
+        chunks = decode_chunks(raw_chunks, response.headers.get('Content-Encoding'), stats)
+        content = read_body(chunks, max_bytes, max_entries, stats)
+    finally:
+        response.close()
+    stats['bytes_skipped'] = 0
+    if stats.get('truncated'):
+        length = response.headers.get('Content-Length', '')
+        stats['bytes_skipped'] = max(0, int(length) - stats['wire_bytes']) if length.isdigit() else None
+    return content
+
+
+def read_stream(stream, content_encoding: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES,
+                max_entries: Optional[int] = None, stats: Optional[Dict] = None) -> bytes:
+    """读取文件式的流（如 urllib 的响应）"""
+    chunks = decode_chunks(iter(lambda: stream.read(CHUNK_SIZE), b''), content_encoding, stats)
+    return read_body(chunks, max_bytes, max_entries, stats)
+
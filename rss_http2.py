@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+可选的HTTP/2下载后端 - 同一上游的所有请求复用一个连接（多路复用）
+
+依赖 httpx[http2]（可选，pip install "httpx[http2]"），按主机在 host_limits 中开启:
+- "http2": true             HTTPS通过ALPN协商HTTP/2，服务器不支持时由httpx自动使用HTTP/1.1
+- "http2": "prior_knowledge" 明文HTTP直接使用HTTP/2（h2c，如内网自建的RSSHub）
+
+没有安装httpx，或与某个主机的HTTP/2通信反复出现协议错误时，该主机改回 requests（HTTP/1.1）；
+连接被重置、GOAWAY 这类暂时性错误先在HTTP/2上重试。"prior_knowledge" 的主机只支持h2c，从不改用HTTP/1.1。
+响应包装成与 requests 流式响应相同的接口，rss_http.read_response 可以直接读取。
+"""
+
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, Set, Tuple
+
+from rss_ratelimit import host_of
+
+# HTTP/2禁止的逐跳请求头
+HOP_BY_HOP_HEADERS = ('connection', 'keep-alive', 'proxy-connection', 'transfer-encoding', 'upgrade')
+
+HTTP2_MODES = (True, 'prior_knowledge')
+
+# 暂时性传输错误在HTTP/2上的重试次数和间隔（秒，逐次递增）
+HTTP2_RETRIES = 2
+HTTP2_RETRY_DELAY = 0.2
+
+
+class Http2Unavailable(Exception):
+    """本次请求不能使用HTTP/2，调用方应改用HTTP/1.1"""
+
+
+def http2_available() -> bool:
+    try:
+        import httpx  # noqa: F401
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class Http2Response:
+    """把 httpx 的流式响应包装成 requests 流式响应的接口（rss_monitor / rss_http 用到的部分）"""
+
+    def __init__(self, response, elapsed: float):
+        self.response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.url = str(response.url)
+        self.http_version = response.http_version
+        self.elapsed = timedelta(seconds=elapsed)
+        # read_response 通过 response.raw.stream() 读取未解压的原始字节
+        self.raw = self
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    def stream(self, amount: int, decode_content: bool = False):
+        return self.response.iter_raw(amount)
+
+    def raise_for_status(self):
+        if not self.ok:
+            import requests
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+    def close(self):
+        self.response.close()
+
+
+class Http2Client:
+    """按模式共享的 httpx 客户端；同一主机的并发请求在一个连接上多路复用（线程安全）"""
+
+    def __init__(self, timeout: Tuple[float, float] = (10, 30)):
+        self.timeout = timeout
+        self.clients: Dict[object, object] = {}
+        # 出现过协议错误、改用HTTP/1.1的主机
+        self.fallback_hosts: Set[str] = set()
+        self.lock = threading.Lock()
+
+    def usable(self, url: str, mode) -> bool:
+        return mode in HTTP2_MODES and host_of(url) not in self.fallback_hosts and http2_available()
+
+    def client(self, mode):
+        with self.lock:
+            client = self.clients.get(mode)
+            if client is None:
+                import httpx
+                timeout = httpx.Timeout(self.timeout[1], connect=self.timeout[0])
+                client = self.clients[mode] = httpx.Client(
+                    http1=mode != 'prior_knowledge', http2=True, timeout=timeout, follow_redirects=True,
+                    limits=httpx.Limits(max_connections=None, max_keepalive_connections=None),
+                )
+            return client
+
+    def get(self, url: str, headers: Dict, mode) -> Http2Response:
+        """发送流式GET请求
+
+        暂时性错误（连接重置、GOAWAY等）先重试 HTTP2_RETRIES 次；仍然失败时：
+        - "prior_knowledge" 的主机抛出 requests.ConnectionError，与HTTP/1.1请求失败一样处理（不能改用HTTP/1.1）
+        - 其他主机抛出Http2Unavailable，由调用方改用HTTP/1.1；协议错误时记住该主机，以后直接用HTTP/1.1
+        """
+        import httpx
+
+        headers = {k: v for k, v in headers.items() if k.lower() not in HOP_BY_HOP_HEADERS}
+        client = self.client(mode)
+        for attempt in range(HTTP2_RETRIES + 1):
+            started = time.perf_counter()
+            try:
+                response = client.send(client.build_request('GET', url, headers=headers), stream=True)
+                return Http2Response(response, time.perf_counter() - started)
+            except (httpx.NetworkError, httpx.RemoteProtocolError) as e:
+                error = e
+                if attempt < HTTP2_RETRIES:
+                    time.sleep(HTTP2_RETRY_DELAY * (attempt + 1))
+            except httpx.TransportError as e:
+                # 超时、本地协议错误、不支持的协议等，重试无益
+                error = e
+                break
+
+        message = f"{type(error).__name__}: {error}"
+        if mode == 'prior_knowledge':
+            import requests
+            raise requests.exceptions.ConnectionError(f"HTTP/2 (h2c) 请求失败: {message}") from error
+        if isinstance(error, (httpx.RemoteProtocolError, httpx.LocalProtocolError, httpx.UnsupportedProtocol)):
+            with self.lock:
+                self.fallback_hosts.add(host_of(url))
+        raise Http2Unavailable(message) from error
+
+    def close(self):
+        with self.lock:
+            for client in self.clients.values():
+                client.close()
+            self.clients.clear()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+状态日志 - 推送成功的那一刻就把记录追加到日志文件，进程中途被杀也不会重复推送
+
+- 日志是追加写的JSON Lines（rss_state.json.journal），每条推送一行，追加的开销与状态大小无关
+- 快照：整个状态先写临时文件再替换（os.replace），然后清空日志；写到一半崩溃不会损坏状态文件
+- 加载：读取快照后按顺序重放日志；最后一行不完整（写入时崩溃）时忽略
+- 快照替换后、清空日志前崩溃，下次会把日志再重放一遍，重放是幂等的
+- 追加和快照都持有日志文件的 flock，多个进程共用同一个日志时也不会丢记录（合并保存模式）
+"""
+
+import json
+import os
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+JOURNAL_SUFFIX = '.journal'
+
+Key = Union[str, List[str]]
+
+
+def write_atomic(path: str, content: Union[str, bytes], fsync: bool = True):
+    """先写临时文件再替换，写入中断不会留下半个文件，读取方也不会看到写了一半的文件
+
+    fsync: 替换前把临时文件落盘（断电也不丢）；报告、缓存这类可以重新生成的文件可以关闭
+    写入失败时删除临时文件，原文件保持不变
+    """
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'wb' if isinstance(content, bytes) else 'w',
+                  **({} if isinstance(content, bytes) else {'encoding': 'utf-8'})) as f:
+            f.write(content)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_json_atomic(path: str, data, fsync: bool = True, indent: Optional[int] = 2):
+    """原子写入JSON文件（见 write_atomic）"""
+    write_atomic(path, json.dumps(data, ensure_ascii=False, indent=indent), fsync)
+
+
+def load_json(path: str, default=None):
+    """读取JSON文件，不存在时返回 default（默认为空字典）"""
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {} if default is None else default
+
+
+@contextmanager
+def file_lock(f):
+    """独占文件锁（没有fcntl的平台上不加锁）"""
+    if fcntl is None:
+        yield
+        return
+    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def apply_entry(state: Dict, entry: Dict):
+    """把一条日志应用到状态上；k 是顶层键，或 [键, 子键, ...] 路径"""
+    path = entry['k'] if isinstance(entry['k'], list) else [entry['k']]
+    target = state
+    for key in path[:-1]:
+        child = target.get(key)
+        if not isinstance(child, dict):
+            child = target[key] = {}
+        target = child
+    target[path[-1]] = entry['v']
+
+
+class StateJournal:
+    """状态文件的追加写日志
+
+    path: 日志文件路径（默认为 状态文件 + .journal）
+    fsync: 每条记录写入后是否 fsync（关闭后只保证进程被杀时不丢，不保证断电时不丢）
+    """
+
+    def __init__(self, state_file: str, path: Optional[str] = None, fsync: bool = True):
+        self.state_file = state_file
+        self.path = path or state_file + JOURNAL_SUFFIX
+        self.fsync = fsync
+        self.file = None
+        # 上次快照以来追加的记录数
+        self.count = 0
+
+    def replay(self, state: Dict) -> int:
+        """按顺序重放日志，返回应用的记录数"""
+        if not os.path.exists(self.path):
+            return 0
+        applied = 0
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # 写到一半崩溃留下的不完整行（只可能是最后一行）
+                    print(f"⚠️ 状态日志中有不完整的记录，已忽略: {self.path}")
+                    break
+                apply_entry(state, entry)
+                applied += 1
+        self.count = applied
+        return applied
+
+    def ensure_open(self):
+        if self.file is None:
+            self.file = open(self.path, 'a', encoding='utf-8')
+        return self.file
+
+    def append(self, key: Key, value):
+        """追加一条记录：写入后立即落盘"""
+        f = self.ensure_open()
+        with file_lock(f):
+            f.write(json.dumps({'k': key, 'v': value}, ensure_ascii=False) + '\n')
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        self.count += 1
+
+    def snapshot(self, state: Dict, merge: Optional[Callable[[Dict, Dict], Dict]] = None) -> Dict:
+        """原子地写入完整状态，然后清空日志，返回写入的状态
+
+        merge: 合并保存模式，先重新读取磁盘上的状态并重放日志（可能包含其他进程的记录），
+               用 merge(磁盘上的状态, state) 合并后再写入
+        """
+        f = self.ensure_open()
+        with file_lock(f):
+            if merge is not None:
+                on_disk = load_json(self.state_file)
+                self.replay(on_disk)
+                state = merge(on_disk, state)
+            write_json_atomic(self.state_file, state, self.fsync)
+            # 只清空不删除：其他进程可能还打开着这个日志
+            f.truncate(0)
+        self.count = 0
+        return state
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
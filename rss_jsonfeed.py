@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON Feed（https://jsonfeed.org）快速解析
+
+RSSHub（?format=json）和 rss.app（.json）等上游可以直接输出JSON Feed，
+用 json 模块解码后直接生成文章记录，不经过 feedparser，也不会进入XML实体修复流程。
+"""
+
+import calendar
+import json
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from rss_article import Article, clean_html
+
+JSON_CONTENT_TYPES = ('application/feed+json', 'application/json', 'text/json')
+JSON_ACCEPT = 'application/feed+json, application/json;q=0.9, application/rss+xml;q=0.8, application/xml;q=0.7, */*;q=0.5'
+
+
+def json_feed_url(url: str) -> Optional[str]:
+    """已知支持JSON Feed的上游返回对应的JSON Feed地址，否则返回None"""
+    parts = urlsplit(url)
+    host = (parts.hostname or '').lower()
+    if 'rsshub' in host:
+        query = parse_qsl(parts.query, keep_blank_values=True)
+        if any(key == 'format' for key, _ in query):
+            return None
+        return urlunsplit(parts._replace(query=urlencode(query + [('format', 'json')])))
+    if host == 'rss.app' or host.endswith('.rss.app'):
+        if parts.path.endswith('.xml'):
+            return urlunsplit(parts._replace(path=parts.path[:-4] + '.json'))
+    return None
+
+
+def is_json_feed(content: bytes, content_type: Optional[str] = None) -> bool:
+    """按 Content-Type 判断，没有时看内容的第一个非空白字符（XML不会以 { 开头）"""
+    if content_type:
+        media_type = content_type.split(';')[0].strip().lower()
+        if media_type in JSON_CONTENT_TYPES or media_type.endswith('+json'):
+            return True
+    return content[:64].lstrip(b'\xef\xbb\xbf \t\r\n')[:1] == b'{'
+
+
+def parse_date(value: str) -> Optional[int]:
+    """解析RFC 3339时间为UTC时间戳，没有时区时按UTC处理
+
+    Python 3.11之前的 fromisoformat 不接受1-2位或7-9位小数秒、+0800 这样的时区，
+    解析失败时交给feedparser的日期解析（同时支持RFC 822等格式）
+    """
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except ValueError:
+        from feedparser.datetimes import _parse_date
+        parsed_tuple = _parse_date(value.strip())
+        return calendar.timegm(parsed_tuple) if parsed_tuple else None
+    return calendar.timegm(parsed.utctimetuple() if parsed.tzinfo else parsed.timetuple())
+
+
+def parse_json_feed(content: bytes, url: str, max_entries: int, timings: Optional[Dict] = None,
+                    links: Optional[Dict] = None) -> List[Article]:
+    """解析JSON Feed（最多 max_entries 条），不是合法的JSON Feed时抛出ValueError
+
+    timings: 传入字典时记录 parse（JSON解码）和 clean（HTML清理、时间解析）阶段的耗时
+    """
+    parse_started = time.perf_counter()
+    feed = json.loads(content)
+    if not isinstance(feed, dict) or not isinstance(feed.get('items'), list):
+        raise ValueError("不是JSON Feed（缺少items）")
+    clean_started = time.perf_counter()
+
+    if links is not None:
+        # WebSub: hubs 中 type 为 WebSub 的地址，topic 为 feed_url
+        hub = next((h.get('url') for h in feed.get('hubs') or [] if str(h.get('type', '')).lower() == 'websub'), None)
+        if hub:
+            links['hub'] = hub
+        if feed.get('feed_url'):
+            links['self'] = feed['feed_url']
+
+    articles = []
+    for item in feed['items'][:max_entries]:
+        if not isinstance(item, dict):
+            continue
+        title = item.get('title') or ''
+        summary = item.get('summary') or item.get('content_html') or item.get('content_text') or ''
+        if title:
+            title = clean_html(title)
+        if summary:
+            summary = clean_html(summary)
+        published = item.get('date_published') or item.get('date_modified') or ''
+        articles.append(Article(
+            title=title or '无标题',
+            link=item.get('url') or item.get('external_url') or '',
+            published=published,
+            published_ts=parse_date(published) if published else None,
+            summary=summary[:200],
+            source=url,
+        ))
+    if timings is not None:
+        timings['parse'] = clean_started - parse_started
+        timings['clean'] = time.perf_counter() - clean_started
+    return articles
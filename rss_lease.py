@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+运行租约 - 同一个状态文件同时只允许一个运行，避免重叠的定时任务重复推送、互相覆盖状态
+
+租约文件（rss_state.json.lock）记录持有者和到期时间，持有期间由后台线程定期续期:
+- 租约文件不存在时用 O_EXCL 创建，只有一个进程能成功
+- 持有者崩溃后租约不再续期，到期（或同一台机器上的持有进程已不存在）后可以被接管
+- 接管、续期和释放都在一个短暂的守卫文件（.guard）保护下先确认当前持有者再替换，不会误删别人的租约
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from rss_journal import write_json_atomic
+
+DEFAULT_TTL_SECONDS = 300
+# 守卫文件存在超过这么久说明创建它的进程已经崩溃
+GUARD_STALE_SECONDS = 10
+
+
+def pid_alive(pid: int) -> bool:
+    """同一台机器上的进程是否还在运行（只在POSIX上判断，其他平台视为在运行）"""
+    if os.name != 'posix':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class Lease:
+    """基于文件的运行租约
+
+    path: 租约文件路径
+    ttl: 租约有效期（秒），持有期间每 ttl/3 续期一次
+    """
+
+    def __init__(self, path: str, ttl: float = DEFAULT_TTL_SECONDS):
+        self.path = path
+        self.guard_path = path + '.guard'
+        self.ttl = ttl
+        self.host = socket.gethostname()
+        self.token = f"{self.host}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        # 获取失败时为当前持有者的信息
+        self.holder: Optional[Dict] = None
+        self.took_over = False
+        self.held = False
+        self.stop = threading.Event()
+        self.heartbeat: Optional[threading.Thread] = None
+
+    def info(self) -> Dict:
+        now = time.time()
+        return {'token': self.token, 'host': self.host, 'pid': os.getpid(),
+                'acquired_at': now, 'expires_at': now + self.ttl}
+
+    def read(self) -> Optional[Dict]:
+        """读取当前租约；不存在时返回None，内容不完整（刚创建还没写完）时返回空字典"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            return {}
+
+    def is_stale(self, lease: Dict) -> bool:
+        if not lease:
+            # 内容不完整：创建者在写入前崩溃时按文件修改时间判断
+            try:
+                return os.path.getmtime(self.path) + self.ttl < time.time()
+            except OSError:
+                return False
+        if lease.get('expires_at', 0) < time.time():
+            return True
+        return lease.get('host') == self.host and not pid_alive(lease.get('pid', 0))
+
+    @contextmanager
+    def guard(self):
+        """短暂的互斥区：确认当前持有者和替换租约文件之间不会被其他进程插入"""
+        while True:
+            try:
+                fd = os.open(self.guard_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.close(fd)
+                break
+            except FileExistsError:
+                try:
+                    if os.path.getmtime(self.guard_path) + GUARD_STALE_SECONDS < time.time():
+                        os.remove(self.guard_path)
+                        continue
+                except OSError:
+                    continue
+                time.sleep(0.01)
+        try:
+            yield
+        finally:
+            try:
+                os.remove(self.guard_path)
+            except OSError:
+                pass
+
+    def try_acquire(self) -> bool:
+        try:
+            fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            pass
+        else:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.info(), f)
+            return True
+
+        current = self.read()
+        if current is None or not self.is_stale(current):
+            self.holder = current
+            return False
+        with self.guard():
+            # 确认仍是刚才判断为过期的那个租约，再接管
+            latest = self.read()
+            if latest is None or latest.get('token') != current.get('token') or not self.is_stale(latest):
+                self.holder = latest
+                return False
+            write_json_atomic(self.path, self.info(), fsync=False)
+        self.took_over = True
+        self.holder = current
+        return True
+
+    def acquire(self, wait: float = 0) -> bool:
+        """获取租约，被占用时最多等待 wait 秒；成功后开始定期续期"""
+        deadline = time.monotonic() + wait
+        while not self.try_acquire():
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(min(1.0, max(0.0, deadline - time.monotonic())))
+        self.held = True
+        self.stop.clear()
+        self.heartbeat = threading.Thread(target=self.keep_alive, daemon=True)
+        self.heartbeat.start()
+        return True
+
+    def keep_alive(self):
+        while not self.stop.wait(self.ttl / 3):
+            if not self.renew():
+                print(f"⚠️ 运行租约已被其他进程接管: {self.path}")
+                return
+
+    def renew(self) -> bool:
+        """续期，租约已不属于自己时返回False"""
+        with self.guard():
+            current = self.read()
+            if not current or current.get('token') != self.token:
+                self.held = False
+                return False
+            write_json_atomic(self.path, dict(current, expires_at=time.time() + self.ttl), fsync=False)
+        return True
+
+    def release(self):
+        """停止续期并删除租约（只删除自己的）"""
+        self.stop.set()
+        if self.heartbeat is not None:
+            self.heartbeat.join()
+            self.heartbeat = None
+        if not self.held:
+            return
+        with self.guard():
+            current = self.read()
+            if current and current.get('token') == self.token:
+                os.remove(self.path)
+        self.held = False
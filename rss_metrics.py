@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+运行报告 - 记录每个RSS源各阶段耗时，输出JSON报告和Prometheus文本格式指标
+"""
+
+import copy
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from rss_journal import write_atomic, write_json_atomic
+
+# 各阶段名称
+STAGES = ('throttle', 'connect', 'download', 'parse', 'clean', 'filter', 'dedupe', 'rules')
+
+
+class RunReport:
+    """一次运行的结构化计时记录（线程安全，可在下载线程中记录）"""
+
+    def __init__(self):
+        self.started_at = datetime.now()
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.sources: Dict[str, Dict] = {}
+        self.deliveries: Dict[str, Dict] = {}
+        self.summary: Dict = {}
+        self.lock = threading.Lock()
+
+    def source(self, url: str, name: str = "") -> Dict:
+        """获取（或创建）某个RSS源的记录"""
+        with self.lock:
+            record = self.sources.get(url)
+            if record is None:
+                record = self.sources[url] = {
+                    'name': name or url,
+                    'stages': {},
+                    'bytes': 0,
+                    'bytes_skipped': 0,
+                    'wire_bytes': 0,
+                    'encoding': None,
+                    'http_version': None,
+                    'articles': 0,
+                    'new_articles': 0,
+                    'error': None,
+                }
+            elif name:
+                record['name'] = name
+            return record
+
+    def import_sources(self, other: 'RunReport', urls: Optional[Iterable[str]] = None):
+        """复制另一份报告中RSS源的记录（多租户模式下共享获取阶段的耗时和字节数）"""
+        with other.lock:
+            records = {url: copy.deepcopy(record) for url, record in other.sources.items()
+                       if urls is None or url in urls}
+        with self.lock:
+            self.sources.update(records)
+
+    def add(self, url: str, stage: str, seconds: float):
+        """累加某个RSS源某阶段的耗时"""
+        record = self.source(url)
+        with self.lock:
+            record['stages'][stage] = record['stages'].get(stage, 0.0) + seconds
+
+    def set(self, url: str, key: str, value):
+        record = self.source(url)
+        with self.lock:
+            record[key] = value
+
+    @contextmanager
+    def time(self, url: str, stage: str):
+        """计时上下文: with report.time(url, 'filter'): ..."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(url, stage, time.perf_counter() - started)
+
+    def add_delivery(self, destination: str, seconds: float, success: bool):
+        """记录一次推送的耗时"""
+        with self.lock:
+            record = self.deliveries.setdefault(destination, {'count': 0, 'failed': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+            record['count'] += 1
+            record['failed'] += 0 if success else 1
+            record['seconds'] += seconds
+            record['max_seconds'] = max(record['max_seconds'], seconds)
+
+    def finish(self, **summary):
+        """结束计时并记录汇总数据"""
+        self.finished = time.perf_counter()
+        self.summary.update(summary)
+
+    @property
+    def duration(self) -> float:
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return end - self.started
+
+    def to_dict(self) -> Dict:
+        stage_totals: Dict[str, float] = {}
+        for record in self.sources.values():
+            for stage, seconds in record['stages'].items():
+                stage_totals[stage] = stage_totals.get(stage, 0.0) + seconds
+
+        def rounded(stages):
+            return {stage: round(seconds, 6) for stage, seconds in stages.items()}
+
+        return {
+            'started_at': self.started_at.isoformat(),
+            'duration_seconds': round(self.duration, 6),
+            'summary': self.summary,
+            'stage_totals': rounded(stage_totals),
+            'deliveries': {
+                destination: dict(record, seconds=round(record['seconds'], 6),
+                                  max_seconds=round(record['max_seconds'], 6))
+                for destination, record in self.deliveries.items()
+            },
+            'sources': {
+                url: dict(record, stages=rounded(record['stages']))
+                for url, record in self.sources.items()
+            },
+        }
+
+    def write_json(self, path: str):
+        """写入JSON运行报告"""
+        write_json_atomic(path, self.to_dict(), fsync=False)
+
+    def to_prometheus(self) -> str:
+        """Prometheus文本格式（可配合node_exporter的textfile collector使用）"""
+        lines = []
+
+        def metric(name: str, help_text: str, metric_type: str, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in samples:
+                label_str = ','.join(f'{k}="{escape_label(v)}"' for k, v in labels.items())
+                lines.append(f"{name}{{{label_str}}} {value}" if label_str else f"{name} {value}")
+
+        metric('rss_run_duration_seconds', 'Duration of the last monitor run.', 'gauge',
+               [({}, round(self.duration, 6))])
+        metric('rss_run_timestamp_seconds', 'Start time of the last monitor run.', 'gauge',
+               [({}, int(self.started_at.timestamp()))])
+        metric('rss_source_stage_seconds', 'Time spent per source and stage.', 'gauge',
+               [({'source': r['name'], 'stage': stage}, round(seconds, 6))
+                for r in self.sources.values() for stage, seconds in r['stages'].items()])
+        metric('rss_source_bytes', 'Decompressed bytes read per source.', 'gauge',
+               [({'source': r['name']}, r['bytes']) for r in self.sources.values()])
+        metric('rss_source_wire_bytes', 'Bytes transferred per source before decompression.', 'gauge',
+               [({'source': r['name']}, r['wire_bytes']) for r in self.sources.values()])
+        metric('rss_source_bytes_skipped', 'Bytes left unread per source after an early abort.', 'gauge',
+               [({'source': r['name']}, r['bytes_skipped'] or 0) for r in self.sources.values()])
+        metric('rss_source_articles', 'Articles parsed per source.', 'gauge',
+               [({'source': r['name']}, r['articles']) for r in self.sources.values()])
+        metric('rss_source_new_articles', 'New articles found per source.', 'gauge',
+               [({'source': r['name']}, r['new_articles']) for r in self.sources.values()])
+        metric('rss_source_up', 'Whether the last fetch of the source succeeded.', 'gauge',
+               [({'source': r['name']}, 0 if r['error'] else 1) for r in self.sources.values()])
+        metric('rss_delivery_seconds_sum', 'Total webhook delivery latency.', 'gauge',
+               [({'destination': d}, round(r['seconds'], 6)) for d, r in self.deliveries.items()])
+        metric('rss_delivery_count', 'Webhook deliveries attempted.', 'gauge',
+               [({'destination': d}, r['count']) for d, r in self.deliveries.items()])
+        metric('rss_delivery_failed', 'Webhook deliveries failed.', 'gauge',
+               [({'destination': d}, r['failed']) for d, r in self.deliveries.items()])
+        rule_hits = self.summary.get('rule_hits') or {}
+        if rule_hits:
+            metric('rss_rule_hits', 'Articles matched per filter/routing rule.', 'gauge',
+                   [({'rule': rule}, hits) for rule, hits in rule_hits.items()])
+        for key, value in sorted(self.summary.items()):
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                metric(f'rss_{key}', f'Run summary value {key}.', 'gauge', [({}, value)])
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str):
+        """写入Prometheus文本格式指标文件"""
+        write_atomic(path, self.to_prometheus(), fsync=False)
+
+
+def escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
@@ -4,29 +4,391 @@
 RSS监控脚本 - 自动监控RSS源并推送到飞书群
 """
 
+import time
+
+# 冷启动计时起点（模块开始导入的时刻），进程内第一次运行后清空
+_import_started = time.perf_counter()
+
 import json
 import os
-import time
 import hashlib
-import requests
 import re
-import html
+import calendar
+import math
+from collections import deque
 from datetime import datetime
-from typing import List, Dict
-import feedparser
+from typing import List, Dict, Optional, Tuple
 from pathlib import Path
 
+from rss_article import EPOCH, Article, clean_html, discord_text, published_timestamp, to_timestamp
+from rss_digest import DigestStore
+from rss_http import DEFAULT_MAX_BYTES, accept_encoding, read_response, read_stream
+from rss_http2 import Http2Client, Http2Unavailable, http2_available
+from rss_journal import StateJournal
+from rss_jsonfeed import JSON_ACCEPT, is_json_feed, json_feed_url, parse_json_feed
+from rss_lease import Lease
+from rss_metrics import RunReport
+from rss_outbox import Outbox
+from rss_ratelimit import HostScheduler, RetryAfter, TokenBucket, host_of, parse_retry_after
+from rss_reload import RESTART_KEYS, ConfigWatcher, diff_sources, file_signature, rules_changed, validate_config
+from rss_rules import RuleEngine
+import rss_shard
+
+
+# 飞书自定义机器人限制：每分钟100次、每秒5次，请求体不超过20KB
+FEISHU_RATE_PER_MINUTE = 100
+FEISHU_BURST = 5
+FEISHU_CARD_MAX_BYTES = 20 * 1024
+# 飞书限流错误码
+FEISHU_RATE_LIMIT_CODES = {9499, 11232}
+
+# 429未带Retry-After时默认等待的秒数；Retry-After超过上限时本次运行跳过该主机的RSS源
+RETRY_AFTER_DEFAULT_SECONDS = 60
+RETRY_AFTER_MAX_SECONDS = 60
+
+# 每个RSS源默认只取最新10条
+DEFAULT_MAX_ENTRIES = 10
+# 默认只推送10分钟内的新消息
+RECENT_WINDOW_SECONDS = 600
+# 状态文件中保存每个RSS源元数据（如上次成功拉取时间）的键
+SOURCES_STATE_KEY = '_sources'
+
+# 控制台输出级别：0 只输出错误，1 输出每个RSS源的汇总，2 输出每篇文章的详细过程（默认）
+LOG_ERROR = 0
+LOG_SUMMARY = 1
+LOG_DETAIL = 2
+
+# 获取RSS时使用的请求头
+FETCH_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'application/rss+xml, application/xml, text/xml, */*',
+    'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+    'Connection': 'keep-alive',
+    'Cache-Control': 'no-cache'
+}
+# Accept-Encoding 由 rss_http.accept_encoding() 按本机能解压的编码生成
+# urllib3 响应的 version -> 运行报告中的 http_version
+HTTP_VERSIONS = {10: 'HTTP/1.0', 11: 'HTTP/1.1', 20: 'HTTP/2'}
+# 请求JSON Feed时的请求头；JSON Feed地址返回这些状态码时改为获取原地址
+JSON_FETCH_HEADERS = dict(FETCH_HEADERS, Accept=JSON_ACCEPT)
+JSON_FEED_FALLBACK_STATUS = (400, 404, 406, 415, 500)
+
+
+def fix_xml_entities(xml_content: str) -> str:
+    """修复XML中的未定义实体"""
+    # 定义常见的HTML实体映射
+    entity_map = {
+        '&nbsp;': ' ',
+        '&amp;': '&',
+        '&lt;': '<',
+        '&gt;': '>',
+        '&quot;': '"',
+        '&apos;': "'",
+        '&copy;': '©',
+        '&reg;': '®',
+        '&trade;': '™',
+        '&mdash;': '—',
+        '&ndash;': '–',
+        '&hellip;': '…',
+        '&lsquo;': ''',
+        '&rsquo;': ''',
+        '&ldquo;': '"',
+        '&rdquo;': '"',
+    }
+    
+    # 先替换已知的实体
+    for entity, replacement in entity_map.items():
+        xml_content = xml_content.replace(entity, replacement)
+    
+    # 替换其他未定义的字母实体（保留数字实体如 &#123; 和 &#x1F;）
+    def replace_undefined_entity(match):
+        entity = match.group(0)
+        # 数字实体已经由XML解析器处理，不需要替换
+        # 只替换字母实体
+        return ' '  # 未定义的实体替换为空格
+    
+    # 匹配 &字母实体; 格式（排除已处理的）
+    xml_content = re.sub(r'&[a-zA-Z][a-zA-Z0-9]{1,15};', replace_undefined_entity, xml_content)
+    
+    return xml_content
+
+
+def parse_published_time(entry) -> Optional[datetime]:
+    """解析文章发布时间，解析失败返回None"""
+    published_str = entry.get('published', '')
+    published_time = None
+    
+    if published_str:
+        try:
+            # feedparser返回的时间可能是各种格式
+            # 优先使用feedparser解析好的时间元组（最准确）
+            if hasattr(entry, 'published_parsed') and entry.published_parsed:
+                # feedparser已经解析好的时间元组 (time.struct_time)
+                # 转换为datetime对象（UTC时间）
+                published_time = datetime(*entry.published_parsed[:6])
+            else:
+                # 如果没有parsed时间，尝试手动解析字符串
+                try:
+                    # 尝试解析feedparser常见格式: "Mon, 01 Jan 2024 00:00:00 +0000"
+                    date_str = published_str.split(' (')[0].split(' +')[0].split(' -')[0]
+                    published_time = datetime.strptime(date_str.strip(), '%a, %d %b %Y %H:%M:%S')
+                except:
+                    # 尝试其他格式
+                    try:
+                        # ISO格式: "2024-01-01T00:00:00"
+                        if 'T' in published_str:
+                            published_time = datetime.strptime(published_str[:19], '%Y-%m-%dT%H:%M:%S')
+                        # 简单格式: "2024-01-01 00:00:00"
+                        elif ' ' in published_str and len(published_str) >= 19:
+                            published_time = datetime.strptime(published_str[:19], '%Y-%m-%d %H:%M:%S')
+                    except:
+                        pass
+        except Exception as e:
+            # 解析失败不影响，只是无法进行时间筛选
+            published_time = None
+    
+    return published_time
+
+
+def parse_published_timestamp(entry) -> Optional[int]:
+    """解析文章发布时间戳（UTC），feedparser已解析好时间元组时直接转换，不经过datetime"""
+    if entry.get('published') and getattr(entry, 'published_parsed', None):
+        return calendar.timegm(entry.published_parsed)
+    return to_timestamp(parse_published_time(entry))
+
+
+def extract_articles(feed, url: str, max_entries: int = DEFAULT_MAX_ENTRIES) -> List[Article]:
+    """从feedparser解析结果中提取文章（最多 max_entries 条）"""
+    articles = []
+    
+    for entry in feed.entries[:max_entries]:  # 只取最新N条
+        # 清理标题和摘要中的HTML标签
+        title = entry.get('title', '无标题')
+        summary = entry.get('summary', entry.get('description', ''))
+        
+        # 移除HTML标签
+        if title:
+            title = clean_html(title)
+        
+        if summary:
+            summary = clean_html(summary)
+        
+        article = Article(
+            title=title or '无标题',
+            link=entry.get('link', ''),
+            published=entry.get('published', ''),
+            published_ts=parse_published_timestamp(entry),  # 解析后的时间戳
+            summary=summary[:200] if summary else '',  # 限制摘要长度
+            source=url,
+        )
+        articles.append(article)
+    
+    return articles
+
+
+def discover_websub_links(feed) -> Dict[str, str]:
+    """从RSS源的 <link rel="hub"> / <link rel="self"> 中找出WebSub hub和topic"""
+    links = {}
+    for link in feed.feed.get('links', []):
+        rel = link.get('rel')
+        if rel in ('hub', 'self') and link.get('href') and rel not in links:
+            links[rel] = link['href']
+    return links
+
+
+def parse_feed_content(content: bytes, url: str, max_entries: int = DEFAULT_MAX_ENTRIES, log=print,
+                       timings: Optional[Dict] = None, links: Optional[Dict] = None,
+                       content_type: Optional[str] = None) -> List[Article]:
+    """解析下载好的RSS内容并提取文章
+
+    只依赖传入的字节内容，不访问网络，可以在子进程中运行。
+    遇到未定义实体错误时在同一份内容上修复后重新解析，不再重新下载。
+    log: 输出函数，子进程中用来收集输出，交给主进程按RSS源顺序打印
+    timings: 传入字典时记录 parse（含实体修复）和 clean（HTML清理、时间解析）阶段的耗时
+    links: 传入字典时记录源中声明的WebSub链接（hub、self）
+    content_type: 响应的Content-Type；是JSON Feed（或内容以 { 开头）时直接解码，不经过feedparser
+    """
+    if is_json_feed(content, content_type):
+        try:
+            return parse_json_feed(content, url, max_entries, timings=timings, links=links)
+        except ValueError as e:
+            log(f"⚠️ JSON Feed解析失败（{e}），改用feedparser解析")
+    
+    import feedparser
+    
+    parse_started = time.perf_counter()
+    feed = feedparser.parse(content)
+    original_feed = feed
+    
+    # 如果解析失败且有实体错误，尝试修复
+    if feed.bozo and feed.bozo_exception:
+        error_str = str(feed.bozo_exception)
+        if 'undefined entity' in error_str.lower():
+            log(f"⚠️ 检测到XML实体错误，尝试修复...")
+            fixed_success = False
+            
+            try:
+                xml_content = content.decode(feed.get('encoding') or 'utf-8', errors='replace')
+                
+                # 修复XML实体
+                fixed_xml = fix_xml_entities(xml_content)
+                
+                # 重新解析
+                feed = feedparser.parse(fixed_xml)
+                
+                if feed.bozo and feed.bozo_exception:
+                    log(f"   ⚠️ 修复后仍有解析错误: {feed.bozo_exception}")
+                    # 即使有错误，也尝试提取内容
+                else:
+                    log(f"   ✅ XML实体修复成功")
+                    fixed_success = True
+            except Exception as fix_error:
+                log(f"   ⚠️ 修复失败: {fix_error}，尝试使用原始解析结果（可能仍能提取部分内容）")
+            
+            # 如果修复失败，检查原始feed是否有内容（feedparser即使有错误也能提取部分内容）
+            if not fixed_success:
+                if original_feed and hasattr(original_feed, 'entries') and original_feed.entries:
+                    feed = original_feed
+                    log(f"   ℹ️ 使用原始解析结果（找到 {len(original_feed.entries)} 篇文章）")
+                else:
+                    log(f"   ⚠️ 原始解析结果也没有文章，可能RSS源确实有问题")
+        else:
+            log(f"⚠️ RSS解析错误 ({url}): {feed.bozo_exception}")
+            log(f"   尝试继续提取内容...")
+    
+    if links is not None:
+        links.update(discover_websub_links(feed))
+    
+    # 检查是否有文章（即使有错误也尝试提取）
+    if not hasattr(feed, 'entries') or not feed.entries:
+        if feed.bozo and feed.bozo_exception:
+            log(f"⚠️ RSS源中没有文章条目")
+            log(f"   错误详情: {feed.bozo_exception}")
+        else:
+            log(f"⚠️ RSS源中没有文章条目")
+            # 检查是否是Nitter源
+            if 'nitter' in url.lower():
+                log(f"   ℹ️ 这是Nitter源，可能的原因：")
+                log(f"      1. 用户名不存在或已更改")
+                log(f"      2. 用户没有推文")
+                log(f"      3. 账户被保护或已注销")
+                log(f"      4. Nitter实例无法获取该用户内容")
+                log(f"      建议：在浏览器中访问 {url} 验证")
+        # 返回空列表，错误信息会在check_and_push中处理
+        if timings is not None:
+            timings['parse'] = time.perf_counter() - parse_started
+        return []
+    
+    clean_started = time.perf_counter()
+    articles = extract_articles(feed, url, max_entries)
+    if timings is not None:
+        timings['parse'] = clean_started - parse_started
+        timings['clean'] = time.perf_counter() - clean_started
+    return articles
+
+
+def parse_feed_job(job: Tuple) -> Tuple[Optional[List[Article]], List[str], Optional[str], Dict, Dict]:
+    """进程池中的解析任务
+
+    job: (内容, URL, 最大条数[, Content-Type])
+    返回 (文章列表, 输出内容, 错误信息, 各阶段耗时, WebSub链接)，文章可以pickle传回主进程。
+    """
+    content, url, max_entries = job[:3]
+    content_type = job[3] if len(job) > 3 else None
+    messages = []
+    timings = {}
+    links = {}
+    try:
+        articles = parse_feed_content(content, url, max_entries, log=messages.append, timings=timings, links=links,
+                                      content_type=content_type)
+        return articles, messages, None, timings, links
+    except Exception as e:
+        return None, messages, f"{type(e).__name__}: {e}", timings, links
+
 
 class RSSMonitor:
-    def __init__(self, config_file: str = "config.json"):
-        """初始化RSS监控器"""
+    def __init__(self, config_file: str = "config.json", shard: Optional[Tuple[int, int]] = None,
+                 from_env: bool = False, data_dir: Optional[str] = None):
+        """初始化RSS监控器
+
+        shard: (i, N) 分片模式，只处理哈希分配到第i个分片的RSS源，
+               状态、发件箱和摘要缓冲都使用该分片专属的文件
+        from_env: 直接从环境变量 DISCORD_WEBHOOK / FEISHU_WEBHOOK / RSS_SOURCES 读取配置，
+                  配置文件存在时作为其他选项的基础配置，不存在也可以运行
+        data_dir: 状态、发件箱等数据文件中相对路径的基准目录（默认当前目录），多租户模式下为各租户配置文件所在目录
+        """
+        self.created_at = time.perf_counter()
         self.config_file = config_file
-        self.state_file = "rss_state.json"  # 存储已推送的文章ID
+        self.shard = shard
+        self.data_dir = data_dir
+        self.from_env = from_env
         self.config = self.load_config()
+        self.state_file = self.get_data_path(self.config.get('state_file', 'rss_state.json'))  # 存储已推送的文章ID
+        # 每次推送立即追加到状态日志，累计 state_snapshot_every 条或运行结束时写一次完整快照
+        self.journal = StateJournal(self.state_file, fsync=self.config.get('state_journal_fsync', True))
+        self.snapshot_every = self.config.get('state_snapshot_every', 100)
+        # 合并保存：保存时先重新读取磁盘上的状态，与本次的记录合并后再写入
+        self.merge_on_save = self.config.get('state_merge_on_save', False)
         self.state = self.load_state()
+        self.lease: Optional[Lease] = None
+        self.outbox = Outbox(
+            self.get_data_path(self.config.get('outbox_file', 'rss_outbox.json')),
+            expiry_seconds=self.config.get('outbox_expiry_hours', 24) * 3600,
+            retry_base_seconds=self.config.get('outbox_retry_base_seconds', 60),
+            retry_max_seconds=self.config.get('outbox_retry_max_seconds', 3600),
+        )
+        self.digests = DigestStore(self.get_data_path(self.config.get('digest_file', 'rss_digest.json')))
+        # 推送归档（SQLite + FTS5），配置了 archive_file 才开启
+        archive_file = self.config.get('archive_file')
+        self.archive = None
+        if archive_file:
+            # 用到时才导入（sqlite3），不开启归档的运行不增加启动耗时
+            from rss_archive import Archive
+            self.archive = Archive(self.get_data_path(archive_file))
+        self.feishu_bucket = TokenBucket(
+            rate=self.config.get('feishu_rate_per_minute', FEISHU_RATE_PER_MINUTE) / 60,
+            capacity=self.config.get('feishu_burst', FEISHU_BURST),
+        )
+        self.metrics: Dict = {}
+        self.verbosity = self.config.get('verbosity', LOG_DETAIL)
+        # 关键词/正则过滤与路由规则（配置错误时抛出ValueError）
+        self.rules = RuleEngine(self.config.get('rules', []), self.config.get('rss_sources', []))
+        # 按上游主机的并发数/速率限制，以及429/503返回的Retry-After
+        self.hosts = HostScheduler(self.config.get('host_limits'))
+        self.retry_after_max_seconds = self.config.get('retry_after_max_seconds', RETRY_AFTER_MAX_SECONDS)
+        # host_limits 中开启了 http2 的主机使用可选的HTTP/2后端（httpx），同一主机的请求复用一个连接
+        self.http2 = Http2Client(timeout=(10, 30))
+        self.warn_http2_unavailable()
+        # 本地RSS缓存代理（rss_proxy.py），不配置则直接请求上游
+        self.fetch_proxy = self.config.get('fetch_proxy') or os.environ.get('RSS_FETCH_PROXY')
+        self.report = RunReport()
+        self.parse_messages: Dict[str, List[str]] = {}
+        self.state_changed = False
+        # WebSub推送订阅，只在常驻模式（serve）下启用
+        self.websub = None
+        # 常驻模式下每个RSS源的下次轮询时间 {url: 时间戳}
+        self.schedule: Dict[str, float] = {}
+        # 命令行参数覆盖的配置项，重新加载配置后仍然生效
+        self.overrides: Dict = {}
+        
+    def override_config(self, **overrides):
+        """用命令行参数覆盖配置项（如 report_file、verbosity），热加载配置后重新应用"""
+        self.overrides.update(overrides)
+        self.config.update(overrides)
+        if 'verbosity' in overrides:
+            self.verbosity = overrides['verbosity']
+    
+    def warn_http2_unavailable(self):
+        """配置了HTTP/2但没有安装httpx时提示一次"""
+        if any(limit.get('http2') for limit in self.hosts.limits.values()) and not http2_available():
+            print("⚠️ host_limits 中开启了 http2，但没有安装 httpx[http2]，将使用HTTP/1.1"
+                  "（pip install \"httpx[http2]\"）")
         
     def load_config(self) -> Dict:
         """加载配置文件"""
+        if self.from_env:
+            return self.load_config_from_env()
+        
         if not os.path.exists(self.config_file):
             raise FileNotFoundError(
                 f"配置文件 {self.config_file} 不存在！\n"
@@ -36,82 +398,202 @@ class RSSMonitor:
         with open(self.config_file, 'r', encoding='utf-8') as f:
             return json.load(f)
     
+    def load_config_from_env(self) -> Dict:
+        """从环境变量读取Webhook和RSS源（与 create_config_from_secrets.py 使用同一套校验）"""
+        from create_config_from_secrets import config_from_env
+        
+        config = {}
+        if os.path.exists(self.config_file):
+            with open(self.config_file, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        
+        env_config = config_from_env()
+        if env_config is None:
+            raise ValueError("环境变量中的配置无效，请根据上面的提示检查")
+        config.update(env_config)
+        return config
+    
+    def get_data_path(self, path: str) -> str:
+        """数据文件路径，分片模式下每个分片使用独立的文件"""
+        if self.data_dir:
+            path = os.path.join(self.data_dir, path)
+        return rss_shard.shard_path(path, self.shard) if self.shard else path
+    
     def load_state(self) -> Dict:
-        """加载状态文件（已推送的文章记录）"""
+        """加载状态文件（已推送的文章记录），再重放上次运行未写入快照的状态日志"""
+        self.state_signature = self.state_files_signature()
+        state = self.load_state_snapshot()
+        replayed = self.journal.replay(state)
+        if replayed:
+            print(f"ℹ️ 从状态日志恢复 {replayed} 条记录（上次运行没有正常结束）")
+        return state
+    
+    def state_files_signature(self) -> Tuple:
+        """状态文件和状态日志的修改时间与大小，用来判断加载后是否被其他运行改过"""
+        return file_signature(self.state_file), file_signature(self.journal.path)
+    
+    def load_state_snapshot(self) -> Dict:
         if os.path.exists(self.state_file):
             with open(self.state_file, 'r', encoding='utf-8') as f:
                 return json.load(f)
+        
+        # 分片首次运行：从主状态文件中取出属于该分片的记录
+        main_state_file = self.config.get('state_file', 'rss_state.json')
+        if self.data_dir:
+            main_state_file = os.path.join(self.data_dir, main_state_file)
+        if self.shard and os.path.exists(main_state_file):
+            with open(main_state_file, 'r', encoding='utf-8') as f:
+                print(f"ℹ️ 分片状态不存在，从 {main_state_file} 初始化")
+                return rss_shard.partition_state(json.load(f), self.shard)
         return {}
     
     def save_state(self):
-        """保存状态文件"""
-        with open(self.state_file, 'w', encoding='utf-8') as f:
-            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        """保存状态文件（原子替换），并清空已包含在快照中的状态日志
+
+        合并保存模式下以磁盘上的状态为基础合并：同一篇文章保留最早的推送记录，同一RSS源保留最新的成功拉取时间，
+        与本进程同时运行的其他进程记录的文章不会被覆盖掉。
+        """
+        merge = (lambda on_disk, ours: rss_shard.merge_states([on_disk, ours])) if self.merge_on_save else None
+        self.state = self.journal.snapshot(self.state, merge=merge)
+        self.state_signature = self.state_files_signature()
+    
+    def acquire_lease(self) -> bool:
+        """获取运行租约：同一状态文件同时只有一个运行
+
+        被占用时最多等待 run_lock_wait_seconds 秒，仍被占用返回False；持有者崩溃、租约过期后可以接管。
+        加载状态之后如果有其他运行写入过状态（如在等待租约期间），获取后重新加载。
+        """
+        if not self.config.get('run_lock', True):
+            return True
+        self.lease = Lease(f"{self.state_file}.lock", ttl=self.config.get('run_lock_ttl_seconds', 300))
+        if not self.lease.acquire(wait=self.config.get('run_lock_wait_seconds', 0)):
+            holder = self.lease.holder or {}
+            print(f"⏭️ 另一个运行（{holder.get('host', '?')} 进程 {holder.get('pid', '?')}）"
+                  f"正在使用 {self.state_file}，本次跳过")
+            self.lease = None
+            return False
+        if self.lease.took_over:
+            holder = self.lease.holder or {}
+            print(f"⚠️ 接管了过期的运行租约（{holder.get('host', '?')} 进程 {holder.get('pid', '?')}，可能已崩溃）")
+        if self.state_files_signature() != self.state_signature:
+            self.state = self.load_state()
+        return True
+    
+    def release_lease(self):
+        if self.lease is not None:
+            self.lease.release()
+            self.lease = None
+    
+    def journal_state(self, key, value):
+        """状态的一处修改立即追加到状态日志，累计够 state_snapshot_every 条时写一次快照"""
+        self.journal.append(key, value)
+        if self.snapshot_every and self.journal.count >= self.snapshot_every:
+            self.save_state()
     
     def get_article_id(self, entry: Dict) -> str:
         """生成文章唯一ID"""
+        if isinstance(entry, Article):
+            return entry.article_id
         # 优先使用link，如果没有则使用title+published
         identifier = entry.get('link') or f"{entry.get('title', '')}{entry.get('published', '')}"
         return hashlib.md5(identifier.encode('utf-8')).hexdigest()
     
     def fix_xml_entities(self, xml_content: str) -> str:
         """修复XML中的未定义实体"""
-        # 定义常见的HTML实体映射
-        entity_map = {
-            '&nbsp;': ' ',
-            '&amp;': '&',
-            '&lt;': '<',
-            '&gt;': '>',
-            '&quot;': '"',
-            '&apos;': "'",
-            '&copy;': '©',
-            '&reg;': '®',
-            '&trade;': '™',
-            '&mdash;': '—',
-            '&ndash;': '–',
-            '&hellip;': '…',
-            '&lsquo;': ''',
-            '&rsquo;': ''',
-            '&ldquo;': '"',
-            '&rdquo;': '"',
-        }
+        return fix_xml_entities(xml_content)
+    
+    def request_feed(self, url: str, fetch_url: str, headers: Dict, max_bytes: int,
+                     max_entries: Optional[int]) -> Tuple[object, bytes]:
+        """流式请求 fetch_url（配置了缓存代理时经过代理），返回 (响应, 内容)
+
+        成功的响应边下载边解压，超过 max_bytes 或读到 max_entries 个条目后停止读取；
+        错误响应不读取内容。耗时和字节数记在 url 名下。
+        """
+        import requests
         
-        # 先替换已知的实体
-        for entity, replacement in entity_map.items():
-            xml_content = xml_content.replace(entity, replacement)
-        
-        # 替换其他未定义的字母实体（保留数字实体如 &#123; 和 &#x1F;）
-        def replace_undefined_entity(match):
-            entity = match.group(0)
-            # 数字实体已经由XML解析器处理，不需要替换
-            # 只替换字母实体
-            return ' '  # 未定义的实体替换为空格
-        
-        # 匹配 &字母实体; 格式（排除已处理的）
-        xml_content = re.sub(r'&[a-zA-Z][a-zA-Z0-9]{1,15};', replace_undefined_entity, xml_content)
-        
-        return xml_content
-    
-    def fetch_rss(self, url: str) -> List[Dict]:
-        """获取RSS源的最新文章"""
-        feed = None
-        original_feed = None
-        
-        # 准备请求头
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'application/rss+xml, application/xml, text/xml, */*',
-            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Cache-Control': 'no-cache'
-        }
+        if self.fetch_proxy:
+            from rss_proxy import proxy_url
+            fetch_url = proxy_url(self.fetch_proxy, fetch_url)
+        headers = dict(headers, **{'Accept-Encoding': accept_encoding()})
+        started = time.perf_counter()
+        response = None
+        http2_mode = self.hosts.limit_for(host_of(fetch_url)).get('http2')
+        if self.http2.usable(fetch_url, http2_mode):
+            try:
+                response = self.http2.get(fetch_url, headers, http2_mode)
+            except Http2Unavailable as e:
+                print(f"   ⚠️ HTTP/2请求失败，改用HTTP/1.1: {e}")
+                started = time.perf_counter()
+        if response is None:
+            response = requests.get(fetch_url, headers=headers, timeout=(10, 30), allow_redirects=True, stream=True)
+        self.report.set(url, 'http_version', getattr(response, 'http_version', None) or HTTP_VERSIONS.get(
+            getattr(response.raw, 'version', None)))
+        # elapsed 是发出请求到解析完响应头的时间（含DNS、建立连接和首字节等待）
+        connect_seconds = response.elapsed.total_seconds()
+        self.report.add(url, 'connect', connect_seconds)
+        stats = {}
+        if response.ok:
+            content = read_response(response, max_bytes, max_entries, stats)
+        else:
+            response.close()
+            content = b''
+        self.report.add(url, 'download', max(0.0, time.perf_counter() - started - connect_seconds))
+        self.report.set(url, 'bytes', stats.get('bytes_read', 0))
+        self.report.set(url, 'bytes_skipped', stats.get('bytes_skipped', 0))
+        self.report.set(url, 'wire_bytes', stats.get('wire_bytes', 0))
+        self.report.set(url, 'encoding', stats.get('encoding'))
+        if stats.get('encoding') not in (None, 'identity') and self.verbosity >= LOG_DETAIL:
+            print(f"   📦 {stats['encoding']} 压缩传输 {stats['wire_bytes'] / 1024:.1f} KB，"
+                  f"解压后 {stats['bytes_read'] / 1024:.1f} KB")
+        if stats.get('truncated') and self.verbosity >= LOG_DETAIL:
+            reason = f"已取到 {max_entries} 条" if stats['truncated'] == 'entries' else f"超过大小上限 {max_bytes // 1024} KB"
+            skipped = stats['bytes_skipped']
+            print(f"   ✂️ {reason}，提前结束下载（读取 {stats['bytes_read'] / 1024:.1f} KB，"
+                  f"跳过 {'未知大小' if skipped is None else f'{skipped / 1024:.1f} KB'}）")
+        return response, content
+    
+    def download_feed(self, url: str, json_feed: Optional[bool] = None, meta: Optional[Dict] = None,
+                      max_entries: Optional[int] = None, max_bytes: Optional[int] = None) -> Optional[bytes]:
+        """下载RSS源内容
+
+        返回原始字节内容；已识别的403/404等情况已输出提示，返回None。
+        其他网络错误抛出异常，由check_and_push捕获并发送错误通知。
+        json_feed: 是否优先请求JSON Feed（None表示使用配置中的 json_feed，默认开启），只对已知支持的上游生效
+        meta: 传入字典时记录响应的 content_type
+        max_entries: 读到这么多个条目后提前结束下载（None表示读完）
+        max_bytes: 内容大小上限（None表示使用配置中的 max_feed_bytes）
+        """
+        import requests
+        
+        if json_feed is None:
+            json_feed = self.config.get('json_feed', True)
+        json_url = json_feed_url(url) if json_feed else None
+        if max_bytes is None:
+            max_bytes = self.config.get('max_feed_bytes', DEFAULT_MAX_BYTES)
         
         try:
             # 先尝试使用requests下载，然后解析（这样可以控制请求头）
-            print(f"   正在获取RSS内容...")
+            if self.verbosity >= LOG_DETAIL:
+                print(f"   正在获取RSS内容...")
             try:
-                response = requests.get(url, headers=headers, timeout=(10, 30), allow_redirects=True)
+                if json_url:
+                    response, content = self.request_feed(url, json_url, JSON_FETCH_HEADERS, max_bytes, max_entries)
+                    if response.status_code in JSON_FEED_FALLBACK_STATUS:
+                        if self.verbosity >= LOG_DETAIL:
+                            print(f"   ℹ️ JSON Feed不可用 ({response.status_code})，改为获取原地址")
+                        response, content = self.request_feed(url, url, FETCH_HEADERS, max_bytes, max_entries)
+                else:
+                    response, content = self.request_feed(url, url, FETCH_HEADERS, max_bytes, max_entries)
+                if meta is not None:
+                    meta['content_type'] = response.headers.get('Content-Type', '')
+                if response.status_code in (429, 503):
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    if retry_after is None and response.status_code == 429:
+                        retry_after = RETRY_AFTER_DEFAULT_SECONDS
+                    if retry_after is not None:
+                        # 该主机在Retry-After之前不再请求，由调用方决定稍后重试还是跳过
+                        self.hosts.defer(url, retry_after, response.status_code)
+                        raise RetryAfter(url, response.status_code, retry_after)
                 response.raise_for_status()
                 
                 # 检查是否是RSSHub的错误
@@ -122,7 +604,7 @@ class RSSMonitor:
                         print(f"      2. 该路由需要特殊权限或已失效")
                         print(f"      3. 建议使用自建RSSHub实例或更换RSS源")
                         print(f"      4. 可以尝试访问 https://rsshub.app 查看该路由是否可用")
-                        return []
+                        return None
                     elif response.status_code == 404:
                         print(f"   ❌ RSSHub返回404错误，路由不存在或格式错误")
                         print(f"      当前路由: {url}")
@@ -140,18 +622,16 @@ class RSSMonitor:
                             print(f"      - 用户推文: https://rsshub.app/twitter/user/用户名")
                             print(f"      - 用户媒体: https://rsshub.app/twitter/media/用户名（可能不存在）")
                             print(f"      - 列表: https://rsshub.app/twitter/list/列表ID")
-                        return []
+                        return None
                 
-                # 使用下载的内容解析
-                feed = feedparser.parse(response.content)
-                original_feed = feed
+                return content
             except requests.exceptions.HTTPError as http_error:
                 status_code = http_error.response.status_code if http_error.response else None
                 if status_code == 403:
                     print(f"   ❌ 访问被拒绝 (403): {url}")
                     if 'rsshub.app' in url:
                         print(f"      RSSHub可能需要认证或该路由已失效")
-                    return []
+                    return None
                 elif status_code == 404:
                     print(f"   ❌ 路由不存在 (404): {url}")
                     if 'rsshub.app' in url:
@@ -161,175 +641,32 @@ class RSSMonitor:
                         if '/twitter/' in url:
                             print(f"      Twitter路由正确格式：")
                             print(f"      - https://rsshub.app/twitter/user/用户名")
-                    return []
+                    return None
                 raise
             except requests.exceptions.RequestException as req_error:
-                # 如果requests失败，尝试使用feedparser直接解析
-                print(f"   ⚠️ 使用requests下载失败，尝试feedparser直接解析...")
-                feed = feedparser.parse(url)
-                original_feed = feed
-            
-            # 如果解析失败且有实体错误，尝试修复
-            if feed.bozo and feed.bozo_exception:
-                error_str = str(feed.bozo_exception)
-                if 'undefined entity' in error_str.lower():
-                    print(f"⚠️ 检测到XML实体错误，尝试修复...")
-                    fixed_success = False
-                    
-                    # 重试机制：最多尝试3次
-                    for attempt in range(1, 4):
-                        try:
-                            print(f"   尝试 {attempt}/3: 下载并修复RSS内容...")
-                            # 下载RSS内容（增加超时时间到60秒）
-                            response = requests.get(
-                                url, 
-                                timeout=(10, 60),  # (连接超时, 读取超时)
-                                headers=headers,
-                                allow_redirects=True
-                            )
-                            
-                            # 检查403错误
-                            if response.status_code == 403:
-                                print(f"   ❌ 访问被拒绝 (403)，无法修复")
-                                if 'rsshub.app' in url:
-                                    print(f"      RSSHub路由可能已失效或需要认证")
-                                break
-                            
-                            response.raise_for_status()
-                            xml_content = response.text
-                            
-                            # 修复XML实体
-                            fixed_xml = self.fix_xml_entities(xml_content)
-                            
-                            # 重新解析
-                            feed = feedparser.parse(fixed_xml)
-                            
-                            if feed.bozo and feed.bozo_exception:
-                                print(f"   ⚠️ 修复后仍有解析错误: {feed.bozo_exception}")
-                                # 即使有错误，也尝试提取内容
-                            else:
-                                print(f"   ✅ XML实体修复成功")
-                                fixed_success = True
-                                break
-                        except requests.exceptions.Timeout as timeout_error:
-                            print(f"   ⚠️ 尝试 {attempt}/3 超时: {timeout_error}")
-                            if attempt < 3:
-                                wait_time = attempt * 5  # 递增等待时间
-                                print(f"   等待 {wait_time} 秒后重试...")
-                                time.sleep(wait_time)
-                            else:
-                                print(f"   ⚠️ 所有重试均超时，尝试使用原始解析结果")
-                        except requests.exceptions.HTTPError as http_error:
-                            if http_error.response.status_code == 403:
-                                print(f"   ❌ 访问被拒绝 (403)，无法修复")
-                                if 'rsshub.app' in url:
-                                    print(f"      RSSHub路由可能已失效或需要认证")
-                                break
-                            else:
-                                print(f"   ⚠️ 尝试 {attempt}/3 HTTP错误: {http_error}")
-                                if attempt < 3:
-                                    time.sleep(2)
-                        except Exception as fix_error:
-                            print(f"   ⚠️ 尝试 {attempt}/3 失败: {fix_error}")
-                            if attempt < 3:
-                                time.sleep(2)
-                            else:
-                                print(f"   ⚠️ 修复失败，尝试使用原始解析结果（可能仍能提取部分内容）")
-                    
-                    # 如果修复失败，检查原始feed是否有内容（feedparser即使有错误也能提取部分内容）
-                    if not fixed_success:
-                        if original_feed and hasattr(original_feed, 'entries') and original_feed.entries:
-                            feed = original_feed
-                            print(f"   ℹ️ 使用原始解析结果（找到 {len(original_feed.entries)} 篇文章）")
-                        else:
-                            print(f"   ⚠️ 原始解析结果也没有文章，可能RSS源确实有问题")
-                else:
-                    print(f"⚠️ RSS解析错误 ({url}): {feed.bozo_exception}")
-                    print(f"   尝试继续提取内容...")
-            
-            # 检查是否有文章（即使有错误也尝试提取）
-            if not hasattr(feed, 'entries') or not feed.entries:
-                error_detail = ""
-                if feed.bozo and feed.bozo_exception:
-                    error_detail = str(feed.bozo_exception)
-                    print(f"⚠️ RSS源中没有文章条目")
-                    print(f"   错误详情: {error_detail}")
-                else:
-                    print(f"⚠️ RSS源中没有文章条目")
-                    # 检查是否是Nitter源
-                    if 'nitter' in url.lower():
-                        print(f"   ℹ️ 这是Nitter源，可能的原因：")
-                        print(f"      1. 用户名不存在或已更改")
-                        print(f"      2. 用户没有推文")
-                        print(f"      3. 账户被保护或已注销")
-                        print(f"      4. Nitter实例无法获取该用户内容")
-                        print(f"      建议：在浏览器中访问 {url} 验证")
-                # 返回空列表，错误信息会在check_and_push中处理
-                return []
-            
-            articles = []
-            current_time = datetime.now()
-            
-            for entry in feed.entries[:10]:  # 只取最新10条
-                # 清理标题和摘要中的HTML标签
-                title = entry.get('title', '无标题')
-                summary = entry.get('summary', entry.get('description', ''))
-                
-                # 移除HTML标签
-                if title:
-                    title = re.sub(r'<[^>]+>', '', title)
-                    title = html.unescape(title).strip()
-                
-                if summary:
-                    summary = re.sub(r'<[^>]+>', '', summary)
-                    summary = html.unescape(summary).strip()
-                
-                # 解析发布时间
-                published_str = entry.get('published', '')
-                published_time = None
-                
-                if published_str:
-                    try:
-                        # feedparser返回的时间可能是各种格式
-                        # 优先使用feedparser解析好的时间元组（最准确）
-                        if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                            # feedparser已经解析好的时间元组 (time.struct_time)
-                            import time as time_module
-                            # 转换为datetime对象（UTC时间）
-                            published_time = datetime(*entry.published_parsed[:6])
-                        else:
-                            # 如果没有parsed时间，尝试手动解析字符串
-                            try:
-                                from datetime import datetime as dt
-                                # 尝试解析feedparser常见格式: "Mon, 01 Jan 2024 00:00:00 +0000"
-                                date_str = published_str.split(' (')[0].split(' +')[0].split(' -')[0]
-                                published_time = dt.strptime(date_str.strip(), '%a, %d %b %Y %H:%M:%S')
-                            except:
-                                # 尝试其他格式
-                                try:
-                                    # ISO格式: "2024-01-01T00:00:00"
-                                    if 'T' in published_str:
-                                        published_time = dt.strptime(published_str[:19], '%Y-%m-%dT%H:%M:%S')
-                                    # 简单格式: "2024-01-01 00:00:00"
-                                    elif ' ' in published_str and len(published_str) >= 19:
-                                        published_time = dt.strptime(published_str[:19], '%Y-%m-%d %H:%M:%S')
-                                except:
-                                    pass
-                    except Exception as e:
-                        # 解析失败不影响，只是无法进行时间筛选
-                        published_time = None
-                
-                article = {
-                    'title': title or '无标题',
-                    'link': entry.get('link', ''),
-                    'published': published_str,
-                    'published_time': published_time,  # 添加解析后的时间对象
-                    'summary': summary[:200] if summary else '',  # 限制摘要长度
-                    'source': url
-                }
-                articles.append(article)
-            
-            return articles
+                # 只支持h2c的主机不能用urllib（HTTP/1.1）直接下载，按获取失败处理
+                if self.hosts.limit_for(host_of(url)).get('http2') == 'prior_knowledge' and http2_available():
+                    raise
+                # 如果requests失败（或缓存代理不可用），尝试用feedparser默认的方式（urllib）直接下载
+                print(f"   ⚠️ 使用requests下载失败，尝试直接下载...")
+                try:
+                    import urllib.request
+                    import feedparser
+                    request = urllib.request.Request(url, headers={'User-Agent': feedparser.USER_AGENT})
+                    stats = {}
+                    with self.report.time(url, 'download'):
+                        with urllib.request.urlopen(request, timeout=30) as fallback_response:
+                            content = read_stream(fallback_response, fallback_response.headers.get('Content-Encoding'),
+                                                  max_bytes, max_entries, stats)
+                            if meta is not None:
+                                meta['content_type'] = fallback_response.headers.get('Content-Type', '')
+                    self.report.set(url, 'bytes', stats['bytes_read'])
+                    self.report.set(url, 'wire_bytes', stats['wire_bytes'])
+                    self.report.set(url, 'encoding', stats.get('encoding'))
+                    return content
+                except Exception as fallback_error:
+                    print(f"⚠️ RSS获取错误 ({url}): {fallback_error}")
+                    return None
         except requests.exceptions.RequestException as e:
             error_msg = str(e)
             print(f"❌ 获取RSS失败 ({url}): 网络请求错误 - {e}")
@@ -339,6 +676,32 @@ class RSSMonitor:
                 print(f"   建议：访问 https://docs.rsshub.app/ 查看正确的路由格式")
             # 抛出异常，让check_and_push捕获并发送错误通知
             raise Exception(f"网络请求错误: {error_msg}")
+    
+    def fetch_rss(self, url: str, max_entries: int = DEFAULT_MAX_ENTRIES, json_feed: Optional[bool] = None,
+                  max_bytes: Optional[int] = None) -> List[Article]:
+        """获取RSS源的最新文章（最多 max_entries 条）"""
+        started = time.perf_counter()
+        meta = {}
+        with self.hosts.slot(url, self.retry_after_max_seconds):
+            waited = time.perf_counter() - started
+            if waited >= 0.001:
+                self.report.add(url, 'throttle', waited)
+            content = self.download_feed(url, json_feed=json_feed, meta=meta, max_entries=max_entries,
+                                         max_bytes=max_bytes)
+        if content is None:
+            return []
+        
+        try:
+            timings = {}
+            links = {}
+            articles = parse_feed_content(content, url, max_entries, timings=timings, links=links,
+                                          content_type=meta.get('content_type'))
+            for stage, seconds in timings.items():
+                self.report.add(url, stage, seconds)
+            self.report.set(url, 'articles', len(articles))
+            if self.websub and links.get('hub'):
+                self.websub.discovered(url, links['hub'], links.get('self') or url)
+            return articles
         except Exception as e:
             print(f"❌ 获取RSS失败 ({url}): {e}")
             import traceback
@@ -346,8 +709,129 @@ class RSSMonitor:
             # 抛出异常，让check_and_push捕获并发送错误通知
             raise
     
+    def fetch_all(self, sources: List[Dict], fetch_workers: Optional[int] = None, parse_workers: Optional[int] = None,
+                  chunksize: Optional[int] = None) -> Dict[str, Tuple[List[Dict], Optional[str]]]:
+        """并行获取所有RSS源：线程池下载，进程池解析
+
+        fetch_workers: 下载线程数
+        parse_workers: 解析进程数（0表示在主进程中解析）
+        chunksize: 每次分发给解析进程的RSS源数
+        未指定时使用配置中的 fetch_workers / parse_workers / parse_chunksize
+        返回 {url: (文章列表, 错误信息)}，解析阶段的输出保存在 self.parse_messages 中
+        """
+        from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait as futures_wait
+        
+        fetch_workers = max(1, fetch_workers or self.config.get('fetch_workers', 1))
+        parse_workers = self.config.get('parse_workers', 0) if parse_workers is None else parse_workers
+        chunksize = max(1, chunksize or self.config.get('parse_chunksize', 4))
+        
+        print(f"\n⚡ 并行获取 {len(sources)} 个RSS源（下载线程 {fetch_workers}，解析进程 {parse_workers}）")
+        results: Dict[str, Tuple[List[Dict], Optional[str]]] = {}
+        jobs = []
+        
+        def download(source):
+            meta = {}
+            max_entries = source.get('max_entries', self.config.get('max_entries', DEFAULT_MAX_ENTRIES))
+            try:
+                content = self.download_feed(source['url'], json_feed=source.get('json_feed'), meta=meta,
+                                             max_entries=max_entries, max_bytes=source.get('max_bytes'))
+                return content, meta, None
+            except RetryAfter:
+                raise
+            except Exception as e:
+                return None, meta, str(e)
+        
+        def collect(source, content, meta, error):
+            url = source['url']
+            if error is not None:
+                results[url] = ([], error)
+            elif content is None:
+                results[url] = ([], None)
+            else:
+                max_entries = source.get('max_entries', self.config.get('max_entries', DEFAULT_MAX_ENTRIES))
+                jobs.append((content, url, max_entries, meta.get('content_type')))
+        
+        # 下载阶段（I/O密集，使用线程）：按主机排队，只分发当前可以请求的主机的RSS源，
+        # 被限流的主机在队列中等待，不占用下载线程，其他主机照常全速下载
+        pending: Dict[str, deque] = {}
+        for source in sources:
+            pending.setdefault(host_of(source['url']), deque()).append(source)
+        held: Dict[str, float] = {}
+        retried = set()
+        running = {}
+        with ThreadPoolExecutor(max_workers=fetch_workers) as executor:
+            while pending or running:
+                # 轮流从各主机取一个RSS源分发，直到线程占满或所有主机都在等待
+                wait = math.inf
+                ready = deque(pending)
+                while ready and len(running) < fetch_workers:
+                    host = ready.popleft()
+                    queue = pending[host]
+                    url = queue[0]['url']
+                    try:
+                        self.hosts.check(url, self.retry_after_max_seconds)
+                    except RetryAfter as e:
+                        # Retry-After太长，本次运行跳过该主机剩余的RSS源
+                        for source in queue:
+                            collect(source, None, {}, str(e))
+                        del pending[host]
+                        continue
+                    delay = self.hosts.try_start(url)
+                    if delay > 0:
+                        held.setdefault(url, time.perf_counter())
+                        wait = min(wait, delay)
+                        continue
+                    source = queue.popleft()
+                    if queue:
+                        ready.append(host)
+                    else:
+                        del pending[host]
+                    if url in held:
+                        self.report.add(url, 'throttle', time.perf_counter() - held.pop(url))
+                    running[executor.submit(download, source)] = source
+                
+                if not running:
+                    time.sleep(min(wait, 1.0))
+                    continue
+                done, _ = futures_wait(running, timeout=None if wait == math.inf else wait,
+                                       return_when=FIRST_COMPLETED)
+                for future in done:
+                    source = running.pop(future)
+                    url = source['url']
+                    self.hosts.finish(url)
+                    try:
+                        content, meta, error = future.result()
+                    except RetryAfter as e:
+                        if url not in retried and e.seconds <= self.retry_after_max_seconds:
+                            # 等到Retry-After之后重试一次
+                            retried.add(url)
+                            print(f"   ⏳ {url} {e}，稍后重试")
+                            pending.setdefault(host_of(url), deque()).appendleft(source)
+                            continue
+                        content, meta, error = None, {}, str(e)
+                    collect(source, content, meta, error)
+        
+        # 解析阶段（CPU密集，使用进程池绕开GIL）
+        if parse_workers > 0 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=parse_workers) as pool:
+                parsed = list(pool.map(parse_feed_job, jobs, chunksize=chunksize))
+        else:
+            parsed = [parse_feed_job(job) for job in jobs]
+        
+        for (_, url, _, _), (articles, messages, error, timings, links) in zip(jobs, parsed):
+            self.parse_messages[url] = messages
+            for stage, seconds in timings.items():
+                self.report.add(url, stage, seconds)
+            self.report.set(url, 'articles', len(articles or []))
+            if self.websub and links.get('hub'):
+                self.websub.discovered(url, links['hub'], links.get('self') or url)
+            results[url] = (articles or [], error)
+        return results
+    
     def send_error_to_discord(self, source_name: str, url: str, error_type: str, error_message: str = ""):
         """发送错误/状态消息到Discord"""
+        import requests
+        
         webhook_url = self.config.get('discord_webhook')
         if not webhook_url:
             print("❌ 未配置Discord Webhook地址")
@@ -434,42 +918,30 @@ class RSSMonitor:
     
     def send_to_discord(self, article: Dict, source_name: str = ""):
         """发送消息到Discord（使用纯文本格式，避免Embed格式问题）"""
-        webhook_url = self.config.get('discord_webhook')
-        if not webhook_url:
-            print("❌ 未配置Discord Webhook地址")
-            return False
-        
+        return self.post_to_discord(self.build_discord_message(article, source_name))
+    
+    def build_discord_message(self, article: Dict, source_name: str = "") -> Dict:
+        """构建Discord消息体"""
         # 构建消息内容
-        title = article.get('title', '无标题')
         link = article.get('link', '')
-        summary = article.get('summary', '')
         published = article.get('published', '')
         
-        # 清理标题，移除HTML标签
-        if title:
-            title = re.sub(r'<[^>]+>', '', title)
-            title = html.unescape(title).strip()
+        # 清理标题和摘要中的HTML标签，并转义Discord特殊字符，避免格式问题
+        if isinstance(article, Article):
+            title_escaped, summary_escaped = article.discord_text()
         else:
-            title = "无标题"
-        
-        # 清理摘要，移除HTML标签
-        if summary:
-            summary = re.sub(r'<[^>]+>', '', summary)
-            summary = html.unescape(summary).strip()
+            title_escaped, summary_escaped = discord_text(article.get('title', '无标题'), article.get('summary', ''))
         
         # 构建纯文本消息（使用Discord Markdown格式）
         # Discord content字段限制2000字符
         content_parts = []
         
         # 标题（加粗）
-        if title:
-            # 转义Discord特殊字符，避免格式问题
-            title_escaped = title.replace('*', '\\*').replace('_', '\\_').replace('`', '\\`').replace('~', '\\~')
+        if title_escaped:
             content_parts.append(f"**{title_escaped[:1900]}**")  # 留出空间给其他内容
         
         # 摘要
-        if summary:
-            summary_escaped = summary.replace('*', '\\*').replace('_', '\\_').replace('`', '\\`').replace('~', '\\~')
+        if summary_escaped:
             # 计算剩余空间
             current_length = sum(len(part) for part in content_parts) + len('\n') * (len(content_parts) - 1)
             remaining = 2000 - current_length - 50  # 留出空间给链接等
@@ -502,23 +974,39 @@ class RSSMonitor:
             content = content[:1997] + "..."
         
         # 构建消息（使用content字段，不使用embeds）
-        message = {
+        return {
             "content": content
         }
+    
+    def post_to_discord(self, message: Dict) -> bool:
+        """发送已构建好的消息到Discord"""
+        import requests
         
+        webhook_url = self.config.get('discord_webhook')
+        if not webhook_url:
+            print("❌ 未配置Discord Webhook地址")
+            return False
+        
+        content = message.get('content', '')
+        title = content.split('\n', 1)[0].strip('*')
+        
+        detail = self.verbosity >= LOG_DETAIL
         try:
-            print(f"📤 正在发送到Discord: {title[:50]}...")
-            print(f"   Webhook: {webhook_url[:50]}...")
-            print(f"   消息长度: {len(content)} 字符")
+            if detail:
+                print(f"📤 正在发送到Discord: {title[:50]}...")
+                print(f"   Webhook: {webhook_url[:50]}...")
+                print(f"   消息长度: {len(content)} 字符")
             
             response = requests.post(webhook_url, json=message, timeout=10)
-            print(f"   HTTP状态码: {response.status_code}")
+            if detail:
+                print(f"   HTTP状态码: {response.status_code}")
             
             response.raise_for_status()
             
             # Discord成功返回204 No Content或200 OK
             if response.status_code in [200, 204]:
-                print(f"✅ 推送成功: {title[:50]}...")
+                if detail:
+                    print(f"✅ 推送成功: {title[:50]}...")
                 return True
             else:
                 print(f"❌ 推送失败: HTTP {response.status_code}")
@@ -544,12 +1032,10 @@ class RSSMonitor:
     
     def send_to_feishu(self, article: Dict, source_name: str = ""):
         """发送消息到飞书"""
-        webhook_url = self.config.get('feishu_webhook')
-        if not webhook_url:
-            print("❌ 未配置飞书Webhook地址")
-            return False
-        
-        # 构建消息卡片
+        return self.post_to_feishu(self.build_feishu_message(article, source_name))
+    
+    def build_feishu_elements(self, article: Dict) -> List[Dict]:
+        """构建单篇文章的飞书卡片元素组"""
         title = article.get('title', '无标题')
         link = article.get('link', '')
         summary = article.get('summary', '')
@@ -557,7 +1043,6 @@ class RSSMonitor:
         
         # 清理摘要，移除HTML标签
         if summary:
-            import re
             summary = re.sub(r'<[^>]+>', '', summary)
             summary = summary.strip()[:200]  # 限制长度
         
@@ -610,10 +1095,11 @@ class RSSMonitor:
                 ]
             })
         
-        # 飞书消息格式
-        header_title = f"📰 {source_name} - 新文章推送" if source_name else "📰 新文章推送"
-        
-        message = {
+        return elements
+    
+    def build_feishu_card(self, header_title: str, elements: List[Dict]) -> Dict:
+        """构建飞书消息卡片"""
+        return {
             "msg_type": "interactive",
             "card": {
                 "config": {
@@ -629,55 +1115,598 @@ class RSSMonitor:
                 "elements": elements
             }
         }
+    
+    def build_feishu_message(self, article: Dict, source_name: str = "") -> Dict:
+        """构建飞书消息卡片"""
+        # 飞书消息格式
+        header_title = f"📰 {source_name} - 新文章推送" if source_name else "📰 新文章推送"
+        return self.build_feishu_card(header_title, self.build_feishu_elements(article))
+    
+    def build_feishu_batch_messages(self, articles: List[Dict], source_name: str = "") -> List[tuple]:
+        """把同一来源的多篇文章合并为尽量少的飞书卡片
+
+        每篇文章是一个元素组，组之间用分割线隔开；卡片序列化后超过大小限制时另起一张卡片。
+        返回 [(message, articles)]，articles 为该卡片包含的文章。
+        """
+        max_bytes = self.config.get('feishu_card_max_bytes', FEISHU_CARD_MAX_BYTES)
+        batches = []
+        elements = []
+        batch_articles = []
+        size = 0
         
-        try:
-            print(f"📤 正在发送到飞书: {title[:50]}...")
-            print(f"   Webhook: {webhook_url[:50]}...")
+        def flush():
+            count = len(batch_articles)
+            header_title = f"📰 {source_name} - {count} 篇新文章" if source_name else f"📰 {count} 篇新文章"
+            batches.append((self.build_feishu_card(header_title, elements), batch_articles))
+        
+        # 卡片框架本身的大小
+        base_size = len(json.dumps(self.build_feishu_card(f"📰 {source_name} - 000 篇新文章", []),
+                                   ensure_ascii=False).encode('utf-8'))
+        
+        separator = {"tag": "hr"}
+        separator_size = len(json.dumps(separator)) + 1
+        
+        for article in articles:
+            group = self.build_feishu_elements(article)
+            group_size = len(json.dumps(group, ensure_ascii=False).encode('utf-8'))
             
-            response = requests.post(webhook_url, json=message, timeout=10)
-            print(f"   HTTP状态码: {response.status_code}")
+            if batch_articles and base_size + size + separator_size + group_size > max_bytes:
+                flush()
+                elements, batch_articles, size = [], [], 0
             
-            response.raise_for_status()
-            result = response.json()
-            print(f"   响应内容: {result}")
+            if batch_articles:
+                elements.append(separator)
+                size += separator_size
+            elements.extend(group)
+            batch_articles.append(article)
+            size += group_size
+        
+        if batch_articles:
+            flush()
+        return batches
+    
+    def post_to_feishu(self, message: Dict) -> bool:
+        """发送已构建好的消息到飞书
+
+        发送前先从令牌桶取令牌（客户端限流），遇到飞书限流错误码或HTTP 429时退避重试。
+        """
+        import requests
+        
+        webhook_url = self.config.get('feishu_webhook')
+        if not webhook_url:
+            print("❌ 未配置飞书Webhook地址")
+            return False
+        
+        title = message.get('card', {}).get('header', {}).get('title', {}).get('content', '')
+        max_retries = self.config.get('feishu_max_retries', 3)
+        detail = self.verbosity >= LOG_DETAIL
+        
+        for attempt in range(max_retries + 1):
+            waited = self.feishu_bucket.acquire()
+            if waited > 0.5:
+                print(f"   ⏳ 飞书限流，等待 {waited:.1f} 秒")
             
-            if result.get('code') == 0:
-                print(f"✅ 推送成功: {title[:50]}...")
-                return True
-            else:
-                error_msg = result.get('msg', '未知错误')
-                print(f"❌ 推送失败: {error_msg}")
-                print(f"   完整响应: {result}")
+            try:
+                if detail:
+                    print(f"📤 正在发送到飞书: {title[:50]}...")
+                    print(f"   Webhook: {webhook_url[:50]}...")
+                
+                response = requests.post(webhook_url, json=message, timeout=10)
+                if detail:
+                    print(f"   HTTP状态码: {response.status_code}")
+                
+                if response.status_code == 429:
+                    code = 429
+                    error_msg = "HTTP 429 Too Many Requests"
+                else:
+                    response.raise_for_status()
+                    result = response.json()
+                    code = result.get('code', result.get('StatusCode'))
+                    error_msg = result.get('msg', result.get('StatusMessage', '未知错误'))
+                
+                if code == 0:
+                    if detail:
+                        print(f"✅ 推送成功: {title[:50]}...")
+                    return True
+                
+                if code in FEISHU_RATE_LIMIT_CODES or code == 429:
+                    self.feishu_bucket.drain()
+                    if attempt < max_retries:
+                        wait_time = 2 ** attempt
+                        print(f"   ⚠️ 飞书限流 (code={code})，{wait_time} 秒后重试 ({attempt + 1}/{max_retries})")
+                        time.sleep(wait_time)
+                        continue
+                
+                print(f"❌ 推送失败: {error_msg} (code={code})")
                 return False
-        except requests.exceptions.RequestException as e:
-            print(f"❌ 网络请求失败: {e}")
-            if hasattr(e, 'response') and e.response is not None:
-                print(f"   响应状态码: {e.response.status_code}")
-                print(f"   响应内容: {e.response.text[:200]}")
+            except requests.exceptions.RequestException as e:
+                print(f"❌ 网络请求失败: {e}")
+                if hasattr(e, 'response') and e.response is not None:
+                    print(f"   响应状态码: {e.response.status_code}")
+                    print(f"   响应内容: {e.response.text[:200]}")
+                return False
+            except Exception as e:
+                print(f"❌ 发送到飞书失败: {e}")
+                import traceback
+                traceback.print_exc()
+                return False
+        
+        return False
+    
+    def get_destination(self) -> str:
+        """当前推送目的地：Discord优先，其次飞书"""
+        if self.config.get('discord_webhook'):
+            return 'discord'
+        if self.config.get('feishu_webhook'):
+            return 'feishu'
+        return ''
+    
+    def post_message(self, destination: str, message: Dict) -> bool:
+        """按目的地发送已构建好的消息，并记录推送耗时"""
+        started = time.perf_counter()
+        if destination == 'discord':
+            success = self.post_to_discord(message)
+        elif destination == 'feishu':
+            success = self.post_to_feishu(message)
+        else:
+            print(f"   ⚠️ 未知的推送目的地: {destination}")
             return False
-        except Exception as e:
-            print(f"❌ 发送到飞书失败: {e}")
-            import traceback
-            traceback.print_exc()
+        self.report.add_delivery(destination, time.perf_counter() - started, success)
+        return success
+    
+    def record_pushed(self, records: List[Dict], destination: str = "", source_name: str = ""):
+        """记录已推送的文章（开启归档时同时加入归档的待写入列表）"""
+        pushed_at = datetime.now().isoformat()
+        for record in records:
+            self.state[record['key']] = {
+                'title': record['title'],
+                'link': record['link'],
+                'pushed_at': pushed_at
+            }
+            self.journal_state(record['key'], self.state[record['key']])
+        if self.archive is not None:
+            self.archive.add(records, destination, source_name)
+    
+    def flush_archive(self):
+        """把本次运行推送的文章批量写入归档"""
+        if self.archive is None:
+            return
+        import sqlite3
+        try:
+            count = self.archive.flush()
+        except sqlite3.Error as e:
+            print(f"⚠️ 写入推送归档失败（常驻模式下一轮重试）: {e}")
+            return
+        if count and self.verbosity >= LOG_DETAIL:
+            print(f"🗄️ {count} 篇文章已写入推送归档")
+    
+    def record_filtered(self, source_key: str, article: Dict, reason: str):
+        """记录被规则过滤的文章，之后不再重复判断"""
+        self.state[source_key] = {
+            'title': article['title'],
+            'link': article['link'],
+            'pushed_at': datetime.now().isoformat(),
+            'filtered_by': reason,
+        }
+        self.journal_state(source_key, self.state[source_key])
+        self.state_changed = True
+    
+    def apply_rules(self, new_articles: List[tuple], source: Dict) -> Tuple[List[tuple], Dict[str, str]]:
+        """用过滤与路由规则处理新文章，返回 (保留的文章, {source_key: 路由目的地})"""
+        kept = []
+        routes = {}
+        for article, source_key in new_articles:
+            allowed, destination, reason = self.rules.evaluate(article, source)
+            if not allowed:
+                if self.verbosity >= LOG_DETAIL:
+                    print(f"   🚫 被规则过滤（{reason}）: {article['title'][:50]}...")
+                self.record_filtered(source_key, article, reason)
+                continue
+            if destination:
+                routes[source_key] = destination
+            kept.append((article, source_key))
+        if len(kept) < len(new_articles) and self.verbosity >= LOG_SUMMARY:
+            print(f"   🚫 规则过滤掉 {len(new_articles) - len(kept)} 篇文章")
+        return kept, routes
+    
+    def drain_outbox(self) -> int:
+        """重试发件箱中到期的消息，返回成功推送的文章数"""
+        if not self.outbox.items:
+            return 0
+        
+        print(f"\n📦 发件箱中有 {len(self.outbox.items)} 条待重试消息")
+        
+        def send(destination, payload):
+            success = self.post_message(destination, payload)
+            if destination == 'discord':
+                time.sleep(1)  # 避免发送过快（飞书由令牌桶限流）
+            return success
+        
+        # 上次运行投递成功、已写入状态日志，但发件箱文件还没来得及保存就中断的消息，不再重复发送
+        recorded = self.outbox.discard(
+            lambda item: item['records'] and all(record['key'] in self.state for record in item['records']))
+        if recorded:
+            print(f"   ℹ️ {len(recorded)} 条消息上次已投递成功，从发件箱移除")
+        
+        def on_delivered(item):
+            self.record_pushed(item['records'], item['destination'], item.get('source_name', ''))
+        
+        delivered = self.outbox.drain(send, on_delivered=on_delivered)
+        # 立即保存发件箱，缩小“已推送但仍在发件箱中”的窗口
+        self.outbox.save()
+        count = sum(len(item['records']) for item in delivered)
+        if delivered:
+            print(f"   ✅ 发件箱重试成功 {len(delivered)} 条消息")
+        return count
+    
+    def deliver(self, destination: str, message: Dict, records: List[Dict], source_name: str = "") -> bool:
+        """推送消息，失败时放入发件箱等待重试
+
+        如果该目的地在发件箱中还有待重试的消息，新消息直接排在后面，保证推送顺序。
+        """
+        if self.outbox.has_pending(destination):
+            print(f"   📦 {destination} 有待重试消息，新消息加入发件箱排队")
+            self.outbox.enqueue(destination, message, records, source_name)
             return False
+        
+        if self.post_message(destination, message):
+            self.record_pushed(records, destination, source_name)
+            return True
+        
+        print(f"   📦 推送失败，已加入发件箱稍后重试")
+        self.outbox.enqueue(destination, message, records, source_name)
+        return False
+    
+    def get_digest_settings(self, source: Dict, destination: str) -> Dict:
+        """获取摘要模式配置，未开启返回None
+
+        RSS源上的 "digest" 优先于目的地级别的 "discord_digest" / "feishu_digest"，
+        RSS源上设置 "digest": false 可以关闭该源的摘要模式。
+        """
+        if 'digest' in source:
+            settings = source['digest']
+        else:
+            settings = self.config.get(f'{destination}_digest')
+        if not settings:
+            return None
+        return settings if isinstance(settings, dict) else {}
+    
+    def build_discord_digest_messages(self, items: List[Dict], source_name: str = "") -> List[tuple]:
+        """构建Discord摘要消息（每篇文章一行），超过2000字符时拆分为多条
+
+        返回 [(message, items)]
+        """
+        header = f"📰 **{source_name} 摘要**" if source_name else "📰 **新文章摘要**"
+        batches = []
+        lines = []
+        batch_items = []
+        length = 0
+        
+        def flush():
+            content = f"{header}（{len(batch_items)} 篇）\n" + '\n'.join(lines)
+            batches.append(({"content": content}, batch_items))
+        
+        for item in items:
+            title = item.get('title') or '无标题'
+            title = title.replace('*', '\\*').replace('_', '\\_').replace('`', '\\`').replace('~', '\\~')
+            title = title.replace('[', '(').replace(']', ')')[:200]
+            link = item.get('link', '')
+            line = f"• [{title}](<{link}>)" if link else f"• {title}"
+            
+            if batch_items and len(header) + 20 + length + len(line) + 1 > 2000:
+                flush()
+                lines, batch_items, length = [], [], 0
+            lines.append(line)
+            batch_items.append(item)
+            length += len(line) + 1
+        
+        if batch_items:
+            flush()
+        return batches
+    
+    def build_feishu_digest_messages(self, items: List[Dict], source_name: str = "") -> List[tuple]:
+        """构建飞书摘要卡片（每篇文章一行），超过卡片大小限制时拆分
+
+        返回 [(message, items)]
+        """
+        max_bytes = self.config.get('feishu_card_max_bytes', FEISHU_CARD_MAX_BYTES)
+        batches = []
+        lines = []
+        batch_items = []
+        size = 0
+        
+        def flush():
+            count = len(batch_items)
+            header_title = f"📰 {source_name} 摘要（{count} 篇）" if source_name else f"📰 新文章摘要（{count} 篇）"
+            elements = [{"tag": "div", "text": {"tag": "lark_md", "content": '\n'.join(lines)}}]
+            batches.append((self.build_feishu_card(header_title, elements), batch_items))
+        
+        base_size = len(json.dumps(self.build_feishu_card(f"📰 {source_name} 摘要（000 篇）", [
+            {"tag": "div", "text": {"tag": "lark_md", "content": ""}}]), ensure_ascii=False).encode('utf-8'))
+        
+        for item in items:
+            title = (item.get('title') or '无标题').replace('[', '(').replace(']', ')')[:200]
+            link = item.get('link', '')
+            line = f"• [{title}]({link})" if link else f"• {title}"
+            # json转义后的大小
+            line_size = len(json.dumps(line, ensure_ascii=False).encode('utf-8'))
+            
+            if batch_items and base_size + size + line_size > max_bytes:
+                flush()
+                lines, batch_items, size = [], [], 0
+            lines.append(line)
+            batch_items.append(item)
+            size += line_size
+        
+        if batch_items:
+            flush()
+        return batches
+    
+    def flush_digests(self) -> int:
+        """推送所有窗口已关闭的摘要，返回推送成功的文章数"""
+        pushed = 0
+        for buffer in self.digests.pop_closed():
+            destination = buffer['destination']
+            source_name = buffer['source_name']
+            items = buffer['items']
+            print(f"\n🗞️ 摘要窗口关闭: {source_name} → {destination}（{len(items)} 篇）")
+            
+            if destination == 'discord':
+                batches = self.build_discord_digest_messages(items, source_name)
+            else:
+                batches = self.build_feishu_digest_messages(items, source_name)
+            
+            for message, batch_items in batches:
+                records = [dict(item, source=item.get('source', buffer['source_url'])) for item in batch_items]
+                if self.deliver(destination, message, records, source_name):
+                    pushed += len(records)
+                if destination == 'discord':
+                    time.sleep(1)  # 避免发送过快
+        return pushed
+    
+    def push_articles(self, new_articles: List[tuple], source: Dict, routes: Optional[Dict[str, str]] = None,
+                      destination: Optional[str] = None) -> int:
+        """推送同一来源的新文章，返回推送成功的文章数
+
+        new_articles: [(article, source_key)]
+        routes: 路由规则给出的 {source_key: 目的地}，按目的地分组推送
+        开启摘要模式时文章先进入摘要缓冲区，等窗口关闭后统一推送；
+        飞书开启 feishu_batch 时，同一来源的文章合并为尽量少的卡片发送。
+        """
+        source_name = source.get('name', source.get('url', ''))
+        
+        if routes:
+            groups: Dict[str, List[tuple]] = {}
+            for pair in new_articles:
+                route = routes.get(pair[1])
+                if route and not self.config.get(f'{route}_webhook'):
+                    print(f"   ⚠️ 路由目的地 {route} 未配置Webhook，改用默认目的地")
+                    route = None
+                groups.setdefault(route or self.get_destination(), []).append(pair)
+            return sum(self.push_articles(pairs, source, destination=route) for route, pairs in groups.items())
+        
+        # 发送到Discord（优先）或飞书
+        destination = destination or self.get_destination()
+        if not destination:
+            print("   ⚠️ 未配置任何Webhook地址")
+            return 0
+        
+        def to_record(article, source_key):
+            # 摘要、发布时间和来源供推送归档使用
+            return {'key': source_key, 'title': article['title'], 'link': article['link'],
+                    'published': article.get('published', ''), 'published_ts': published_timestamp(article),
+                    'summary': article.get('summary', ''), 'source': source['url']}
+        
+        digest_settings = self.get_digest_settings(source, destination)
+        if digest_settings is not None:
+            full = False
+            for article, source_key in new_articles:
+                full |= self.digests.add(destination, source['url'], source_name, digest_settings,
+                                         to_record(article, source_key))
+            print(f"   🗞️ {len(new_articles)} 篇文章加入摘要缓冲区")
+            # 达到 max_items 的窗口立即推送
+            return self.flush_digests() if full else 0
+        
+        if destination == 'feishu' and self.config.get('feishu_batch'):
+            keys = {id(article): source_key for article, source_key in new_articles}
+            batches = self.build_feishu_batch_messages([a for a, _ in new_articles], source_name)
+            print(f"   📦 {len(new_articles)} 篇文章合并为 {len(batches)} 张飞书卡片")
+            pushed = 0
+            for message, articles in batches:
+                records = [to_record(a, keys[id(a)]) for a in articles]
+                if self.deliver(destination, message, records, source_name):
+                    pushed += len(records)
+                else:
+                    print(f"   ⚠️ 推送失败，但继续处理其他文章")
+            return pushed
+        
+        pushed = 0
+        for article, source_key in new_articles:
+            if destination == 'discord':
+                message = self.build_discord_message(article, source_name)
+            else:
+                message = self.build_feishu_message(article, source_name)
+            
+            if self.deliver(destination, message, [to_record(article, source_key)], source_name):
+                pushed += 1
+            else:
+                print(f"   ⚠️ 推送失败，但继续处理其他文章")
+            
+            # 避免发送过快（飞书由令牌桶限流）
+            if destination == 'discord':
+                time.sleep(1)
+        return pushed
+    
+    def update_outbox_metrics(self):
+        """更新发件箱指标并输出"""
+        self.metrics.update(self.outbox.metrics())
+        if self.metrics['outbox_depth'] or self.metrics['outbox_expired']:
+            print(f"\n📦 发件箱: 待重试 {self.metrics['outbox_depth']} 条，"
+                  f"最早一条已等待 {self.metrics['outbox_oldest_age_seconds']} 秒，"
+                  f"本次过期丢弃 {self.metrics['outbox_expired']} 条")
+    
+    def is_catch_up(self, source: Dict) -> bool:
+        """RSS源是否开启补推模式（RSS源上的配置优先于全局配置）"""
+        return bool(source.get('catch_up', self.config.get('catch_up', False)))
+    
+    def get_last_success(self, url: str):
+        """获取RSS源上次成功拉取的时间"""
+        meta = self.state.get(SOURCES_STATE_KEY, {}).get(url, {})
+        last_success = meta.get('last_success')
+        return datetime.fromisoformat(last_success) if last_success else None
+    
+    def set_last_success(self, url: str, when: datetime):
+        """记录RSS源上次成功拉取的时间"""
+        self.state.setdefault(SOURCES_STATE_KEY, {}).setdefault(url, {})['last_success'] = when.isoformat()
+        self.journal_state([SOURCES_STATE_KEY, url, 'last_success'], when.isoformat())
+        self.state_changed = True
     
-    def check_and_push(self):
-        """检查RSS源并推送新文章"""
+    def get_window_seconds(self, source: Dict, poll_started: datetime) -> float:
+        """计算新文章的时间窗口（秒）
+
+        补推模式下窗口从上次成功拉取时间开始（加上一段宽限时间，避免遗漏发布后延迟出现在源中的文章），
+        最长不超过 catch_up_max_age_hours；没有记录时退回默认的10分钟窗口。
+        """
+        if not self.is_catch_up(source):
+            return RECENT_WINDOW_SECONDS
+        
+        last_success = self.get_last_success(source['url'])
+        if last_success is None:
+            return RECENT_WINDOW_SECONDS
+        
+        grace = self.config.get('catch_up_grace_seconds', 120)
+        max_age = self.config.get('catch_up_max_age_hours', 24) * 3600
+        window = (poll_started - last_success).total_seconds() + grace
+        return min(max(window, RECENT_WINDOW_SECONDS), max_age)
+    
+    def filter_recent_articles(self, articles: List[Dict], window_seconds: float) -> List[Dict]:
+        """筛选时间窗口内的新文章，没有发布时间的文章默认保留（避免遗漏）"""
+        current_ts = (datetime.now() - EPOCH).total_seconds()
+        window_minutes = int(window_seconds / 60)
+        recent_articles = []
+        detail = self.verbosity >= LOG_DETAIL
+        
+        for article in articles:
+            published_ts = published_timestamp(article)
+            
+            # 检查发布时间是否在时间窗口内
+            if published_ts is not None:
+                try:
+                    # 计算时间差（秒）
+                    time_diff = current_ts - published_ts
+                    
+                    if time_diff >= 0 and time_diff <= window_seconds:
+                        recent_articles.append(article)
+                        if not detail:
+                            continue
+                        minutes_ago = int(time_diff / 60)
+                        seconds_ago = int(time_diff % 60)
+                        if minutes_ago > 0:
+                            print(f"   ✅ {window_minutes}分钟内新文章: {article['title'][:50]}... (发布于 {minutes_ago} 分钟前)")
+                        else:
+                            print(f"   ✅ {window_minutes}分钟内新文章: {article['title'][:50]}... (发布于 {seconds_ago} 秒前)")
+                    elif detail:
+                        minutes_ago = int(time_diff / 60)
+                        if time_diff < 0:
+                            print(f"   ⏭️ 跳过未来文章: {article['title'][:50]}... (时间异常)")
+                        else:
+                            print(f"   ⏭️ 跳过旧文章: {article['title'][:50]}... (发布于 {minutes_ago} 分钟前)")
+                except Exception as e:
+                    # 时间计算出错，默认推送（避免遗漏）
+                    print(f"   ⚠️ 时间计算失败，默认推送: {article['title'][:50]}... ({e})")
+                    recent_articles.append(article)
+            else:
+                # 如果没有发布时间，默认推送（避免遗漏）
+                if detail:
+                    print(f"   ⚠️ 无法解析发布时间，默认推送: {article['title'][:50]}...")
+                recent_articles.append(article)
+        
+        if self.verbosity >= LOG_SUMMARY:
+            print(f"   筛选后: {len(recent_articles)} 条{window_minutes}分钟内的新消息（共获取 {len(articles)} 条）")
+        return recent_articles
+    
+    def push_backlog(self, new_articles: List[tuple], source: Dict, poll_started: datetime,
+                     routes: Optional[Dict[str, str]] = None) -> int:
+        """补推模式：按发布时间从旧到新分批推送积压文章，返回推送成功的文章数
+
+        每次运行最多推送 catch_up_max_items 篇，剩下的留到下次运行；
+        上次成功拉取时间只推进到已处理的最后一篇文章，保证剩余文章下次仍在窗口内。
+        """
+        batch_size = max(1, self.config.get('catch_up_batch_size', 5))
+        pause = self.config.get('catch_up_batch_pause_seconds', 5)
+        max_items = self.config.get('catch_up_max_items', 50)
+        
+        new_articles = sorted(new_articles, key=lambda pair: pair[0].get('published_time') or poll_started)
+        deferred = len(new_articles) - max_items
+        if deferred > 0:
+            new_articles = new_articles[:max_items]
+            print(f"   📚 积压 {len(new_articles) + deferred} 篇，本次补推 {len(new_articles)} 篇，其余下次继续")
+        elif len(new_articles) > batch_size:
+            print(f"   📚 补推 {len(new_articles)} 篇积压文章，每批 {batch_size} 篇")
+        
+        pushed = 0
+        for start in range(0, len(new_articles), batch_size):
+            if start > 0:
+                time.sleep(pause)
+            pushed += self.push_articles(new_articles[start:start + batch_size], source, routes)
+        
+        watermark = poll_started
+        if deferred > 0:
+            last_published = new_articles[-1][0].get('published_time')
+            if last_published:
+                watermark = min(last_published, poll_started)
+        self.set_last_success(source['url'], watermark)
+        return pushed
+    
+    def check_and_push(self, prefetched: Optional[Dict[str, Tuple[List[Dict], Optional[str]]]] = None,
+                       sources: Optional[List[Dict]] = None, fetch_report: Optional[RunReport] = None):
+        """检查RSS源并推送新文章
+
+        prefetched: 已经获取好的 {url: (文章列表, 错误信息)}（多租户模式下由共享获取阶段提供，
+                    常驻模式下为WebSub推送的内容），不在其中的RSS源仍然自己获取
+        sources: 只检查这些RSS源（默认为配置中的全部RSS源）
+        fetch_report: 获取 prefetched 时的运行报告，其中的下载、解析耗时和字节数计入本次报告
+        """
+        # 冷启动耗时：进程内第一次运行从模块导入开始算，之后从创建监控器开始算
+        global _import_started
+        started = _import_started if _import_started is not None else self.created_at
+        _import_started = None
+        startup_seconds = time.perf_counter() - started
+        
+        self.report = RunReport()
+        self.rules.reset_hits()
+        
         # 验证配置
         print("\n📋 配置检查:")
         print(f"   Discord Webhook: {'已配置' if self.config.get('discord_webhook') else '❌ 未配置'}")
         print(f"   飞书Webhook: {'已配置' if self.config.get('feishu_webhook') else '❌ 未配置'}")
         
-        rss_sources = self.config.get('rss_sources', [])
+        rss_sources = self.config.get('rss_sources', []) if sources is None else sources
         if not rss_sources:
             print("⚠️ 未配置RSS源")
             return
         
+        if self.shard:
+            total = len(rss_sources)
+            rss_sources = rss_shard.filter_sources(rss_sources, self.shard)
+            print(f"   分片: {self.shard[0]}/{self.shard[1]}（负责 {len(rss_sources)}/{total} 个RSS源）")
+        
         print(f"   RSS源数量: {len(rss_sources)}")
-        for i, source in enumerate(rss_sources, 1):
-            print(f"   {i}. {source.get('name', '未命名')}: {source.get('url', '无URL')}")
+        if fetch_report is not None:
+            self.report.import_sources(fetch_report, {s.get('url') for s in rss_sources})
+        if self.verbosity >= LOG_DETAIL:
+            for i, source in enumerate(rss_sources, 1):
+                print(f"   {i}. {source.get('name', '未命名')}: {source.get('url', '无URL')}")
+        
+        # 先重试发件箱中的失败消息
+        new_count = self.drain_outbox()
         
-        new_count = 0
+        # 开启并行获取时，先统一下载和解析所有RSS源
+        if prefetched is None:
+            prefetched = {}
+            if (self.config.get('fetch_workers', 1) > 1 or self.config.get('parse_workers', 0) > 0
+                    or self.config.get('host_limits')):
+                prefetched = self.fetch_all([s for s in rss_sources if s.get('url')])
         
         for source in rss_sources:
             url = source.get('url', '')
@@ -687,18 +1716,40 @@ class RSSMonitor:
                 print(f"⚠️ 跳过无效RSS源: {name} (无URL)")
                 continue
             
-            print(f"\n🔍 检查RSS源: {name}")
-            print(f"   URL: {url}")
+            self.report.source(url, name)
+            if self.verbosity >= LOG_SUMMARY:
+                print(f"\n🔍 检查RSS源: {name}")
+            if self.verbosity >= LOG_DETAIL:
+                print(f"   URL: {url}")
+            
+            catch_up = self.is_catch_up(source)
+            max_entries = source.get('max_entries', self.config.get('max_entries', DEFAULT_MAX_ENTRIES))
+            poll_started = datetime.now()
             
             # 捕获获取RSS时的错误信息
             error_info = None
-            try:
-                articles = self.fetch_rss(url)
-                print(f"   获取到 {len(articles)} 篇文章")
-            except Exception as e:
-                error_info = str(e)
-                articles = []
-                print(f"   ❌ 获取RSS时发生异常: {e}")
+            if url in prefetched:
+                if self.verbosity >= LOG_DETAIL:
+                    for line in self.parse_messages.get(url, []):
+                        print(line)
+                articles, error_info = prefetched[url]
+                # 共享获取时按所有订阅者中最大的条数获取，这里截取到本源的条数
+                articles = articles[:max_entries]
+                if error_info:
+                    print(f"   ❌ 获取RSS时发生异常: {error_info}")
+                elif self.verbosity >= LOG_SUMMARY:
+                    print(f"   获取到 {len(articles)} 篇文章")
+            else:
+                try:
+                    articles = self.fetch_rss(url, max_entries, json_feed=source.get('json_feed'),
+                                              max_bytes=source.get('max_bytes'))
+                    if self.verbosity >= LOG_SUMMARY:
+                        print(f"   获取到 {len(articles)} 篇文章")
+                except Exception as e:
+                    error_info = str(e)
+                    articles = []
+                    print(f"   ❌ 获取RSS时发生异常: {e}")
+            self.report.set(url, 'error', error_info)
             
             # 如果没有获取到文章，发送错误通知
             if not articles:
@@ -747,82 +1798,80 @@ class RSSMonitor:
                 print("   ⚠️ 未获取到文章，已发送错误通知")
                 continue
             
-            # 筛选10分钟内的新消息
-            current_time = datetime.now()
-            recent_articles = []
+            # 筛选时间窗口内的新消息（默认10分钟，补推模式从上次成功拉取开始）
+            with self.report.time(url, 'filter'):
+                recent_articles = self.filter_recent_articles(articles, self.get_window_seconds(source, poll_started))
             
-            for article in articles:
-                published_time = article.get('published_time')
-                
-                # 检查发布时间是否在10分钟内
-                if published_time:
-                    try:
-                        # 计算时间差（秒）
-                        time_diff = (current_time - published_time).total_seconds()
-                        
-                        # 只推送10分钟内的消息（600秒）
-                        if time_diff >= 0 and time_diff <= 600:
-                            recent_articles.append(article)
-                            minutes_ago = int(time_diff / 60)
-                            seconds_ago = int(time_diff % 60)
-                            if minutes_ago > 0:
-                                print(f"   ✅ 10分钟内新文章: {article['title'][:50]}... (发布于 {minutes_ago} 分钟前)")
-                            else:
-                                print(f"   ✅ 10分钟内新文章: {article['title'][:50]}... (发布于 {seconds_ago} 秒前)")
-                        else:
-                            minutes_ago = int(time_diff / 60)
-                            if time_diff < 0:
-                                print(f"   ⏭️ 跳过未来文章: {article['title'][:50]}... (时间异常)")
-                            else:
-                                print(f"   ⏭️ 跳过旧文章: {article['title'][:50]}... (发布于 {minutes_ago} 分钟前)")
-                    except Exception as e:
-                        # 时间计算出错，默认推送（避免遗漏）
-                        print(f"   ⚠️ 时间计算失败，默认推送: {article['title'][:50]}... ({e})")
-                        recent_articles.append(article)
-                else:
-                    # 如果没有发布时间，默认推送（避免遗漏）
-                    print(f"   ⚠️ 无法解析发布时间，默认推送: {article['title'][:50]}...")
-                    recent_articles.append(article)
-            
-            print(f"   筛选后: {len(recent_articles)} 条10分钟内的新消息（共获取 {len(articles)} 条）")
+            if catch_up and len(articles) >= max_entries:
+                oldest = min((a['published_time'] for a in articles if a.get('published_time')), default=None)
+                if oldest and (poll_started - oldest).total_seconds() < self.get_window_seconds(source, poll_started):
+                    print(f"   ⚠️ 获取的 {max_entries} 条都在补推窗口内，可能有更早的文章被截断，可调大 max_entries")
             
-            # 只推送10分钟内的新消息
-            for article in recent_articles:
-                article_id = self.get_article_id(article)
-                source_key = f"{url}_{article_id}"
-                
-                # 检查是否已推送（去重）
-                if source_key not in self.state:
-                    print(f"📬 发现新文章: {article['title'][:50]}...")
-                    
-                    # 发送到Discord（优先）或飞书
-                    success = False
-                    if self.config.get('discord_webhook'):
-                        success = self.send_to_discord(article, name)
-                    elif self.config.get('feishu_webhook'):
-                        success = self.send_to_feishu(article, name)
-                    else:
-                        print("   ⚠️ 未配置任何Webhook地址")
+            # 只推送时间窗口内的新消息
+            new_articles = []
+            detail = self.verbosity >= LOG_DETAIL
+            with self.report.time(url, 'dedupe'):
+                for article in recent_articles:
+                    article_id = self.get_article_id(article)
+                    source_key = f"{url}_{article_id}"
                     
-                    if success:
-                        # 记录已推送
-                        self.state[source_key] = {
-                            'title': article['title'],
-                            'link': article['link'],
-                            'pushed_at': datetime.now().isoformat()
-                        }
-                        new_count += 1
+                    # 检查是否已推送（去重）
+                    if source_key in self.state:
+                        if detail:
+                            handled = '已被规则过滤' if self.state[source_key].get('filtered_by') else '已推送过'
+                            print(f"   ✓ {handled}: {article['title'][:50]}...")
+                    elif self.outbox.contains(source_key):
+                        if detail:
+                            print(f"   ⏳ 已在发件箱中等待重试: {article['title'][:50]}...")
+                    elif self.digests.contains(source_key):
+                        if detail:
+                            print(f"   🗞️ 已在摘要缓冲区中: {article['title'][:50]}...")
                     else:
-                        print(f"   ⚠️ 推送失败，但继续处理其他文章")
-                    
-                    # 避免发送过快
-                    time.sleep(1)
-                else:
-                    print(f"   ✓ 已推送过: {article['title'][:50]}...")
+                        if detail:
+                            print(f"📬 发现新文章: {article['title'][:50]}...")
+                        new_articles.append((article, source_key))
+            self.report.set(url, 'new_articles', len(new_articles))
+            
+            # 过滤与路由规则
+            routes = {}
+            if self.rules and new_articles:
+                with self.report.time(url, 'rules'):
+                    new_articles, routes = self.apply_rules(new_articles, source)
+            
+            if catch_up:
+                new_count += self.push_backlog(new_articles, source, poll_started, routes)
+            elif new_articles:
+                new_count += self.push_articles(new_articles, source, routes)
+        
+        # 推送已到期的摘要
+        new_count += self.flush_digests()
+        self.digests.save()
+        
+        # 保存发件箱并输出指标
+        self.outbox.save()
+        self.update_outbox_metrics()
         
         # 保存状态
-        if new_count > 0:
+        if new_count > 0 or self.state_changed or self.journal.count:
             self.save_state()
+        self.flush_archive()
+        
+        # 输出运行报告
+        if self.rules:
+            self.report.summary['rule_hits'] = dict(self.rules.hits)
+            if self.verbosity >= LOG_SUMMARY:
+                hits = '，'.join(f"{name} {count}" for name, count in self.rules.hits.items() if count)
+                print(f"\n🎯 规则命中: {hits or '无'}")
+        self.report.finish(sources=len(rss_sources), pushed=new_count,
+                           startup_seconds=round(startup_seconds, 6),
+                           bytes_read=sum(r['bytes'] for r in self.report.sources.values()),
+                           wire_bytes=sum(r['wire_bytes'] for r in self.report.sources.values()),
+                           bytes_skipped=sum(r['bytes_skipped'] or 0 for r in self.report.sources.values()),
+                           http2_sources=sum(r['http_version'] == 'HTTP/2' for r in self.report.sources.values()),
+                           **self.metrics)
+        self.write_report()
+        
+        if new_count > 0:
             print(f"\n✨ 本次共推送 {new_count} 条新消息")
         else:
             print("\n✨ 暂无新消息（所有文章都已推送过）")
@@ -831,18 +1880,277 @@ class RSSMonitor:
             print("   - 之后只会推送新发布的文章")
             print("   - 如果想重新推送所有文章，可以删除 rss_state.json 文件")
             print("   - 如果RSS源有问题，会发送错误通知到Discord")
+    
+    def serve(self):
+        """常驻模式：按 poll_interval_seconds 定时轮询，配置了 websub_callback_url 时同时接收WebSub推送
+
+        有有效订阅且最近有推送的源不再轮询；hub长时间没有动静时退回轮询。
+        每 config_watch_seconds 秒检查一次配置文件，修改后热加载，不需要重启。
+        """
+        interval = self.config.get('poll_interval_seconds', 300)
+        if self.config.get('websub_callback_url'):
+            from rss_websub import WebSub
+            self.websub = WebSub(self.config, self.get_data_path(self.config.get('websub_file', 'rss_websub.json')))
+            self.websub.start()
+        
+        watch_interval = self.config.get('config_watch_seconds', 5)
+        watcher = ConfigWatcher(self.config_file) if watch_interval and os.path.exists(self.config_file) else None
+        self.schedule = {source['url']: 0.0 for source in self.config.get('rss_sources', []) if source.get('url')}
+        
+        print(f"\n♻️ 常驻模式已启动，每 {interval} 秒轮询一次（Ctrl+C 退出）")
+        next_watch = time.time() + watch_interval if watcher else math.inf
+        try:
+            while True:
+                if time.time() >= next_watch:
+                    next_watch = time.time() + watch_interval
+                    if watcher.changed():
+                        self.reload_config()
+                
+                due = [url for url, at in self.schedule.items() if at <= time.time()]
+                if due:
+                    self.poll_once(due)
+                
+                next_poll = min(self.schedule.values(), default=time.time() + interval)
+                wake = min(next_poll, next_watch)
+                if self.websub:
+                    push = self.websub.next_push(wake - time.time())
+                    if push:
+                        self.handle_push(*push)
+                else:
+                    time.sleep(max(0.0, wake - time.time()))
+        except KeyboardInterrupt:
+            print("\n👋 常驻模式已退出")
+        finally:
+            if self.websub:
+                self.websub.stop()
+            self.http2.close()
+    
+    def poll_interval(self, source: Dict) -> float:
+        return source.get('poll_interval_seconds', self.config.get('poll_interval_seconds', 300))
+    
+    def poll_once(self, urls: Optional[List[str]] = None):
+        """常驻模式下的一轮轮询：只轮询已到时间的源（urls），跳过由WebSub推送覆盖的源"""
+        sources = self.config.get('rss_sources', [])
+        if urls is not None:
+            due = set(urls)
+            sources = [s for s in sources if s.get('url') in due]
+        now = time.time()
+        for source in sources:
+            self.schedule[source['url']] = now + self.poll_interval(source)
+        if self.websub:
+            polled = [s for s in sources if not self.websub.is_push_active(s.get('url', ''))]
+            if len(polled) < len(sources):
+                print(f"\n📡 {len(sources) - len(polled)} 个RSS源由WebSub推送，本轮不轮询")
+            sources = polled
+        if sources:
+            self.check_and_push(sources=sources)
+        if self.websub:
+            self.websub.renew()
+    
+    def reload_config(self) -> bool:
+        """重新加载配置文件：校验通过后整体替换，只调整新增、移除和修改过的RSS源
+
+        未变化的源保留轮询计划；限制未变化的主机保留限流状态；HTTP/2连接池、发件箱和状态不受影响。
+        新配置无效时继续使用原配置，返回False。
+        """
+        try:
+            config = self.load_config()
+            validate_config(config)
+            config.update(self.overrides)
+            rules = (RuleEngine(config.get('rules', []), config.get('rss_sources', []))
+                     if rules_changed(self.config, config) else self.rules)
+        except (OSError, ValueError) as e:
+            # json.JSONDecodeError 也是 ValueError
+            print(f"⚠️ 新配置无效，继续使用原配置: {e}")
+            return False
+        
+        for key in RESTART_KEYS:
+            if config.get(key) != self.config.get(key):
+                print(f"⚠️ {key} 的修改需要重启后才能生效")
+                if key in self.config:
+                    config[key] = self.config[key]
+                else:
+                    config.pop(key)
+        
+        added, removed, updated = diff_sources(self.config.get('rss_sources', []), config.get('rss_sources', []))
+        old_config, self.config = self.config, config
+        self.rules = rules
+        if config.get('host_limits') != old_config.get('host_limits'):
+            self.hosts.reconfigure(config.get('host_limits'))
+            self.warn_http2_unavailable()
+        self.verbosity = config.get('verbosity', LOG_DETAIL)
+        self.retry_after_max_seconds = config.get('retry_after_max_seconds', RETRY_AFTER_MAX_SECONDS)
+        self.fetch_proxy = config.get('fetch_proxy') or os.environ.get('RSS_FETCH_PROXY')
+        self.snapshot_every = config.get('state_snapshot_every', 100)
+        self.merge_on_save = config.get('state_merge_on_save', False)
+        self.outbox.expiry_seconds = config.get('outbox_expiry_hours', 24) * 3600
+        self.outbox.retry_base_seconds = config.get('outbox_retry_base_seconds', 60)
+        self.outbox.retry_max_seconds = config.get('outbox_retry_max_seconds', 3600)
+        if self.websub:
+            from rss_websub import DEFAULT_LEASE_SECONDS, DEFAULT_QUIET_SECONDS
+            # 新的租期在下次订阅/续订时生效
+            self.websub.lease_seconds = config.get('websub_lease_seconds', DEFAULT_LEASE_SECONDS)
+            self.websub.quiet_seconds = config.get('websub_quiet_seconds', DEFAULT_QUIET_SECONDS)
+        feishu_limits = ('feishu_rate_per_minute', 'feishu_burst')
+        if any(config.get(key) != old_config.get(key) for key in feishu_limits):
+            self.feishu_bucket = TokenBucket(
+                rate=config.get('feishu_rate_per_minute', FEISHU_RATE_PER_MINUTE) / 60,
+                capacity=config.get('feishu_burst', FEISHU_BURST),
+            )
+        
+        # 轮询计划：新增的源立即轮询，移除的源不再轮询，轮询间隔变了的源按新间隔重新计算
+        now = time.time()
+        for source in removed:
+            self.schedule.pop(source['url'], None)
+            self.unsubscribe_websub(source['url'])
+        for source in added:
+            self.schedule[source['url']] = 0.0
+        for source in updated:
+            url = source['url']
+            if url in self.schedule:
+                self.schedule[url] = min(self.schedule[url], now + self.poll_interval(source))
+        
+        changes = '，'.join(f"{label} {len(items)} 个" for label, items in
+                           (('新增', added), ('移除', removed), ('修改', updated)) if items)
+        print(f"\n🔄 配置已重新加载：{changes or '没有RSS源变化'}")
+        if self.verbosity >= LOG_DETAIL:
+            for label, items in (('+', added), ('-', removed), ('~', updated)):
+                for source in items:
+                    print(f"   {label} {source.get('name', source['url'])}")
+        return True
+    
+    def unsubscribe_websub(self, url: str):
+        """已从配置中移除的源取消WebSub订阅"""
+        if not self.websub:
+            return
+        found = self.websub.store.find(url)
+        if found and found[1].get('mode') == 'subscribe' and found[1].get('state') in ('pending', 'verified'):
+            self.websub.subscribe(url, found[1]['hub'], found[1]['topic'], mode='unsubscribe')
+            self.websub.store.save()
+    
+    def handle_push(self, url: str, content: bytes):
+        """处理WebSub推送的内容：解析后走与轮询相同的筛选、去重和推送流程"""
+        source = next((s for s in self.config.get('rss_sources', []) if s.get('url') == url), None)
+        if source is None:
+            print(f"⚠️ 收到已不在配置中的RSS源的推送，忽略: {url}")
+            return
+        
+        print(f"\n📡 收到WebSub推送: {source.get('name', url)}")
+        max_entries = source.get('max_entries', self.config.get('max_entries', DEFAULT_MAX_ENTRIES))
+        try:
+            articles, error = parse_feed_content(content, url, max_entries), None
+        except Exception as e:
+            articles, error = [], f"{type(e).__name__}: {e}"
+        if not articles and not error:
+            # 推送内容里没有条目（例如只是心跳），不当作错误
+            return
+        self.check_and_push(prefetched={url: (articles, error)}, sources=[source])
+    
+    def write_report(self):
+        """按配置写入JSON运行报告和Prometheus指标文件"""
+        report_file = self.config.get('report_file')
+        metrics_file = self.config.get('metrics_file')
+        try:
+            if report_file:
+                self.report.write_json(self.get_data_path(report_file))
+            if metrics_file:
+                self.report.write_prometheus(self.get_data_path(metrics_file))
+        except OSError as e:
+            print(f"⚠️ 写入运行报告失败: {e}")
+        
+        if self.verbosity >= LOG_SUMMARY:
+            totals = self.report.to_dict()['stage_totals']
+            stages = '，'.join(f"{stage} {seconds:.2f}s" for stage, seconds in totals.items())
+            print(f"\n⏱️ 启动耗时 {self.report.summary.get('startup_seconds', 0):.3f} 秒，"
+                  f"本次运行耗时 {self.report.duration:.2f} 秒" + (f"（{stages}）" if stages else ""))
+            wire_bytes = self.report.summary.get('wire_bytes', 0)
+            bytes_read = self.report.summary.get('bytes_read', 0)
+            if wire_bytes and bytes_read:
+                print(f"📦 传输 {wire_bytes / 1024:.1f} KB，解压后 {bytes_read / 1024:.1f} KB"
+                      f"（压缩节省 {max(0.0, 1 - wire_bytes / bytes_read):.0%}）")
+            if self.report.summary.get('http2_sources'):
+                print(f"🔀 {self.report.summary['http2_sources']} 个RSS源通过HTTP/2获取")
+
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    import argparse
+    parser = argparse.ArgumentParser(description="RSS监控脚本 - 自动监控RSS源并推送到Discord/飞书")
+    parser.add_argument('--config', default='config.json', help="配置文件路径（默认 config.json）")
+    parser.add_argument('--from-env', action='store_true',
+                        help="直接从环境变量 DISCORD_WEBHOOK / FEISHU_WEBHOOK / RSS_SOURCES 读取配置，不需要先生成config.json")
+    parser.add_argument('--tenants', metavar='MANIFEST',
+                        help="多租户模式：按租户清单加载多个配置，每个RSS源每轮只获取一次")
+    parser.add_argument('--serve', action='store_true',
+                        help="常驻模式：定时轮询，配置了 websub_callback_url 时同时接收WebSub推送")
+    parser.add_argument('--shard', help="分片模式，格式 i/N：只处理哈希分配到第i个分片（从0开始）的RSS源")
+    parser.add_argument('--merge-shards', type=int, metavar='N',
+                        help="把N个分片的状态分区合并回主状态文件后退出")
+    parser.add_argument('--report', metavar='FILE', help="把JSON运行报告写入该文件（覆盖配置中的 report_file）")
+    parser.add_argument('--metrics', metavar='FILE', help="把Prometheus文本格式指标写入该文件（覆盖配置中的 metrics_file）")
+    parser.add_argument('--verbosity', type=int, choices=[LOG_ERROR, LOG_SUMMARY, LOG_DETAIL],
+                        help="日志详细程度: 0=只输出错误，1=每个源一行汇总，2=逐条详细输出（默认）")
+    parser.add_argument('--profile', nargs='?', const='rss_profile.prof', metavar='FILE',
+                        help="用 cProfile 分析本次运行，统计写入FILE（默认 rss_profile.prof）")
+    parser.add_argument('--profile-memory', action='store_true',
+                        help="配合 --profile 使用，用 tracemalloc 记录 load_state/fetch_rss/save_state 的内存分配")
+    parser.add_argument('--profile-top', type=int, default=20, metavar='N', help="性能分析摘要显示的前N项（默认20）")
+    args = parser.parse_args(argv)
+    if args.shard:
+        try:
+            args.shard = rss_shard.parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+    return args
 
 
-def main():
+def main(argv=None):
     """主函数"""
+    args = parse_args(argv)
+    
     print("=" * 50)
     print("🚀 RSS监控脚本启动")
     print("=" * 50)
     
     try:
-        monitor = RSSMonitor()
-        monitor.check_and_push()
-    except FileNotFoundError as e:
+        if args.merge_shards:
+            with open(args.config, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            state_file = config.get('state_file', 'rss_state.json')
+            print(f"🔀 合并 {args.merge_shards} 个分片的状态到 {state_file}")
+            merged = rss_shard.merge_shard_states(state_file, args.merge_shards,
+                                                  lock=config.get('run_lock', True),
+                                                  lease_ttl=config.get('run_lock_ttl_seconds', 300),
+                                                  lease_wait=config.get('run_lock_wait_seconds', 0))
+            print(f"✅ 已合并 {merged} 个分区")
+            return 0
+        
+        if args.tenants:
+            import rss_tenants
+            rss_tenants.run_tenants(args.tenants)
+            return 0
+        
+        def run():
+            monitor = RSSMonitor(args.config, shard=args.shard, from_env=args.from_env)
+            overrides = {'report_file': args.report, 'metrics_file': args.metrics, 'verbosity': args.verbosity}
+            monitor.override_config(**{key: value for key, value in overrides.items() if value is not None})
+            if not monitor.acquire_lease():
+                return
+            try:
+                if args.serve:
+                    monitor.serve()
+                else:
+                    monitor.check_and_push()
+            finally:
+                monitor.release_lease()
+        
+        if args.profile:
+            import rss_profile
+            rss_profile.profile_run(run, args.profile, cls=RSSMonitor,
+                                    memory=args.profile_memory, top=args.profile_top)
+        else:
+            run()
+    except (FileNotFoundError, ValueError) as e:
         print(f"❌ {e}")
         return 1
     except Exception as e:
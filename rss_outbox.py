@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+持久化发件箱 - 保存推送失败的消息，下次运行时按目的地顺序重试
+"""
+
+import random
+import time
+from typing import Dict, List, Optional
+
+from rss_journal import load_json, write_json_atomic
+
+
+class Outbox:
+    """推送失败消息的持久化队列
+
+    每条记录保存已渲染好的消息体（payload）以及对应的文章记录，
+    按目的地（discord / feishu）分别按入队顺序投递。
+    注意：文件中只保存目的地名称，不保存Webhook地址（状态文件会被提交到仓库）。
+    """
+
+    def __init__(self, path: str = "rss_outbox.json", expiry_seconds: float = 24 * 3600,
+                 retry_base_seconds: float = 60, retry_max_seconds: float = 3600):
+        self.path = path
+        self.expiry_seconds = expiry_seconds
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.items: List[Dict] = self.load()
+        self.expired_count = 0
+        self.delivered_count = 0
+        self.dirty = False
+
+    def load(self) -> List[Dict]:
+        """加载发件箱文件"""
+        return load_json(self.path, default=[])
+
+    def save(self):
+        """保存发件箱文件（先写临时文件再替换，避免写入中断导致文件损坏）"""
+        if not self.dirty:
+            return
+        write_json_atomic(self.path, self.items)
+        self.dirty = False
+
+    def contains(self, source_key: str) -> bool:
+        """检查文章是否已在发件箱中等待重试"""
+        for item in self.items:
+            for record in item.get('records', []):
+                if record.get('key') == source_key:
+                    return True
+        return False
+
+    def has_pending(self, destination: str) -> bool:
+        """目的地是否还有未投递的消息（有的话新消息需要排在后面，保证顺序）"""
+        return any(item['destination'] == destination for item in self.items)
+
+    def enqueue(self, destination: str, payload: Dict, records: List[Dict], source_name: str = ""):
+        """加入发件箱
+
+        records: 这条消息对应的文章记录，投递成功后写入状态文件，
+                 格式为 [{"key": source_key, "title": ..., "link": ...}]
+        """
+        now = time.time()
+        self.items.append({
+            'destination': destination,
+            'source_name': source_name,
+            'payload': payload,
+            'records': records,
+            'created_at': now,
+            'attempts': 1,
+            'next_attempt_at': now + self.backoff(1),
+        })
+        self.dirty = True
+
+    def backoff(self, attempts: int) -> float:
+        """指数退避 + 随机抖动"""
+        delay = min(self.retry_base_seconds * (2 ** (attempts - 1)), self.retry_max_seconds)
+        return delay * random.uniform(0.5, 1.5)
+
+    def discard(self, predicate) -> List[Dict]:
+        """移除 predicate(item) 为真的消息（如已经投递过、只是没来得及从文件中删除的），返回移除的消息"""
+        removed = [item for item in self.items if predicate(item)]
+        if removed:
+            self.items = [item for item in self.items if not predicate(item)]
+            self.dirty = True
+        return removed
+
+    def drain(self, send, now: Optional[float] = None, on_delivered=None) -> List[Dict]:
+        """投递到期的消息
+
+        send(destination, payload) -> bool
+        on_delivered(item): 每条消息投递成功后立即调用（如写入状态日志）
+        每个目的地按入队顺序投递，队首未到期或投递失败时停止该目的地，
+        其他目的地不受影响。返回投递成功的消息记录列表。
+        """
+        now = time.time() if now is None else now
+        delivered = []
+        blocked = set()
+        remaining = []
+
+        for item in self.items:
+            destination = item['destination']
+
+            # 超过有效期的消息直接丢弃
+            if now - item['created_at'] > self.expiry_seconds:
+                titles = ', '.join(r.get('title', '')[:30] for r in item.get('records', []))
+                print(f"   🗑️ 发件箱消息已过期，丢弃: [{destination}] {titles}")
+                self.expired_count += 1
+                self.dirty = True
+                continue
+
+            if destination in blocked or item['next_attempt_at'] > now:
+                blocked.add(destination)
+                remaining.append(item)
+                continue
+
+            if send(destination, item['payload']):
+                delivered.append(item)
+                self.delivered_count += 1
+                self.dirty = True
+                if on_delivered is not None:
+                    on_delivered(item)
+            else:
+                item['attempts'] += 1
+                item['next_attempt_at'] = now + self.backoff(item['attempts'])
+                blocked.add(destination)
+                remaining.append(item)
+                self.dirty = True
+
+        self.items = remaining
+        return delivered
+
+    def metrics(self, now: Optional[float] = None) -> Dict:
+        """发件箱指标：深度与最早消息的等待时间（秒）"""
+        now = time.time() if now is None else now
+        oldest = min((item['created_at'] for item in self.items), default=None)
+        return {
+            'outbox_depth': len(self.items),
+            'outbox_oldest_age_seconds': round(now - oldest, 1) if oldest is not None else 0,
+            'outbox_delivered': self.delivered_count,
+            'outbox_expired': self.expired_count,
+        }
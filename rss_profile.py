@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能分析 - 用 cProfile 包裹一次完整运行并输出各函数统计，可选用 tracemalloc 记录各阶段的内存分配
+"""
+
+import cProfile
+import functools
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, List, Tuple
+
+# 监控阶段 -> 该阶段的入口方法（按 cProfile 的累计耗时归属）
+STAGE_FUNCTIONS = {
+    'load_state': ('load_state',),
+    'fetch': ('fetch_rss', 'fetch_all'),
+    'download': ('download_feed',),
+    'parse': ('parse_feed_content',),
+    'filter': ('filter_recent_articles',),
+    'push': ('push_articles', 'push_backlog', 'drain_outbox', 'flush_digests'),
+    'save_state': ('save_state',),
+}
+
+# 用 tracemalloc 记录内存分配的方法
+MEMORY_STAGES = ('load_state', 'fetch_rss', 'fetch_all', 'save_state')
+
+TRACEBACK_FRAMES = 5
+
+
+class MemoryTracker:
+    """在指定方法前后各拍一次 tracemalloc 快照，按代码行累计各阶段的净分配
+
+    拍快照和比较快照本身的开销不计入 profiler 的统计。
+    """
+
+    def __init__(self, profiler: cProfile.Profile = None):
+        self.profiler = profiler
+        self.stages: Dict[str, Dict] = {}
+        self.filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+
+    def snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(self.filters)
+
+    def record(self, stage: str, before: tracemalloc.Snapshot, after: tracemalloc.Snapshot, peak: int):
+        record = self.stages.setdefault(stage, {'calls': 0, 'size_diff': 0, 'peak': 0, 'lines': {}})
+        record['calls'] += 1
+        record['peak'] = max(record['peak'], peak)
+        for stat in after.compare_to(before, 'lineno'):
+            record['size_diff'] += stat.size_diff
+            frame = stat.traceback[0]
+            key = f"{frame.filename}:{frame.lineno}"
+            record['lines'][key] = record['lines'].get(key, 0) + stat.size_diff
+
+    def wrap(self, stage: str, method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            self.pause()
+            before = self.snapshot()
+            tracemalloc.reset_peak()
+            start_size = tracemalloc.get_traced_memory()[0]
+            self.resume()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.pause()
+                peak = tracemalloc.get_traced_memory()[1] - start_size
+                self.record(stage, before, self.snapshot(), peak)
+                self.resume()
+        return wrapper
+
+    def pause(self):
+        if self.profiler:
+            self.profiler.disable()
+
+    def resume(self):
+        if self.profiler:
+            self.profiler.enable()
+
+    @contextmanager
+    def patch(self, cls, stages=MEMORY_STAGES):
+        """临时替换类上的方法，退出时恢复"""
+        originals = {name: getattr(cls, name) for name in stages if hasattr(cls, name)}
+        for name, method in originals.items():
+            setattr(cls, name, self.wrap(name, method))
+        try:
+            yield self
+        finally:
+            for name, method in originals.items():
+                setattr(cls, name, method)
+
+    def print_summary(self, top: int):
+        print("\n🧠 各阶段内存分配（tracemalloc）:")
+        for stage, record in self.stages.items():
+            print(f"   {stage}: 调用 {record['calls']} 次，净分配 {format_size(record['size_diff'])}，"
+                  f"单次峰值 {format_size(record['peak'])}")
+            lines = sorted(record['lines'].items(), key=lambda item: abs(item[1]), reverse=True)[:top]
+            for location, size in lines:
+                if size:
+                    print(f"      {format_size(size):>10}  {location}")
+
+
+def format_size(size: int) -> str:
+    sign = '-' if size < 0 else ''
+    size = abs(size)
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{sign}{size:.0f} {unit}" if unit == 'B' else f"{sign}{size:.1f} {unit}"
+        size /= 1024
+    return f"{sign}{size:.1f} GB"
+
+
+def stage_times(stats: pstats.Stats) -> List[Tuple[str, int, float]]:
+    """按阶段汇总累计耗时，返回 [(阶段, 调用次数, 秒)]
+
+    递归调用或阶段嵌套（如 fetch_all 内部调用 parse_feed_content）时各阶段会有重叠，
+    只用于判断时间花在哪里，不要求相加等于总耗时。
+    """
+    totals: Dict[str, List] = {stage: [0, 0.0] for stage in STAGE_FUNCTIONS}
+    for (filename, lineno, function), (_, calls, _, cumtime, _) in stats.stats.items():
+        if not filename.endswith('rss_monitor.py'):
+            continue
+        for stage, functions in STAGE_FUNCTIONS.items():
+            if function in functions:
+                totals[stage][0] += calls
+                totals[stage][1] += cumtime
+    return [(stage, calls, seconds) for stage, (calls, seconds) in totals.items() if calls]
+
+
+def profile_run(run: Callable[[], None], output: str, cls=None, memory: bool = False, top: int = 20):
+    """在 cProfile 下执行 run()，把统计写入 output（pstats 格式），并输出按阶段汇总的前N项
+
+    memory 为 True 时用 tracemalloc 记录 cls 上 load_state / fetch_rss / fetch_all / save_state 的分配。
+    """
+    profiler = cProfile.Profile()
+    tracker = MemoryTracker(profiler)
+    started = time.perf_counter()
+
+    if memory:
+        tracemalloc.start(TRACEBACK_FRAMES)
+    try:
+        with tracker.patch(cls) if memory and cls is not None else nullcontext():
+            profiler.enable()
+            try:
+                run()
+            finally:
+                profiler.disable()
+    finally:
+        if memory:
+            tracemalloc.stop()
+    elapsed = time.perf_counter() - started
+
+    profiler.dump_stats(output)
+    stats = pstats.Stats(profiler)
+
+    print("\n" + "=" * 50)
+    print(f"🔬 性能分析结果（总耗时 {elapsed:.2f} 秒，统计已写入 {output}）")
+    print("=" * 50)
+    print("\n⏱️ 各阶段累计耗时:")
+    profiled = stats.total_tt
+    for stage, calls, seconds in stage_times(stats):
+        print(f"   {stage:<12}{seconds:>10.3f} 秒  {calls:>6} 次调用  {seconds / profiled * 100 if profiled else 0:>6.1f}%")
+
+    print(f"\n📊 累计耗时前 {top} 的函数:")
+    stats.sort_stats('cumulative').print_stats(top)
+    print(f"📊 自身耗时前 {top} 的函数:")
+    stats.sort_stats('tottime').print_stats(top)
+
+    if memory:
+        tracker.print_summary(top)
+    if memory:
+        print("   （开启内存记录后拍快照会拉长总耗时，各阶段耗时不含快照开销）")
+    print(f"\n💡 可用 python -m pstats {output} 或 snakeviz 等工具进一步查看")
+
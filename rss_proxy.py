@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地RSS缓存代理 - 监控脚本和各种排查脚本都通过它获取RSS，每个上游在缓存有效期内最多被请求一次
+
+    GET /fetch?url=<RSS链接>
+
+- 响应按URL缓存在磁盘上，有效期内直接返回（X-Cache: HIT）
+- 同一URL的并发请求合并为一次上游请求
+- 缓存过期后带 If-None-Match / If-Modified-Since 向上游验证，304时继续使用缓存（X-Cache: REVALIDATED）
+- 上游请求失败时，如有旧缓存则返回旧内容（X-Cache: STALE），否则返回502
+
+启动:
+    python rss_proxy.py --port 8765 --ttl 300
+监控脚本中配置 "fetch_proxy": "http://127.0.0.1:8765" 或设置环境变量 RSS_FETCH_PROXY 即可使用。
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, quote, urlsplit
+
+from rss_journal import write_atomic, write_json_atomic
+
+DEFAULT_PORT = 8765
+DEFAULT_TTL_SECONDS = 300
+DEFAULT_CACHE_DIR = '.rss_proxy_cache'
+
+# 转发给客户端的上游响应头
+PASS_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Retry-After')
+
+
+def proxy_url(proxy: str, url: str) -> str:
+    """通过代理获取 url 时实际请求的地址"""
+    return f"{proxy.rstrip('/')}/fetch?url={quote(url, safe='')}"
+
+
+class FeedCache:
+    """磁盘响应缓存 + 同一URL的请求合并"""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 timeout: Tuple[float, float] = (10, 30)):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.timeout = timeout
+        self.locks: Dict[str, threading.Lock] = {}
+        self.locks_lock = threading.Lock()
+        self.stats: Dict[str, int] = {}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, url: str) -> str:
+        return hashlib.md5(url.encode('utf-8')).hexdigest()
+
+    def lock_for(self, key: str) -> threading.Lock:
+        with self.locks_lock:
+            return self.locks.setdefault(key, threading.Lock())
+
+    def count(self, name: str):
+        with self.locks_lock:
+            self.stats[name] = self.stats.get(name, 0) + 1
+
+    def load(self, key: str) -> Optional[Tuple[Dict, bytes]]:
+        meta_path = os.path.join(self.cache_dir, f"{key}.json")
+        body_path = os.path.join(self.cache_dir, f"{key}.body")
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                return meta, f.read()
+        except (OSError, ValueError):
+            return None
+
+    def store(self, key: str, meta: Dict, body: Optional[bytes] = None):
+        """写入缓存（先写临时文件再替换，body为None时只更新元数据；缓存可以重新获取，不 fsync）"""
+        if body is not None:
+            write_atomic(os.path.join(self.cache_dir, f"{key}.body"), body, fsync=False)
+        write_json_atomic(os.path.join(self.cache_dir, f"{key}.json"), meta, fsync=False, indent=None)
+
+    def get(self, url: str) -> Tuple[int, Dict, bytes, str]:
+        """获取URL内容，返回 (状态码, 响应头, 内容, 缓存状态)"""
+        key = self.key(url)
+        cached = self.load(key)
+        if cached and time.time() - cached[0]['fetched_at'] < self.ttl_seconds:
+            self.count('hit')
+            return cached[0]['status'], cached[0]['headers'], cached[1], 'HIT'
+
+        # 同一URL同时只有一个线程请求上游，其他线程等它完成后读缓存
+        with self.lock_for(key):
+            cached = self.load(key)
+            if cached and time.time() - cached[0]['fetched_at'] < self.ttl_seconds:
+                self.count('coalesced')
+                return cached[0]['status'], cached[0]['headers'], cached[1], 'HIT'
+            return self.fetch_upstream(url, key, cached)
+
+    def fetch_upstream(self, url: str, key: str, cached: Optional[Tuple[Dict, bytes]]) -> Tuple[int, Dict, bytes, str]:
+        import requests
+        from rss_http import accept_encoding
+        from rss_monitor import FETCH_HEADERS
+
+        headers = dict(FETCH_HEADERS, **{'Accept-Encoding': accept_encoding()})
+        if cached:
+            if cached[0]['headers'].get('ETag'):
+                headers['If-None-Match'] = cached[0]['headers']['ETag']
+            if cached[0]['headers'].get('Last-Modified'):
+                headers['If-Modified-Since'] = cached[0]['headers']['Last-Modified']
+
+        try:
+            response = requests.get(url, headers=headers, timeout=self.timeout, allow_redirects=True)
+        except requests.exceptions.RequestException as e:
+            print(f"⚠️ 上游请求失败 ({url}): {e}")
+            if cached:
+                self.count('stale')
+                return cached[0]['status'], cached[0]['headers'], cached[1], 'STALE'
+            self.count('error')
+            return 502, {'Content-Type': 'text/plain; charset=utf-8'}, f"上游请求失败: {e}".encode('utf-8'), 'MISS'
+
+        if response.status_code == 304 and cached:
+            meta = dict(cached[0], fetched_at=time.time())
+            self.store(key, meta)
+            self.count('revalidated')
+            return meta['status'], meta['headers'], cached[1], 'REVALIDATED'
+
+        if (response.status_code >= 500 or response.status_code == 429) and cached:
+            self.count('stale')
+            return cached[0]['status'], cached[0]['headers'], cached[1], 'STALE'
+
+        # 2xx和4xx（如403/404）都缓存，避免有效期内反复请求上游；429只转发不缓存，由客户端按Retry-After等待
+        meta = {
+            'url': url,
+            'status': response.status_code,
+            'headers': {name: response.headers[name] for name in PASS_HEADERS if name in response.headers},
+            'fetched_at': time.time(),
+        }
+        if response.status_code < 500 and response.status_code != 429:
+            self.store(key, meta, response.content)
+        self.count('miss')
+        return meta['status'], meta['headers'], response.content, 'MISS'
+
+
+def make_handler(cache: FeedCache):
+    class ProxyHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def send_body(self, status: int, headers: Dict, body: bytes):
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            if parts.path == '/stats':
+                self.send_body(200, {'Content-Type': 'application/json'}, json.dumps(cache.stats).encode('utf-8'))
+                return
+            url = parse_qs(parts.query).get('url', [''])[0]
+            if parts.path != '/fetch' or not url.startswith(('http://', 'https://')):
+                self.send_body(400, {'Content-Type': 'text/plain; charset=utf-8'},
+                               "用法: /fetch?url=<RSS链接>".encode('utf-8'))
+                return
+
+            status, headers, body, cache_status = cache.get(url)
+            print(f"   {cache_status:<12}{status}  {url}")
+            self.send_body(status, dict(headers, **{'X-Cache': cache_status}), body)
+
+    return ProxyHandler
+
+
+def start_proxy(port: int = DEFAULT_PORT, cache: Optional[FeedCache] = None, host: str = '127.0.0.1'):
+    """在后台线程中启动代理，返回服务器对象"""
+    server = ThreadingHTTPServer((host, port), make_handler(cache or FeedCache()))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地RSS缓存代理")
+    parser.add_argument('--host', default='127.0.0.1', help="监听地址（默认 127.0.0.1）")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"监听端口（默认 {DEFAULT_PORT}）")
+    parser.add_argument('--ttl', type=float, default=DEFAULT_TTL_SECONDS, help=f"缓存有效期（秒，默认 {DEFAULT_TTL_SECONDS}）")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help=f"缓存目录（默认 {DEFAULT_CACHE_DIR}）")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(FeedCache(args.cache_dir, args.ttl)))
+    server.daemon_threads = True
+    print(f"🛰️ RSS缓存代理已启动: http://{args.host}:{server.server_address[1]}/fetch?url=<RSS链接>")
+    print(f"   缓存目录: {args.cache_dir}，有效期 {args.ttl:.0f} 秒")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+客户端限流工具 - 令牌桶、按上游主机的礼貌调度
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+
+class TokenBucket:
+    """令牌桶限流器（线程安全）
+
+    rate: 每秒补充的令牌数
+    capacity: 桶容量，即允许的突发请求数
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated_at = now
+
+    def try_acquire(self, tokens: float = 1) -> float:
+        """尝试取出令牌，成功返回0，否则返回需要等待的秒数"""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.0
+            return (tokens - self.tokens) / self.rate
+
+    def acquire(self, tokens: float = 1) -> float:
+        """阻塞直到取到令牌，返回实际等待的秒数"""
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    def drain(self):
+        """清空令牌（服务端返回限流时使用，让后续请求先等待）"""
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens = 0
+
+
+class RetryAfter(Exception):
+    """上游返回429/503，要求等待 seconds 秒后再请求"""
+
+    def __init__(self, url: str, status: int, seconds: float):
+        super().__init__(f"上游限流 ({status})，Retry-After {seconds:.0f} 秒")
+        self.url = url
+        self.status = status
+        self.seconds = seconds
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析Retry-After响应头（秒数或HTTP日期），无法解析时返回None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def host_of(url: str) -> str:
+    return (urlsplit(url).hostname or '').lower()
+
+
+class HostState:
+    """单个上游主机的并发数、令牌桶和Retry-After截止时间"""
+
+    def __init__(self, concurrency: Optional[int], bucket: Optional[TokenBucket]):
+        self.concurrency = concurrency
+        self.bucket = bucket
+        self.active = 0
+        self.blocked_until = 0.0
+        self.blocked_status = 429
+
+
+class HostScheduler:
+    """按上游主机的礼貌调度：每个主机独立限制并发数和请求速率，并遵守Retry-After
+
+    limits: {主机: {"concurrency": 2, "rate_per_minute": 30, "burst": 5}}，
+            主机名同时匹配其子域名，"default" 作用于其他所有主机；未配置的项不限制
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Dict]] = None):
+        self.limits = dict(limits or {})
+        self.hosts: Dict[str, HostState] = {}
+        self.lock = threading.Lock()
+
+    def limit_for(self, host: str) -> Dict:
+        for pattern, limit in self.limits.items():
+            if pattern != 'default' and (host == pattern or host.endswith('.' + pattern)):
+                return limit
+        return self.limits.get('default', {})
+
+    def state(self, url: str) -> HostState:
+        return self.host_state(host_of(url))
+
+    def host_state(self, host: str) -> HostState:
+        state = self.hosts.get(host)
+        if state is None:
+            limit = self.limit_for(host)
+            bucket = None
+            if limit.get('rate_per_minute'):
+                rate = limit['rate_per_minute'] / 60
+                bucket = TokenBucket(rate=rate, capacity=limit.get('burst', 1))
+            state = self.hosts[host] = HostState(limit.get('concurrency'), bucket)
+        return state
+
+    def reconfigure(self, limits: Optional[Dict[str, Dict]] = None):
+        """换成新的限制配置（配置热加载）
+
+        限制没有变化的主机保留原状态（令牌桶、进行中的请求数）；有变化的主机按新配置重建，
+        但仍保留进行中的请求数和Retry-After
+        """
+        with self.lock:
+            before = {host: self.limit_for(host) for host in self.hosts}
+            self.limits = dict(limits or {})
+            for host, old_limit in before.items():
+                if self.limit_for(host) == old_limit:
+                    continue
+                old = self.hosts.pop(host)
+                state = self.host_state(host)
+                state.active = old.active
+                state.blocked_until = old.blocked_until
+                state.blocked_status = old.blocked_status
+
+    def check(self, url: str, max_wait: float):
+        """该主机因Retry-After还需等待超过 max_wait 秒时抛出RetryAfter"""
+        with self.lock:
+            state = self.state(url)
+            blocked = state.blocked_until - time.monotonic()
+        if blocked > max_wait:
+            raise RetryAfter(url, state.blocked_status, blocked)
+
+    def try_start(self, url: str) -> float:
+        """尝试开始一个请求，成功返回0（占用一个并发名额），否则返回建议等待的秒数
+
+        并发名额已满时返回 math.inf，需要等同一主机的请求结束
+        """
+        with self.lock:
+            state = self.state(url)
+            now = time.monotonic()
+            if state.blocked_until > now:
+                return state.blocked_until - now
+            if state.concurrency and state.active >= state.concurrency:
+                return math.inf
+            if state.bucket is not None:
+                wait = state.bucket.try_acquire()
+                if wait > 0:
+                    return wait
+            state.active += 1
+            return 0.0
+
+    def finish(self, url: str):
+        with self.lock:
+            state = self.state(url)
+            state.active = max(0, state.active - 1)
+
+    def defer(self, url: str, seconds: float, status: int = 429):
+        """上游要求等待：seconds 秒内不再向该主机发请求"""
+        with self.lock:
+            state = self.state(url)
+            state.blocked_until = max(state.blocked_until, time.monotonic() + seconds)
+            state.blocked_status = status
+            if state.bucket is not None:
+                state.bucket.drain()
+
+    @contextmanager
+    def slot(self, url: str, max_wait: float):
+        """阻塞直到可以请求 url（逐个获取时使用），Retry-After超过 max_wait 时抛出RetryAfter"""
+        while True:
+            self.check(url, max_wait)
+            wait = self.try_start(url)
+            if wait == 0:
+                break
+            time.sleep(min(wait, 0.5))
+        try:
+            yield
+        finally:
+            self.finish(url)
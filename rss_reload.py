@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+配置热加载 - 常驻模式下修改 config.json 不用重启
+
+- 按文件修改时间和大小检测变化，新配置先完整校验，不通过时继续使用原配置
+- 新旧RSS源按URL对比：只有新增、移除和修改过的源受影响，其他源的轮询计划、主机状态等保持不变
+- 状态文件、发件箱等数据文件和WebSub接收器的配置只在启动时生效，修改后提示需要重启
+"""
+
+import os
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+# 只在启动时读取的配置项
+RESTART_KEYS = (
+    'state_file', 'outbox_file', 'digest_file', 'archive_file', 'websub_file',
+    'websub_callback_url', 'websub_listen', 'websub_secret',
+    'state_journal_fsync', 'run_lock', 'run_lock_ttl_seconds',
+)
+
+# 影响规则引擎的配置：都没变时沿用原来的规则引擎（保留命中计数）
+RULE_SOURCE_KEYS = ('include', 'exclude')
+
+
+def file_signature(path: str) -> Optional[Tuple[float, int]]:
+    """文件的修改时间和大小，文件不存在时返回None"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime, stat.st_size
+
+
+class ConfigWatcher:
+    """检测配置文件是否被修改过"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.signature = file_signature(path)
+
+    def changed(self) -> bool:
+        signature = file_signature(self.path)
+        if signature is None or signature == self.signature:
+            return False
+        self.signature = signature
+        return True
+
+
+def validate_config(config: Dict):
+    """检查新配置能否安全替换当前配置，有问题时抛出ValueError"""
+    if not isinstance(config, dict):
+        raise ValueError("配置文件的顶层必须是一个对象")
+    sources = config.get('rss_sources', [])
+    if not isinstance(sources, list):
+        raise ValueError("rss_sources 必须是列表")
+    seen = set()
+    for i, source in enumerate(sources):
+        if not isinstance(source, dict):
+            raise ValueError(f"rss_sources[{i}] 必须是对象")
+        url = source.get('url')
+        if not url or not isinstance(url, str):
+            raise ValueError(f"rss_sources[{i}] 缺少 url")
+        if urlparse(url).scheme not in ('http', 'https'):
+            raise ValueError(f"rss_sources[{i}] 的 url 不是 http(s) 地址: {url}")
+        if url in seen:
+            raise ValueError(f"RSS源重复: {url}")
+        seen.add(url)
+        interval = source.get('poll_interval_seconds')
+        if interval is not None and not (isinstance(interval, (int, float)) and interval > 0):
+            raise ValueError(f"rss_sources[{i}] 的 poll_interval_seconds 必须是正数")
+    interval = config.get('poll_interval_seconds', 300)
+    if not (isinstance(interval, (int, float)) and interval > 0):
+        raise ValueError("poll_interval_seconds 必须是正数")
+    limits = config.get('host_limits') or {}
+    if not isinstance(limits, dict) or not all(isinstance(limit, dict) for limit in limits.values()):
+        raise ValueError("host_limits 必须是 {主机: {限制}} 的对象")
+
+
+def diff_sources(old: List[Dict], new: List[Dict]) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    """按URL对比新旧RSS源列表，返回 (新增, 移除, 修改)，修改的返回新配置"""
+    old_by_url = {source.get('url'): source for source in old}
+    new_by_url = {source.get('url'): source for source in new}
+    added = [source for url, source in new_by_url.items() if url not in old_by_url]
+    removed = [source for url, source in old_by_url.items() if url not in new_by_url]
+    updated = [source for url, source in new_by_url.items() if url in old_by_url and old_by_url[url] != source]
+    return added, removed, updated
+
+
+def rules_changed(old: Dict, new: Dict) -> bool:
+    """规则或RSS源上的 include/exclude 是否有变化"""
+    def rule_config(config: Dict):
+        return (config.get('rules', []),
+                [(s.get('url'), s.get('name'), [s.get(key) for key in RULE_SOURCE_KEYS])
+                 for s in config.get('rss_sources', []) if any(s.get(key) for key in RULE_SOURCE_KEYS)])
+    return rule_config(old) != rule_config(new)
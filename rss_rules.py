@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+关键词/正则过滤与路由规则
+
+所有规则中的关键词（不区分大小写）编译成一个 Aho-Corasick 自动机，每个字段只扫描一遍；
+正则规则合并成一个预筛选正则，只有预筛选命中时才逐条判断具体是哪条规则。
+
+规则写在 config.json 的 rules 中:
+    {"name": "广告", "keywords": ["推广", "sponsored"], "action": "exclude"}
+    {"name": "AI", "regex": ["\\\\bGPT-?\\\\d"], "fields": ["title"], "action": "route", "destination": "feishu"}
+RSS源上的 include / exclude 关键词列表是只作用于该源的简写。
+
+- exclude: 命中任一排除规则的文章不推送
+- include: 某个源有包含规则时，文章至少要命中其中一条才推送
+- route:   命中的第一条路由规则决定推送目的地（discord / feishu）
+"""
+
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+FIELDS = ('title', 'summary', 'link')
+DEFAULT_FIELDS = ('title', 'summary')
+ACTIONS = ('include', 'exclude', 'route')
+
+
+class AhoCorasick:
+    """多模式字符串匹配自动机，一遍扫描找出文本中出现的所有关键词"""
+
+    def __init__(self):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[Set[int]] = [set()]
+
+    def add(self, keyword: str, value: int):
+        state = 0
+        for char in keyword:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(set())
+            state = next_state
+        self.output[state].add(value)
+
+    def build(self):
+        """计算失败指针，并把失败链上的输出合并进来"""
+        pending = deque(self.goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for char, next_state in self.goto[state].items():
+                pending.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.output[next_state] |= self.output[self.fail[next_state]]
+
+    def search(self, text: str) -> Set[int]:
+        """返回文本中出现过的关键词对应的值"""
+        found: Set[int] = set()
+        goto, fail, output = self.goto, self.fail, self.output
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found |= output[state]
+        return found
+
+
+class Rule:
+    def __init__(self, index: int, config: Dict, source_url: Optional[str] = None):
+        self.index = index
+        self.name = config.get('name') or f"规则{index + 1}"
+        self.action = config.get('action', 'include')
+        if self.action not in ACTIONS:
+            raise ValueError(f"规则 {self.name} 的 action 必须是 {'/'.join(ACTIONS)} 之一")
+        self.destination = config.get('destination')
+        if self.action == 'route' and self.destination not in ('discord', 'feishu'):
+            raise ValueError(f"路由规则 {self.name} 的 destination 必须是 discord 或 feishu")
+        self.fields = tuple(config.get('fields', DEFAULT_FIELDS))
+        unknown = set(self.fields) - set(FIELDS)
+        if unknown:
+            raise ValueError(f"规则 {self.name} 包含未知字段: {', '.join(sorted(unknown))}")
+        self.keywords = [k.lower() for k in as_list(config.get('keywords')) if k]
+        flags = 0 if config.get('case_sensitive') else re.IGNORECASE
+        self.patterns = [re.compile(p, flags) for p in as_list(config.get('regex'))]
+        if not self.keywords and not self.patterns:
+            raise ValueError(f"规则 {self.name} 没有 keywords 或 regex")
+        # 规则作用的RSS源：RSS源上的简写只作用于该源，rules 中可以用 sources 指定URL或名称
+        self.sources = {source_url} if source_url else set(as_list(config.get('sources')))
+
+    def applies_to(self, source: Dict) -> bool:
+        return not self.sources or source.get('url') in self.sources or source.get('name') in self.sources
+
+
+def as_list(value) -> List:
+    if value is None:
+        return []
+    return [value] if isinstance(value, str) else list(value)
+
+
+class RuleEngine:
+    """编译好的规则集合，并统计每条规则的命中次数"""
+
+    def __init__(self, rules: Iterable[Dict] = (), sources: Iterable[Dict] = ()):
+        self.rules: List[Rule] = []
+        for config in rules:
+            self.rules.append(Rule(len(self.rules), config))
+        for source in sources:
+            for action in ('include', 'exclude'):
+                keywords = source.get(action)
+                if keywords:
+                    name = f"{source.get('name', source.get('url', ''))}/{action}"
+                    self.rules.append(Rule(len(self.rules), {'name': name, 'keywords': keywords, 'action': action},
+                                           source_url=source.get('url')))
+        self.hits: Dict[str, int] = {}
+        self.reset_hits()
+        self.applicable: Dict[Tuple, List[Rule]] = {}
+
+        # 每个字段一个自动机（值为规则序号）和一个合并后的预筛选正则
+        self.automata: Dict[str, AhoCorasick] = {}
+        self.regex_rules: Dict[str, List[Rule]] = {}
+        self.prefilters: Dict[str, Optional[re.Pattern]] = {}
+        for field in FIELDS:
+            automaton = AhoCorasick()
+            has_keywords = False
+            for rule in self.rules:
+                if field in rule.fields:
+                    for keyword in rule.keywords:
+                        automaton.add(keyword, rule.index)
+                        has_keywords = True
+            if has_keywords:
+                automaton.build()
+                self.automata[field] = automaton
+            regex_rules = [rule for rule in self.rules if field in rule.fields and rule.patterns]
+            if regex_rules:
+                self.regex_rules[field] = regex_rules
+                self.prefilters[field] = combine_patterns([p for rule in regex_rules for p in rule.patterns])
+
+    def __bool__(self):
+        return bool(self.rules)
+
+    def reset_hits(self):
+        self.hits = {rule.name: 0 for rule in self.rules}
+
+    def match(self, article: Dict) -> Set[int]:
+        """返回文章命中的规则序号"""
+        matched: Set[int] = set()
+        for field in FIELDS:
+            automaton = self.automata.get(field)
+            regex_rules = self.regex_rules.get(field)
+            if automaton is None and regex_rules is None:
+                continue
+            text = article.get(field) or ''
+            if automaton is not None:
+                matched |= automaton.search(text.lower())
+            if regex_rules is not None:
+                prefilter = self.prefilters[field]
+                if prefilter is not None and not prefilter.search(text):
+                    continue
+                for rule in regex_rules:
+                    if rule.index not in matched and any(p.search(text) for p in rule.patterns):
+                        matched.add(rule.index)
+        return matched
+
+    def evaluate(self, article: Dict, source: Dict) -> Tuple[bool, Optional[str], Optional[str]]:
+        """判断文章是否推送
+
+        返回 (是否推送, 路由目的地, 原因)；原因为排除或未命中包含规则时的说明
+        """
+        key = (source.get('url'), source.get('name'))
+        applicable = self.applicable.get(key)
+        if applicable is None:
+            applicable = self.applicable[key] = [rule for rule in self.rules if rule.applies_to(source)]
+        if not applicable:
+            return True, None, None
+
+        matched = self.match(article)
+        hit_rules = [rule for rule in applicable if rule.index in matched]
+        for rule in hit_rules:
+            self.hits[rule.name] += 1
+
+        for rule in hit_rules:
+            if rule.action == 'exclude':
+                return False, None, rule.name
+        includes = [rule for rule in applicable if rule.action == 'include']
+        if includes and not any(rule.action == 'include' for rule in hit_rules):
+            return False, None, '未命中包含规则'
+        destination = next((rule.destination for rule in hit_rules if rule.action == 'route'), None)
+        return True, destination, None
+
+
+def combine_patterns(patterns: List[re.Pattern]) -> Optional[re.Pattern]:
+    """把多条正则合并成一条预筛选正则；没有一条命中时整体不会命中
+
+    大小写设置不同或包含无法合并的写法（如中间出现全局标志）时返回None，逐条判断。
+    有捕获组时也不合并：合并后组号会改变，\\1 这样的反向引用会指向别的组。
+    """
+    flags = {p.flags for p in patterns}
+    if len(flags) != 1 or any(p.groups for p in patterns):
+        return None
+    try:
+        return re.compile('|'.join(f"(?:{p.pattern})" for p in patterns), flags.pop())
+    except re.error:
+        return None
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RSS源分片 - 多个进程或CI矩阵任务并行运行时，按URL哈希把RSS源稳定地分配到各个分片
+"""
+
+import hashlib
+import os
+from typing import Dict, List, Tuple
+
+from rss_journal import StateJournal, load_json
+from rss_lease import DEFAULT_TTL_SECONDS, Lease
+
+# 与 rss_monitor.SOURCES_STATE_KEY 保持一致
+SOURCES_STATE_KEY = '_sources'
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """解析 "i/N" 格式的分片参数，i 从0开始"""
+    try:
+        index, count = (int(part) for part in spec.split('/'))
+    except ValueError:
+        raise ValueError(f"分片参数格式错误: {spec}（正确格式: i/N，例如 0/4）")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"分片参数超出范围: {spec}（要求 0 <= i < N）")
+    return index, count
+
+
+def shard_of(url: str, count: int) -> int:
+    """RSS源所属的分片（按URL哈希，增删其他源不影响已有源的分配）"""
+    digest = hashlib.md5(url.encode('utf-8')).hexdigest()
+    return int(digest[:8], 16) % count
+
+
+def shard_path(path: str, shard: Tuple[int, int]) -> str:
+    """分片专属的文件路径，例如 rss_state.json -> rss_state.shard-0-of-4.json"""
+    base, ext = os.path.splitext(path)
+    return f"{base}.shard-{shard[0]}-of-{shard[1]}{ext}"
+
+
+def key_url(state_key: str) -> str:
+    """从状态键 "{url}_{article_id}" 中取出RSS源URL"""
+    return state_key.rsplit('_', 1)[0]
+
+
+def filter_sources(sources: List[Dict], shard: Tuple[int, int]) -> List[Dict]:
+    """筛选属于该分片的RSS源"""
+    index, count = shard
+    return [s for s in sources if s.get('url') and shard_of(s['url'], count) == index]
+
+
+def partition_state(state: Dict, shard: Tuple[int, int]) -> Dict:
+    """从完整状态中取出属于该分片的部分（分片首次运行时用来初始化分区）"""
+    index, count = shard
+    partition = {}
+    for key, value in state.items():
+        if key == SOURCES_STATE_KEY:
+            partition[key] = {url: meta for url, meta in value.items() if shard_of(url, count) == index}
+        elif shard_of(key_url(key), count) == index:
+            partition[key] = value
+    return partition
+
+
+def merge_states(states: List[Dict]) -> Dict:
+    """合并多个状态
+
+    同一篇文章保留最早的推送记录，同一RSS源保留最新的成功拉取时间。
+    """
+    merged: Dict = {}
+    sources: Dict = {}
+    for state in states:
+        for key, value in state.items():
+            if key == SOURCES_STATE_KEY:
+                for url, meta in value.items():
+                    current = sources.get(url)
+                    if current is None or meta.get('last_success', '') > current.get('last_success', ''):
+                        sources[url] = meta
+            elif key not in merged or value.get('pushed_at', '') < merged[key].get('pushed_at', ''):
+                merged[key] = value
+    if sources:
+        merged[SOURCES_STATE_KEY] = sources
+    return merged
+
+
+def load_journaled(path: str) -> Dict:
+    """读取状态快照并重放其状态日志（快照之后推送的记录只在日志里）"""
+    state = load_json(path)
+    StateJournal(path).replay(state)
+    return state
+
+
+def merge_shard_states(state_file: str, count: int, lock: bool = True,
+                       lease_ttl: float = DEFAULT_TTL_SECONDS, lease_wait: float = 0) -> int:
+    """把所有分片的状态分区合并回主状态文件，返回合并的分区数
+
+    lock: 写入期间持有主状态文件的运行租约，被其他运行占用（等待 lease_wait 秒后仍占用）时抛出ValueError
+    """
+    lease = Lease(f"{state_file}.lock", ttl=lease_ttl) if lock else None
+    if lease is not None and not lease.acquire(wait=lease_wait):
+        holder = lease.holder or {}
+        raise ValueError(f"另一个运行（{holder.get('host', '?')} 进程 {holder.get('pid', '?')}）"
+                         f"正在使用 {state_file}，请稍后再合并")
+    try:
+        states = [load_journaled(state_file)]
+        merged_count = 0
+        for index in range(count):
+            path = shard_path(state_file, (index, count))
+            if os.path.exists(path) or os.path.exists(StateJournal(path).path):
+                states.append(load_journaled(path))
+                merged_count += 1
+                print(f"   合并分区: {path}")
+            else:
+                print(f"   ⚠️ 分区不存在，跳过: {path}")
+
+        # 原子写入并清空主状态文件的日志（日志中的记录已合并进来）
+        journal = StateJournal(state_file)
+        journal.snapshot(merge_states(states))
+        journal.close()
+        return merged_count
+    finally:
+        if lease is not None:
+            lease.release()
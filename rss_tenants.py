@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多租户模式 - 一个进程加载多个团队的配置，每个RSS源URL每轮只下载和解析一次，再分发给各租户
+
+租户清单示例（tenants.json，路径相对于清单所在目录）:
+    {
+      "tenants": ["team-a/config.json", "team-b/config.json"],
+      "fetch_workers": 8,
+      "parse_workers": 0
+    }
+
+每个租户的状态、发件箱、摘要缓冲等数据文件都放在各自配置文件所在的目录，
+时间窗口筛选、去重和推送仍由各租户按自己的配置完成。
+"""
+
+import json
+import os
+from typing import Dict, List, Tuple
+
+from rss_monitor import DEFAULT_MAX_ENTRIES, RSSMonitor
+
+
+def load_manifest(path: str) -> Dict:
+    """读取租户清单，把租户配置路径转换为相对于清单目录的路径"""
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    tenants = manifest.get('tenants')
+    if not isinstance(tenants, list) or not tenants:
+        raise ValueError(f"租户清单 {path} 中缺少 tenants 列表")
+    base_dir = os.path.dirname(os.path.abspath(path))
+    manifest['tenants'] = [os.path.join(base_dir, config_file) for config_file in tenants]
+    return manifest
+
+
+def load_tenants(config_files: List[str]) -> List[RSSMonitor]:
+    """为每个租户创建监控器，数据文件放在各自配置文件所在的目录"""
+    monitors = []
+    state_files: Dict[str, str] = {}
+    for config_file in config_files:
+        monitor = RSSMonitor(config_file, data_dir=os.path.dirname(config_file))
+        state_file = os.path.abspath(monitor.state_file)
+        if state_file in state_files:
+            raise ValueError(f"租户 {config_file} 与 {state_files[state_file]} 使用了同一个状态文件 {state_file}")
+        state_files[state_file] = config_file
+        monitors.append(monitor)
+    return monitors
+
+
+def shared_sources(monitors: List[RSSMonitor]) -> Tuple[List[Dict], int]:
+    """合并所有租户的RSS源，同一URL只保留一个，条数取各租户中最大的
+
+    返回 (去重后的RSS源列表, 订阅总数)
+    """
+    sources: Dict[str, Dict] = {}
+    subscriptions = 0
+    for monitor in monitors:
+        default_entries = monitor.config.get('max_entries', DEFAULT_MAX_ENTRIES)
+        for source in monitor.config.get('rss_sources', []):
+            url = source.get('url')
+            if not url:
+                continue
+            subscriptions += 1
+            max_entries = source.get('max_entries', default_entries)
+            if url in sources:
+                sources[url]['max_entries'] = max(sources[url]['max_entries'], max_entries)
+            else:
+                sources[url] = {'url': url, 'name': source.get('name', url), 'max_entries': max_entries}
+            if source.get('max_bytes'):
+                sources[url]['max_bytes'] = max(sources[url].get('max_bytes', 0), source['max_bytes'])
+            # 任一租户对该源关闭了JSON Feed时，共享获取也不请求JSON Feed
+            if source.get('json_feed') is False or monitor.config.get('json_feed') is False:
+                sources[url]['json_feed'] = False
+    return list(sources.values()), subscriptions
+
+
+def run_tenants(manifest_path: str):
+    """执行一轮多租户检查"""
+    manifest = load_manifest(manifest_path)
+    monitors = load_tenants(manifest['tenants'])
+    sources, subscriptions = shared_sources(monitors)
+
+    print(f"\n👥 多租户模式: {len(monitors)} 个租户，共 {subscriptions} 个订阅，去重后 {len(sources)} 个RSS源")
+
+    # 共享获取阶段：借用第一个租户的下载和解析逻辑
+    fetcher = monitors[0]
+    prefetched = fetcher.fetch_all(
+        sources,
+        fetch_workers=manifest.get('fetch_workers', 1),
+        parse_workers=manifest.get('parse_workers', 0),
+        chunksize=manifest.get('parse_chunksize', 4),
+    )
+    # 第一个租户的 check_and_push 会重新开始自己的报告，先留住共享获取阶段的记录
+    fetch_report = fetcher.report
+
+    for monitor in monitors:
+        print("\n" + "-" * 50)
+        print(f"👤 租户: {monitor.config_file}")
+        print("-" * 50)
+        monitor.parse_messages = fetcher.parse_messages
+        if not monitor.acquire_lease():
+            continue
+        try:
+            monitor.check_and_push(prefetched=prefetched, fetch_report=fetch_report)
+        finally:
+            monitor.release_lease()
+
+    print(f"\n✨ 多租户运行完成，节省了 {subscriptions - len(sources)} 次重复获取")
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WebSub（PubSubHubbub）推送订阅 - 常驻模式下代替轮询
+
+- 获取RSS时发现 <link rel="hub"> 就向hub订阅，回调地址由内置的HTTP接收器提供
+- hub验证订阅意图时（GET回调），只确认自己发起过的订阅/取消订阅请求
+- hub推送内容时（POST回调），用订阅时的secret校验 X-Hub-Signature，通过后放入队列，
+  由监控主循环走与轮询相同的筛选、去重和推送流程
+- 订阅到期前自动续订；hub长时间没有推送（或订阅失效）时该源退回轮询
+
+订阅记录保存在 websub_file（默认 rss_websub.json）。配置了 websub_secret 时，
+每个订阅的secret由它和topic派生，文件中不保存secret。
+"""
+
+import hashlib
+import hmac
+import queue
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from rss_http import DEFAULT_MAX_BYTES
+from rss_journal import load_json, write_json_atomic
+
+DEFAULT_LEASE_SECONDS = 86400
+DEFAULT_QUIET_SECONDS = 6 * 3600
+# 剩余时间少于租期的这个比例时续订
+RENEW_FRACTION = 0.1
+# 订阅请求发出后多久还没有验证，视为失败可以重试
+PENDING_TIMEOUT_SECONDS = 600
+
+SIGNATURE_ALGORITHMS = {'sha1': hashlib.sha1, 'sha256': hashlib.sha256,
+                        'sha384': hashlib.sha384, 'sha512': hashlib.sha512}
+
+
+def callback_id(topic: str) -> str:
+    """回调路径中标识订阅的ID"""
+    return hashlib.md5(topic.encode('utf-8')).hexdigest()[:16]
+
+
+def verify_signature(secret: str, body: bytes, header: Optional[str]) -> bool:
+    """校验 X-Hub-Signature: <算法>=<十六进制HMAC>"""
+    if not header or '=' not in header:
+        return False
+    algorithm, signature = header.split('=', 1)
+    digest = SIGNATURE_ALGORITHMS.get(algorithm.strip().lower())
+    if digest is None:
+        return False
+    expected = hmac.new(secret.encode('utf-8'), body, digest).hexdigest()
+    return hmac.compare_digest(expected, signature.strip().lower())
+
+
+class SubscriptionStore:
+    """WebSub订阅记录（线程安全，接收器线程和主循环共用）
+
+    每条记录: source_url, hub, topic, state（pending/verified/unsubscribed/denied）,
+              mode（最近一次请求的 subscribe/unsubscribe）, requested_at, verified_at,
+              expires_at, lease_seconds, last_push
+    """
+
+    def __init__(self, path: str, secret_seed: Optional[str] = None):
+        self.path = path
+        self.secret_seed = secret_seed
+        self.lock = threading.RLock()
+        self.dirty = False
+        self.subscriptions: Dict[str, Dict] = self.load()
+
+    def load(self) -> Dict[str, Dict]:
+        return load_json(self.path)
+
+    def save(self):
+        """有改动时保存（先写临时文件再替换）"""
+        with self.lock:
+            if not self.dirty:
+                return
+            write_json_atomic(self.path, self.subscriptions)
+            self.dirty = False
+
+    def get(self, sub_id: str) -> Optional[Dict]:
+        with self.lock:
+            record = self.subscriptions.get(sub_id)
+            return dict(record) if record else None
+
+    def find(self, source_url: str) -> Optional[Tuple[str, Dict]]:
+        with self.lock:
+            for sub_id, record in self.subscriptions.items():
+                if record['source_url'] == source_url:
+                    return sub_id, dict(record)
+        return None
+
+    def secret_for(self, sub_id: str) -> str:
+        with self.lock:
+            record = self.subscriptions[sub_id]
+            if self.secret_seed:
+                return hmac.new(self.secret_seed.encode('utf-8'), record['topic'].encode('utf-8'),
+                                hashlib.sha256).hexdigest()
+            if not record.get('secret'):
+                record['secret'] = secrets.token_hex(32)
+                self.dirty = True
+            return record['secret']
+
+    def request(self, source_url: str, hub: str, topic: str, mode: str = 'subscribe') -> str:
+        """记录一次订阅/取消订阅请求，返回订阅ID"""
+        sub_id = callback_id(topic)
+        with self.lock:
+            record = self.subscriptions.setdefault(sub_id, {'state': 'pending', 'last_push': None})
+            record.update(source_url=source_url, hub=hub, topic=topic, mode=mode, requested_at=time.time())
+            if record['state'] != 'verified':
+                record['state'] = 'pending'
+            self.dirty = True
+        return sub_id
+
+    def confirm(self, sub_id: str, mode: str, topic: str, lease_seconds: Optional[int]) -> bool:
+        """hub验证订阅意图：只确认与最近一次请求一致的模式和topic"""
+        with self.lock:
+            record = self.subscriptions.get(sub_id)
+            if not record or record['topic'] != topic or record.get('mode') != mode:
+                return False
+            now = time.time()
+            if mode == 'subscribe':
+                lease = lease_seconds or record.get('lease_seconds') or DEFAULT_LEASE_SECONDS
+                record.update(state='verified', verified_at=now, lease_seconds=lease, expires_at=now + lease)
+            else:
+                record.update(state='unsubscribed', expires_at=None)
+            self.dirty = True
+            return True
+
+    def deny(self, sub_id: str, topic: str):
+        """hub拒绝订阅"""
+        with self.lock:
+            record = self.subscriptions.get(sub_id)
+            if record and record['topic'] == topic:
+                record.update(state='denied', denied_at=time.time())
+                self.dirty = True
+
+    def record_push(self, sub_id: str):
+        with self.lock:
+            if sub_id in self.subscriptions:
+                self.subscriptions[sub_id]['last_push'] = time.time()
+                self.dirty = True
+
+    def is_active(self, record: Dict, now: float) -> bool:
+        return record.get('state') == 'verified' and (record.get('expires_at') or 0) > now
+
+    def needs_subscribe(self, source_url: str, hub: str, topic: str, now: float) -> bool:
+        """是否需要（重新）发起订阅"""
+        found = self.find(source_url)
+        if not found:
+            return True
+        _, record = found
+        if record['hub'] != hub or record['topic'] != topic:
+            return True
+        if record['state'] == 'pending':
+            return now - record.get('requested_at', 0) > PENDING_TIMEOUT_SECONDS
+        if record['state'] == 'denied':
+            return now - record.get('denied_at', 0) > DEFAULT_LEASE_SECONDS
+        if record['state'] == 'verified':
+            return self.needs_renewal(record, now)
+        return True
+
+    def needs_renewal(self, record: Dict, now: float) -> bool:
+        lease = record.get('lease_seconds') or DEFAULT_LEASE_SECONDS
+        return (record.get('expires_at') or 0) - now < lease * RENEW_FRACTION
+
+    def due_for_renewal(self, now: float) -> List[Dict]:
+        with self.lock:
+            return [dict(record) for record in self.subscriptions.values()
+                    if record.get('state') == 'verified' and record.get('mode') == 'subscribe'
+                    and self.needs_renewal(record, now)]
+
+    def is_push_active(self, source_url: str, now: float, quiet_seconds: float) -> bool:
+        """该源当前是否由推送覆盖（订阅有效，且最近一段时间内验证过或收到过推送）"""
+        found = self.find(source_url)
+        if not found:
+            return False
+        _, record = found
+        if not self.is_active(record, now):
+            return False
+        last_seen = max(record.get('last_push') or 0, record.get('verified_at') or 0)
+        return now - last_seen < quiet_seconds
+
+
+class WebSubReceiver:
+    """内置HTTP接收器：处理hub的订阅验证（GET）和内容推送（POST）"""
+
+    def __init__(self, store: SubscriptionStore, host: str = '0.0.0.0', port: int = 8080, path_prefix: str = '/websub/',
+                 max_body_bytes: int = DEFAULT_MAX_BYTES):
+        self.store = store
+        self.max_body_bytes = max_body_bytes
+        self.host = host
+        self.port = port
+        self.path_prefix = path_prefix.rstrip('/') + '/'
+        # (RSS源URL, 推送内容)，由主循环取出处理
+        self.pushes: queue.Queue = queue.Queue()
+        self.server: Optional[ThreadingHTTPServer] = None
+
+    def start(self) -> int:
+        """在后台线程中启动，返回实际监听的端口"""
+        self.server = ThreadingHTTPServer((self.host, self.port), self.make_handler())
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self.server.server_address[1]
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def make_handler(self):
+        receiver = self
+        store = self.store
+
+        class CallbackHandler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def reply(self, status: int, body: bytes = b''):
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/plain; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def sub_id(self) -> Optional[str]:
+                path = urlsplit(self.path).path
+                if path.startswith(receiver.path_prefix):
+                    return path[len(receiver.path_prefix):].strip('/') or None
+                return None
+
+            def do_GET(self):
+                sub_id = self.sub_id()
+                params = {k: v[0] for k, v in parse_qs(urlsplit(self.path).query).items()}
+                mode = params.get('hub.mode')
+                topic = params.get('hub.topic', '')
+                if not sub_id or not mode:
+                    self.reply(404)
+                    return
+
+                if mode == 'denied':
+                    store.deny(sub_id, topic)
+                    print(f"⚠️ WebSub订阅被hub拒绝: {topic} ({params.get('hub.reason', '无原因')})")
+                    self.reply(200)
+                    return
+
+                lease = params.get('hub.lease_seconds')
+                lease_seconds = int(lease) if lease and lease.isdigit() else None
+                if mode in ('subscribe', 'unsubscribe') and store.confirm(sub_id, mode, topic, lease_seconds):
+                    print(f"✅ WebSub{'订阅' if mode == 'subscribe' else '取消订阅'}已验证: {topic}"
+                          + (f"（租期 {lease_seconds} 秒）" if lease_seconds else ""))
+                    self.reply(200, params.get('hub.challenge', '').encode('utf-8'))
+                else:
+                    # 不是自己发起的请求，拒绝确认
+                    self.reply(404)
+
+            def do_POST(self):
+                sub_id = self.sub_id()
+                length = int(self.headers.get('Content-Length', 0))
+                if length > receiver.max_body_bytes:
+                    # 与轮询下载相同的大小上限，超过时不读取内容
+                    self.close_connection = True
+                    self.reply(413)
+                    return
+                body = self.rfile.read(length)
+                record = store.get(sub_id) if sub_id else None
+                if not record or record.get('state') != 'verified':
+                    # 410告诉hub这个订阅已经不存在
+                    self.reply(410)
+                    return
+
+                # 签名不对也返回2xx（规范要求），但丢弃内容
+                if not verify_signature(store.secret_for(sub_id), body, self.headers.get('X-Hub-Signature')):
+                    print(f"⚠️ WebSub推送签名校验失败，已丢弃: {record['topic']}")
+                    self.reply(202)
+                    return
+
+                store.record_push(sub_id)
+                receiver.pushes.put((record['source_url'], body))
+                self.reply(202)
+
+        return CallbackHandler
+
+
+class WebSub:
+    """监控器使用的WebSub入口：发现hub后订阅、续订，判断哪些源可以不轮询"""
+
+    def __init__(self, config: Dict, data_path: str):
+        self.callback_url = config['websub_callback_url'].rstrip('/')
+        self.lease_seconds = config.get('websub_lease_seconds', DEFAULT_LEASE_SECONDS)
+        self.quiet_seconds = config.get('websub_quiet_seconds', DEFAULT_QUIET_SECONDS)
+        self.store = SubscriptionStore(data_path, config.get('websub_secret'))
+        listen = config.get('websub_listen', '0.0.0.0:8080')
+        host, _, port = listen.rpartition(':')
+        self.receiver = WebSubReceiver(self.store, host or '0.0.0.0', int(port), urlsplit(self.callback_url).path or '/',
+                                       config.get('max_feed_bytes', DEFAULT_MAX_BYTES))
+
+    def start(self) -> int:
+        port = self.receiver.start()
+        print(f"📡 WebSub接收器已启动: {self.receiver.host}:{port}，回调地址 {self.callback_url}/<id>")
+        return port
+
+    def stop(self):
+        self.receiver.stop()
+        self.store.save()
+
+    def subscribe(self, source_url: str, hub: str, topic: str, mode: str = 'subscribe') -> bool:
+        """向hub发起订阅（或取消订阅），hub接受后会异步回调验证"""
+        import requests
+
+        sub_id = self.store.request(source_url, hub, topic, mode)
+        data = {
+            'hub.mode': mode,
+            'hub.topic': topic,
+            'hub.callback': f"{self.callback_url}/{sub_id}",
+            'hub.lease_seconds': str(self.lease_seconds),
+            'hub.secret': self.store.secret_for(sub_id),
+        }
+        try:
+            response = requests.post(hub, data=data, timeout=10)
+        except requests.exceptions.RequestException as e:
+            print(f"⚠️ WebSub{mode}请求失败 ({hub}): {e}")
+            return False
+        if response.status_code not in (202, 204):
+            print(f"⚠️ WebSub hub拒绝{mode}请求 ({hub}): HTTP {response.status_code} {response.text[:200]}")
+            return False
+        print(f"📨 已向hub发起{'订阅' if mode == 'subscribe' else '取消订阅'}: {topic}")
+        return True
+
+    def discovered(self, source_url: str, hub: str, topic: str):
+        """获取RSS时发现了hub：还没有有效订阅就订阅"""
+        if self.store.needs_subscribe(source_url, hub, topic, time.time()):
+            self.subscribe(source_url, hub, topic)
+        self.store.save()
+
+    def renew(self):
+        """续订快到期的订阅"""
+        for record in self.store.due_for_renewal(time.time()):
+            print(f"🔄 WebSub订阅即将到期，续订: {record['topic']}")
+            self.subscribe(record['source_url'], record['hub'], record['topic'])
+        self.store.save()
+
+    def is_push_active(self, source_url: str) -> bool:
+        return self.store.is_push_active(source_url, time.time(), self.quiet_seconds)
+
+    def next_push(self, timeout: float) -> Optional[Tuple[str, bytes]]:
+        """等待下一条推送，超时返回None"""
+        try:
+            return self.receiver.pushes.get(timeout=max(0.0, timeout))
+        except queue.Empty:
+            return None
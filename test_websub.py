@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试WebSub推送订阅（端到端，全部在本机完成）
+
+启动本地的RSS源、模拟hub和模拟Discord Webhook，以常驻模式运行监控器，验证:
+1. 首次轮询时发现hub并订阅，hub回调验证订阅意图
+2. RSS源发布新文章并通知hub后，hub推送的内容被推送到Discord
+3. 签名错误的推送被丢弃
+4. 订阅后该源不再轮询
+
+用法: python test_websub.py
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from rss_monitor import RSSMonitor  # noqa: E402
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(handler) -> int:
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.server_address[1]
+
+
+class World:
+    """本地RSS源、模拟hub和模拟Discord共享的数据"""
+    items = []          # RSS源中的文章标题
+    feed_requests = 0   # RSS源被轮询的次数
+    subscribers = {}    # hub中的订阅 {callback: secret}
+    posts = []          # Discord收到的消息
+    hub_url = ''
+    feed_url = ''
+
+
+def render_feed() -> bytes:
+    entries = ''.join(
+        f"<item><title>{title}</title><link>https://example.com/{hashlib.md5(title.encode('utf-8')).hexdigest()}</link>"
+        f"<pubDate>{formatdate(time.time() - 30, usegmt=True)}</pubDate></item>"
+        for title in World.items
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom"><channel><title>WebSub测试源</title>'
+        f'<atom:link rel="hub" href="{World.hub_url}"/><atom:link rel="self" href="{World.feed_url}"/>'
+        f'{entries}</channel></rss>'
+    ).encode('utf-8')
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        World.feed_requests += 1
+        body = render_feed()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/rss+xml')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class HubHandler(BaseHTTPRequestHandler):
+    """模拟hub：处理订阅请求（异步回调验证）和发布通知（抓取topic后推送给订阅者）"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        params = {k: v[0] for k, v in parse_qs(self.rfile.read(length).decode('utf-8')).items()}
+        mode = params.get('hub.mode')
+        if mode == 'subscribe':
+            threading.Thread(target=self.verify, args=(params,), daemon=True).start()
+        elif mode == 'publish':
+            threading.Thread(target=self.distribute, args=(params['hub.url'],), daemon=True).start()
+        else:
+            self.send_response(400)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(202)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    @staticmethod
+    def verify(params):
+        challenge = 'challenge-' + os.urandom(4).hex()
+        query = urlencode({'hub.mode': 'subscribe', 'hub.topic': params['hub.topic'],
+                           'hub.challenge': challenge, 'hub.lease_seconds': params.get('hub.lease_seconds', '3600')})
+        response = requests.get(f"{params['hub.callback']}?{query}", timeout=5)
+        if response.status_code == 200 and response.text == challenge:
+            World.subscribers[params['hub.callback']] = params.get('hub.secret', '')
+
+    @staticmethod
+    def distribute(topic):
+        body = requests.get(topic, timeout=5).content
+        for callback, secret in World.subscribers.items():
+            signature = hmac.new(secret.encode('utf-8'), body, hashlib.sha256).hexdigest()
+            requests.post(callback, data=body, timeout=5,
+                          headers={'Content-Type': 'application/rss+xml', 'X-Hub-Signature': f'sha256={signature}'})
+
+
+class DiscordHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        World.posts.append(json.loads(self.rfile.read(length)))
+        self.send_response(204)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+def wait_for(condition, timeout: float = 10) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.1)
+    return False
+
+
+def posted(title: str) -> bool:
+    return any(title in json.dumps(post, ensure_ascii=False) for post in World.posts)
+
+
+def test_websub():
+    """测试WebSub订阅、验证和推送"""
+    print("=" * 50)
+    print("🧪 测试WebSub推送订阅")
+    print("=" * 50)
+
+    feed_port = start_server(FeedHandler)
+    hub_port = start_server(HubHandler)
+    discord_port = start_server(DiscordHandler)
+    callback_port = free_port()
+    World.feed_url = f'http://127.0.0.1:{feed_port}/feed'
+    World.hub_url = f'http://127.0.0.1:{hub_port}/'
+    World.items = ['第一篇文章']
+
+    # 配置和数据文件都放在临时目录中（不切换当前目录，常驻线程在测试结束后也不会写到别处）
+    workdir = tempfile.mkdtemp(prefix='rss_websub_test_')
+    run_checks(workdir, discord_port, callback_port)
+
+    print("\n" + "=" * 50)
+    print("✅ WebSub测试通过")
+    print("=" * 50)
+
+
+def run_checks(workdir: str, discord_port: int, callback_port: int):
+    config_file = os.path.join(workdir, 'config.json')
+    with open(config_file, 'w', encoding='utf-8') as f:
+        json.dump({
+            'discord_webhook': f'http://127.0.0.1:{discord_port}/discord',
+            'rss_sources': [{'name': 'WebSub测试源', 'url': World.feed_url}],
+            'poll_interval_seconds': 2,
+            'websub_callback_url': f'http://127.0.0.1:{callback_port}/websub',
+            'websub_listen': f'127.0.0.1:{callback_port}',
+            'verbosity': 1,
+        }, f)
+
+    monitor = RSSMonitor(config_file, data_dir=workdir)
+    threading.Thread(target=monitor.serve, daemon=True).start()
+
+    print("\n📤 测试1: 首次轮询发现hub并订阅...")
+    assert wait_for(lambda: World.subscribers) and wait_for(lambda: posted('第一篇文章')), \
+        "订阅未完成或首次轮询的文章没有推送"
+    print("   ✅ 订阅已验证，首次轮询的文章已推送")
+
+    print("\n📤 测试2: 发布新文章并通知hub...")
+    World.items.insert(0, '推送的新文章')
+    polls_before = World.feed_requests
+    started = time.time()
+    requests.post(World.hub_url, data={'hub.mode': 'publish', 'hub.url': World.feed_url}, timeout=5)
+    assert wait_for(lambda: posted('推送的新文章')), "推送内容没有送达"
+    print(f"   ✅ 推送内容已送达Discord（{time.time() - started:.2f} 秒）")
+
+    print("\n📤 测试3: 签名错误的推送...")
+    World.items.insert(0, '伪造的文章')
+    callback = next(iter(World.subscribers))
+    requests.post(callback, data=render_feed(), timeout=5, headers={'X-Hub-Signature': 'sha256=' + '0' * 64})
+    time.sleep(1)
+    assert not posted('伪造的文章'), "签名错误的推送被处理了"
+    print("   ✅ 签名错误的推送已丢弃")
+
+    print("\n📤 测试4: 订阅后不再轮询...")
+    # 轮询间隔为2秒，再等过一轮；hub抓取topic时会请求RSS源一次（测试2），除此之外不应有新的轮询
+    time.sleep(2.5)
+    polls = World.feed_requests - polls_before
+    assert polls <= 1, f"订阅期间仍轮询了 {polls} 次"
+    print("   ✅ 订阅期间没有轮询RSS源")
+
+
+if __name__ == "__main__":
+    try:
+        test_websub()
+    except AssertionError as e:
+        print(f"   ❌ {e}")
+        print("\n" + "=" * 50)
+        print("❌ WebSub测试失败")
+        print("=" * 50)
+        sys.exit(1)